@@ -0,0 +1,181 @@
+"""
+Float and cents money mode cross-check for the Daleview Pool Financial Calculator.
+
+Evaluates the same inputs in float and cents mode (see src.money) and fails
+if any amount differs by more than the rounding the cents mode introduces,
+or if a cents-mode amortization schedule does not balance exactly.
+
+Usage (from the repository root):
+    python benchmarks/money_check.py
+"""
+import os
+import sys
+from typing import Callable, Dict, List, Mapping
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from src.amortization import amortization_table, financing_amortization
+from src.calculations import FinancingInputs
+from src.money import to_cents
+from src.scenarios import evaluate_scenarios
+from src.sweep import make_grid
+from src.vectorized import (
+    FinancingBatch, ProjectionInputs, calculate_financing_metrics_batch, calculate_projections
+)
+
+# Largest float vs cents difference allowed, in cents. A monthly payment is
+# off by its own rounding plus the loan amount's (under 1 cent together);
+# annual payments repeat that 12 times, loan totals once per month of the
+# longest term (30 years)
+FINANCING_TOLERANCE = {
+    'monthly_bond_payment': 1,
+    'monthly_loan_payment': 1,
+    'annual_bond_payment': 12,
+    'annual_loan_payment': 12,
+    'total_annual_debt_service': 24,
+    'total_bond_cost': 360,
+    'total_loan_cost': 360,
+    'total_cost_of_borrowing': 720
+}
+
+# Yearly revenue and expenses are rounded once, after rounded inputs are
+# compounded over the horizon; debt service carries the payment rounding
+PROJECTION_TOLERANCE = {
+    'Revenue': 2,
+    'Operating Expenses': 2,
+    'Debt Service': 24,
+    'Operating Surplus': 28
+}
+
+SCENARIO_TOLERANCE = {
+    **FINANCING_TOLERANCE,
+    'future_total_revenue': 0.5,
+    'total_assessment': 0.5,
+    'total_bond_funding': 0.5,
+    'remaining_to_finance': 0.5,
+    'future_surplus': 25
+}
+
+# 'Debt % of Costs' stays a float percentage; allowed difference in percentage points
+DEBT_PERCENTAGE_TOLERANCE = 1e-3
+
+def _compare(float_values: Mapping[str, np.ndarray], cents_values: Mapping[str, np.ndarray],
+             tolerance: Mapping[str, float]) -> List[str]:
+    """Describe every column whose cents values differ from float dollars by more than its tolerance"""
+    failures = []
+    for name, limit in tolerance.items():
+        if cents_values[name].dtype != np.int64:
+            failures.append(f"{name}: cents mode gave {cents_values[name].dtype}, not int64")
+            continue
+        difference = np.abs(cents_values[name] - np.asarray(float_values[name]) * 100).max(initial=0)
+        if difference > limit:
+            failures.append(f"{name}: differs by {difference:.3f} cents (tolerance {limit})")
+    return failures
+
+def _financing_batch(n: int = 20_000) -> FinancingBatch:
+    rng = np.random.default_rng(0)
+    return FinancingBatch(
+        total_bond_funding=rng.uniform(0, 1_000_000, n),
+        bond_term=rng.integers(5, 16, n),
+        bond_interest_rate=np.round(rng.uniform(3, 8, n), 2),
+        remaining_to_finance=rng.uniform(0, 2_000_000, n),
+        commercial_term=rng.integers(10, 31, n),
+        commercial_interest_rate=np.round(rng.uniform(5, 12, n), 2)
+    )
+
+def check_financing_metrics() -> List[str]:
+    """calculate_financing_metrics_batch in float vs cents mode"""
+    batch = _financing_batch()
+    return _compare(calculate_financing_metrics_batch(batch),
+                    calculate_financing_metrics_batch(batch, money_mode='cents'),
+                    FINANCING_TOLERANCE)
+
+def check_projections() -> List[str]:
+    """calculate_projections in float vs cents mode"""
+    rng = np.random.default_rng(1)
+    n = 20_000
+    inputs = ProjectionInputs(
+        future_total_revenue=rng.uniform(200_000, 600_000, n),
+        inflation_rate=np.round(rng.uniform(0, 5, n), 1),
+        current_expenses=rng.uniform(200_000, 500_000, n),
+        annual_bond_payment=rng.uniform(0, 150_000, n),
+        annual_loan_payment=rng.uniform(0, 250_000, n),
+        bond_term=rng.integers(5, 16, n),
+        commercial_term=rng.integers(10, 31, n)
+    )
+    float_values = calculate_projections(inputs, horizon=20)
+    cents_values = calculate_projections(inputs, horizon=20, money_mode='cents')
+    failures = _compare(float_values, cents_values, PROJECTION_TOLERANCE)
+    difference = np.abs(cents_values['Debt % of Costs'] - float_values['Debt % of Costs']).max()
+    if difference > DEBT_PERCENTAGE_TOLERANCE:
+        failures.append(f"Debt % of Costs: differs by {difference:.6f} points")
+    return failures
+
+def check_scenarios() -> List[str]:
+    """evaluate_scenarios in float vs cents mode, including the projections"""
+    grid = make_grid({'members': 7, 'avg_dues': 7, 'total_cost': 7, 'bond_interest_rate': 5,
+                      'commercial_term': 5, 'inflation_rate': 4, 'assessment_per_member': 4})
+    params = grid.scenarios(0, grid.size)
+    float_results = evaluate_scenarios(params)
+    cents_results = evaluate_scenarios(params, money_mode='cents')
+    return (_compare(float_results.metrics, cents_results.metrics, SCENARIO_TOLERANCE)
+            + _compare(float_results.projections, cents_results.projections, PROJECTION_TOLERANCE))
+
+def check_amortization() -> List[str]:
+    """Cents-mode schedules retire every balance exactly and reconcile with the financing metrics"""
+    failures = []
+    batch = _financing_batch(2_000)
+    principal = np.concatenate([batch.total_bond_funding, batch.remaining_to_finance, [0]])
+    rate = np.concatenate([batch.bond_interest_rate, batch.commercial_interest_rate, [0]])
+    months = np.concatenate([batch.bond_term, batch.commercial_term, [10]]) * 12
+    table = amortization_table(principal, rate, months, money_mode='cents')
+    if (table['Balance'][:, -1] != 0).any():
+        failures.append("amortization_table: a cents schedule ends with a nonzero balance")
+    if (table['Principal'].sum(axis=1) != to_cents(principal)).any():
+        failures.append("amortization_table: principal paid does not sum to the loan amount")
+    if (table['Payment'] != table['Interest'] + table['Principal']).any():
+        failures.append("amortization_table: payments are not interest plus principal")
+
+    metrics = calculate_financing_metrics_batch(batch, money_mode='cents')
+    for i in range(0, 2_000, 97):
+        inputs = FinancingInputs(
+            total_bond_funding=float(batch.total_bond_funding[i]),
+            bond_term=int(batch.bond_term[i]),
+            bond_interest_rate=float(batch.bond_interest_rate[i]),
+            remaining_to_finance=float(batch.remaining_to_finance[i]),
+            commercial_term=int(batch.commercial_term[i]),
+            commercial_interest_rate=float(batch.commercial_interest_rate[i])
+        )
+        schedules = financing_amortization(inputs, money_mode='cents')
+        interest = 0
+        for schedule, term in ((schedules['bond'], inputs.bond_term), (schedules['commercial'], inputs.commercial_term)):
+            payment = schedule['Payment'][0]
+            # The final payment differs from the regular one by the rounding residue
+            interest += int(schedule['Interest'].sum() + payment[0] - payment[term * 12 - 1])
+        if interest != metrics['total_cost_of_borrowing'][i]:
+            failures.append(f"financing_amortization: loan {i} interest plus final-payment residue is off by "
+                            f"{metrics['total_cost_of_borrowing'][i] - interest} cents")
+    return failures
+
+CHECKS: Dict[str, Callable[[], List[str]]] = {
+    'financing metrics': check_financing_metrics,
+    'projections': check_projections,
+    'scenarios': check_scenarios,
+    'amortization': check_amortization
+}
+
+def main() -> int:
+    """Command-line entry point"""
+    failed = False
+    for name, check in CHECKS.items():
+        failures = check()
+        print(f"{name:<18} {'ok' if not failures else 'FAILED'}")
+        for failure in failures:
+            print(f"    {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Benchmark suite for the Daleview Pool Financial Calculator.
+
+Times the calculation kernels, the projection table build, the chart and
+table renderers and end-to-end reruns of the calculator page through
+Streamlit's headless AppTest harness. Each run is appended to a JSON-lines
+history file and compared with the previous run.
+
+Usage (from the repository root):
+    python benchmarks/run.py [--filter NAME] [--output benchmarks/history.jsonl] [--threshold 0.2]
+
+Exits with status 1 if any benchmark is slower than its previous recorded
+result by more than the threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Slowdown relative to the previous run that is reported as a regression
+REGRESSION_THRESHOLD = 0.20
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+def benchmark(name: str):
+    """Register a setup function that returns the callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def _default_financing_inputs():
+    from src.calculations import FinancingInputs
+    return FinancingInputs(
+        total_bond_funding=500_000,
+        bond_term=10,
+        bond_interest_rate=5.5,
+        remaining_to_finance=850_000,
+        commercial_term=20,
+        commercial_interest_rate=8.5
+    )
+
+def _default_projection_inputs():
+    from src.vectorized import ProjectionInputs
+    return ProjectionInputs(
+        future_total_revenue=397_765,
+        inflation_rate=2.5,
+        current_expenses=347_000,
+        annual_bond_payment=65_118,
+        annual_loan_payment=88_518,
+        bond_term=10,
+        commercial_term=20
+    )
+
+@benchmark('calculate_monthly_payment')
+def _monthly_payment():
+    from src.calculations import calculate_monthly_payment
+    return lambda: calculate_monthly_payment(850_000, 8.5, 240)
+
+@benchmark('calculate_financing_metrics')
+def _financing_metrics():
+    from src.calculations import calculate_financing_metrics
+    inputs = _default_financing_inputs()
+    return lambda: calculate_financing_metrics(inputs)
+
+@benchmark('calculate_year_metrics')
+def _year_metrics():
+    from src.calculations import YearMetricsInputs, calculate_year_metrics
+    inputs = YearMetricsInputs(
+        year=5, future_total_revenue=397_765, inflation_rate=2.5, current_expenses=347_000,
+        annual_bond_payment=65_118, annual_loan_payment=88_518, bond_term=10, commercial_term=20
+    )
+    return lambda: calculate_year_metrics(inputs)
+
+@benchmark('projection_frame')
+def _projection_frame():
+    from src.vectorized import calculate_projections, projections_to_frame
+    inputs = _default_projection_inputs()
+    return lambda: projections_to_frame(calculate_projections(inputs, horizon=20))
+
+@benchmark('dataflow.what_if_dues')
+def _dataflow_what_if():
+    from src.dataflow import financial_model
+    model = financial_model()
+    model.get('future_surplus')
+    dues = iter(800 if i % 2 else 700 for i in range(10**9))
+    # Only future_total_revenue and future_surplus are recomputed
+    return lambda: model.what_if(avg_dues=next(dues)).get('future_surplus')
+
+def _financing_batch_inputs():
+    import numpy as np
+    from src.vectorized import FinancingBatch
+    rng = np.random.default_rng(0)
+    n = 100_000
+    return FinancingBatch(
+        total_bond_funding=rng.uniform(0, 1_000_000, n),
+        bond_term=rng.integers(5, 16, n),
+        bond_interest_rate=np.round(rng.uniform(3, 8, n), 1),
+        remaining_to_finance=rng.uniform(0, 2_000_000, n),
+        commercial_term=rng.integers(10, 31, n),
+        commercial_interest_rate=np.round(rng.uniform(5, 12, n), 1)
+    )
+
+@benchmark('financing_metrics_batch_100k')
+def _financing_batch():
+    from src.vectorized import calculate_financing_metrics_batch
+    batch = _financing_batch_inputs()
+    return lambda: calculate_financing_metrics_batch(batch)
+
+@benchmark('financing_metrics_batch_100k_cents')
+def _financing_batch_cents():
+    from src.vectorized import calculate_financing_metrics_batch
+    batch = _financing_batch_inputs()
+    return lambda: calculate_financing_metrics_batch(batch, money_mode='cents')
+
+@benchmark('scenarios.evaluate_100k_cents')
+def _evaluate_cents():
+    from src.scenarios import evaluate_scenarios
+    from src.sweep import make_grid
+    grid = make_grid({'members': 10, 'avg_dues': 100, 'total_cost': 100})
+    params = grid.scenarios(0, grid.size)
+    return lambda: evaluate_scenarios(params, money_mode='cents')
+
+@benchmark('portfolio.evaluate_500x200')
+def _portfolio():
+    import numpy as np
+    from src import config
+    from src.portfolio import evaluate_portfolio, parse_portfolio
+    rng = np.random.default_rng(0)
+    members = rng.integers(150, 600, 500)
+    dues = members * rng.uniform(500, 900, 500)
+    portfolio = parse_portfolio([
+        {'pool': f'Pool {i}', 'members': members[i], 'dues_revenue': dues[i],
+         'swim_team_revenue': config.get_operating_metric('SWIM_TEAM_REVENUE'),
+         'winter_swim_revenue': config.get_operating_metric('WINTER_SWIM_REVENUE'),
+         'total_revenue': dues[i] * 1.6, 'expenses': dues[i] * 1.5}
+        for i in range(500)
+    ])
+    scenarios = {
+        'total_cost': np.repeat(np.linspace(1_000_000, 3_000_000, 10), 20),
+        'bond_interest_rate': np.tile(np.linspace(3, 8, 20), 10)
+    }
+    return lambda: evaluate_portfolio(portfolio, scenarios)
+
+@benchmark('optimize.funding_frontier')
+def _funding_frontier():
+    from src.optimize import funding_frontier
+    return lambda: funding_frontier()
+
+@benchmark('montecarlo.paths_1m_pool')
+def _monte_carlo_pool():
+    from src.montecarlo import MonteCarloSettings, run_monte_carlo
+    # One worker per core writing into shared memory; compare across machines
+    # by core count in the recorded environment
+    settings = MonteCarloSettings(paths=1_000_000, processes=os.cpu_count())
+    return lambda: run_monte_carlo(settings=settings)
+
+@benchmark('sensitivity.surplus_surface')
+def _surplus_surface():
+    from src.scenarios import default_scenario
+    from src.sensitivity import _surface, surplus_surface
+    params = default_scenario()
+
+    def run():
+        _surface.cache_clear()  # time the 201 x 201 grid, not a cache hit
+        return surplus_surface('avg_dues', 'members', params)
+    return run
+
+@benchmark('sensitivity.tornado_analysis')
+def _tornado_analysis():
+    from src.scenarios import default_scenario
+    from src.sensitivity import tornado_analysis
+    params = default_scenario()
+    return lambda: tornado_analysis(params, years=(5, 20))
+
+@benchmark('colstore.sweep_1m')
+def _column_store_sweep():
+    import atexit
+    import shutil
+    import tempfile
+    from src.colstore import ColumnStore, ColumnStoreWriter
+    from src.sweep import make_grid, run_sweep
+    grid = make_grid({'members': 100, 'avg_dues': 100, 'total_cost': 100})
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = os.path.join(directory, 'sweep.cols')
+
+    def run():
+        # Write every metric, then reopen and scan one column from disk
+        with ColumnStoreWriter(path, overwrite=True) as writer:
+            run_sweep(grid, writer, processes=1, metrics=True, report_years=(5, 20))
+        return (ColumnStore(path)['min_surplus'] < 0).sum()
+    return run
+
+@benchmark('query.where_1m')
+def _query_where():
+    import atexit
+    import shutil
+    import tempfile
+    from src.colstore import ColumnStoreWriter
+    from src.query import Condition, SweepQuery, build_indexes, no_deficit_through
+    from src.sweep import make_grid, run_sweep
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = os.path.join(directory, 'sweep.cols')
+    with ColumnStoreWriter(path) as writer:
+        run_sweep(make_grid({'members': 100, 'avg_dues': 100, 'total_cost': 100}), writer, processes=1)
+    build_indexes(path, ['members', 'first_deficit_year', 'total_cost_of_borrowing'])
+    query = SweepQuery(path)
+    conditions = [Condition('total_cost_of_borrowing', '<', 500_000), no_deficit_through(20),
+                  Condition('members', '>=', 300)]
+    return lambda: query.where(conditions)
+
+def _chart_inputs():
+    import pandas as pd
+    from src.vectorized import calculate_projections, projections_to_frame
+    projections = projections_to_frame(calculate_projections(_default_projection_inputs(), horizon=20))
+    funding = pd.DataFrame({
+        'Source': ['Assessments', 'The Footnote', 'Commercial Loan'],
+        'Amount': [650_000, 500_000, 850_000]
+    })
+    return projections, funding
+
+@benchmark('charts.render_funding_sources_chart')
+def _funding_chart():
+    from src.components import charts
+    _, funding = _chart_inputs()
+    return lambda: charts.render_funding_sources_chart(funding)
+
+@benchmark('charts.render_projections_table')
+def _projections_table():
+    from src.components import charts
+    projections, _ = _chart_inputs()
+    key_years = projections[projections['Year'].isin([0, 5, 10, 15, 20])]
+    return lambda: charts.render_projections_table(key_years)
+
+@benchmark('charts.render_trends_chart')
+def _trends_chart():
+    from src.components import charts
+    projections, _ = _chart_inputs()
+    return lambda: charts.render_trends_chart(projections)
+
+@benchmark('app.first_run')
+def _app_first_run():
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        AppTest.from_file(os.path.join(REPO_ROOT, 'streamlit_app.py'), default_timeout=60).run()
+    return run
+
+@benchmark('app.rerun')
+def _app_rerun():
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(REPO_ROOT, 'streamlit_app.py'), default_timeout=60)
+    app.run()
+    return app.run
+
+@benchmark('app.rerun_inflation_slider')
+def _app_rerun_inflation():
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(os.path.join(REPO_ROOT, 'streamlit_app.py'), default_timeout=60)
+    values = iter(3.0 if i % 2 else 2.0 for i in range(10**9))
+
+    def rerun():
+        # After a fragment rerun AppTest only holds that fragment's elements,
+        # so redraw the full page before each change; subtract app.rerun for
+        # the cost of the fragment rerun alone
+        app.run()
+        next(s for s in app.slider if s.label == 'Annual Inflation Rate').set_value(next(values))
+        app.run()
+    return rerun
+
+def time_callable(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time a callable like timeit's autorange.
+
+    Args:
+        func: Zero-argument callable to time
+        repeat: Number of timed rounds
+        min_time: Minimum duration of each round in seconds
+
+    Returns:
+        Dictionary with the median, minimum and per-round loop count, in
+        seconds per call
+    """
+    func()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rounds.append((time.perf_counter() - start) / loops)
+    return {'median': statistics.median(rounds), 'min': min(rounds), 'loops': loops}
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _environment() -> Dict[str, Optional[str]]:
+    versions = {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': str(os.cpu_count())}
+    for package in ('numpy', 'pandas', 'plotly', 'streamlit'):
+        try:
+            versions[package] = __import__(package).__version__
+        except ImportError:
+            versions[package] = None
+    return versions
+
+def _previous_results(path: str) -> Dict[str, Dict]:
+    """Latest recorded result and revision for each benchmark in the history file"""
+    previous = {}
+    if not os.path.exists(path):
+        return previous
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                for name, result in record['results'].items():
+                    previous[name] = {**result, 'revision': record['revision']}
+    return previous
+
+def run_benchmarks(names: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Run the named benchmarks.
+
+    Args:
+        names: Registered benchmark names to run
+
+    Returns:
+        Dictionary of timing results keyed by benchmark name
+    """
+    # Renderers run outside a Streamlit session; keep bare-mode and
+    # deprecation warnings out of the report
+    logging.disable(logging.WARNING)
+    results = {}
+    for name in names:
+        results[name] = time_callable(BENCHMARKS[name]())
+    return results
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Run the calculator benchmark suite.')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--output', default=os.path.join(REPO_ROOT, 'benchmarks', 'history.jsonl'),
+                        help='JSON-lines history file to append results to')
+    parser.add_argument('--no-save', action='store_true', help='do not append results to the history file')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='slowdown versus the previous run reported as a regression')
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    previous = _previous_results(args.output)
+    results = run_benchmarks(names)
+
+    regressions = []
+    for name, result in results.items():
+        line = f"{name:<40} {result['median'] * 1e6:12.1f} us"
+        if name in previous:
+            # Compare best rounds; medians of microsecond kernels are too noisy
+            change = result['min'] / previous[name]['min'] - 1
+            line += f"  {change:+7.1%} vs {previous[name]['revision'] or 'previous'}"
+            if change > args.threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+
+    if not args.no_save:
+        record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'revision': _git_revision(),
+            'environment': _environment(),
+            'results': results
+        }
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
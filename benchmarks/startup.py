@@ -0,0 +1,113 @@
+"""
+Cold-start import budget for the Daleview Pool Financial Calculator.
+
+Imports each entry point in a fresh interpreter, reports the median import
+time and fails if an entry exceeds its budget or loads a module it must not.
+
+Usage (from the repository root):
+    python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point: (modules imported, budget in seconds, modules that must stay unloaded)
+BUDGETS: Dict[str, Tuple[List[str], float, List[str]]] = {
+    'calculation core': (
+        ['src.calculations', 'src.config'],
+        0.05,
+        ['numpy', 'pandas', 'plotly', 'streamlit']
+    ),
+    'batch cli': (
+        ['src.cli'],
+        0.35,
+        ['pandas', 'plotly', 'streamlit']
+    ),
+    'calculation service': (
+        ['src.service'],
+        0.35,
+        ['pandas', 'plotly', 'streamlit']
+    ),
+    'app modules': (
+        # Everything streamlit_app.py imports before a page runs; the
+        # Documentation page needs nothing more than this. Streamlit itself
+        # imports plotly, so only pandas can be kept out here.
+        ['streamlit', 'src.components.inputs', 'src.components.metrics', 'src.components.charts',
+         'src.cache', 'src.dataflow', 'src.montecarlo', 'src.amortization', 'src.goalseek',
+         'src.optimize', 'src.sensitivity', 'src.query'],
+        1.5,
+        ['pandas']
+    )
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+def measure(modules: List[str], forbidden: List[str]) -> Dict:
+    """
+    Import modules in a fresh interpreter.
+
+    Args:
+        modules: Modules to import, in order
+        forbidden: Modules to report if they end up loaded
+
+    Returns:
+        Dictionary with the import time in seconds and the forbidden modules loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(modules=modules, forbidden=forbidden)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def check_budgets(runs: int = 5) -> List[Dict]:
+    """
+    Measure every entry point against its budget.
+
+    Args:
+        runs: Fresh interpreters started per entry point
+
+    Returns:
+        One result dictionary per entry point
+    """
+    results = []
+    for name, (modules, budget, forbidden) in BUDGETS.items():
+        samples = [measure(modules, forbidden) for _ in range(runs)]
+        seconds = statistics.median(sample['seconds'] for sample in samples)
+        loaded = sorted({m for sample in samples for m in sample['loaded']})
+        results.append({
+            'entry': name,
+            'seconds': seconds,
+            'budget': budget,
+            'forbidden_loaded': loaded,
+            'ok': seconds <= budget and not loaded
+        })
+    return results
+
+def main() -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Check cold-start import budgets.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per entry point')
+    args = parser.parse_args()
+
+    results = check_budgets(args.runs)
+    for r in results:
+        status = 'ok' if r['ok'] else 'OVER BUDGET'
+        extra = f"  loaded: {', '.join(r['forbidden_loaded'])}" if r['forbidden_loaded'] else ''
+        print(f"{r['entry']:<18} {r['seconds'] * 1000:8.1f} ms  (budget {r['budget'] * 1000:.0f} ms)  {status}{extra}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
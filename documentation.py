@@ -141,6 +141,38 @@ with st.expander("Using the Calculator"):
         - Review funding source breakdown
         - Analyze 20-year projections
         - Evaluate warning messages
+        
+        ### 6. Uncertainty Analysis (Optional)
+        - Enable the Monte Carlo simulation to vary inflation, membership and non-membership revenue
+        - Set the number of simulated paths and how much each input varies
+        - Review the probability of a deficit in each projection year
+        - Use the same random seed to reproduce a result
+        
+        ### 7. Break-Even Finder (Optional)
+        - Choose one input to solve for and the last year that must avoid a deficit
+        - The finder keeps every other input as set and reports the least favorable value that still breaks even
+        - Results are rounded to the slider step so they can be entered directly
+        
+        ### 8. Surplus Heatmap (Optional)
+        - Choose two inputs to vary across their full ranges while every other input stays as set
+        - Green areas keep an operating surplus and red areas run a deficit, in the first year and in the year you compare with
+        - The ✕ marks your current inputs
+        
+        ### 9. Input Sensitivity (Optional)
+        - Ranks every input by how far it alone moves the year-5 and year-20 operating surplus
+        - Each input moves across its full slider range while the others stay as set
+        - Red bars reach the lowest surplus and green bars the highest; hover to see the input value behind each end
+        
+        ### 10. Funding Mix Optimizer (Optional)
+        - Search assessment, bond participation, bond amount and loan term combinations for the current project cost
+        - Each point on the chart is a mix that no other mix beats on cost of borrowing, member burden and minimum 20-year surplus at once
+        - Member burden is the assessment plus bond funding per current member
+        - Hover over a point to see the inputs that produce it
+        
+        ### 11. Sweep Explorer (Advanced)
+        - Open a stored sweep of many input combinations from the Sweep Explorer page
+        - Filter on any input or outcome, such as total cost of borrowing, lowest surplus, first deficit year or peak debt share
+        - Indexed columns are looked up directly, so even very large sweeps answer in about a second
     """)
 
 with st.expander("Understanding Results"):
@@ -178,7 +210,7 @@ with st.expander("Limitations and Assumptions"):
         ## Model Constraints
         
         ### Fixed Assumptions
-        - Constant inflation rate throughout projection period
+        - Constant inflation rate throughout projection period (unless the Monte Carlo simulation is enabled)
         - Fixed interest rates on all debt
         - Stable membership levels within scenarios
         
@@ -0,0 +1,203 @@
+"""
+Amortization schedules for the Daleview Pool Financial Calculator.
+Splits each monthly payment into interest and principal for the bond and commercial loan.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterator
+import numpy as np
+
+from .calculations import FinancingInputs, calculate_monthly_payment
+from .instrumentation import timed
+from .money import check_money_mode, round_cents, to_cents
+from .vectorized import ArrayLike, calculate_monthly_payment_batch
+
+@dataclass(frozen=True)
+class AmortizationRow:
+    """One month of an amortization schedule"""
+    month: int
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+def iter_amortization_schedule(principal: float, rate: float, months: int) -> Iterator[AmortizationRow]:
+    """
+    Lazily generate a month-by-month amortization schedule.
+
+    Args:
+        principal: Loan principal amount
+        rate: Annual interest rate as percentage
+        months: Total number of months
+
+    Yields:
+        AmortizationRow for each month; nothing if there is no principal
+    """
+    if principal <= 0:
+        return
+    payment = calculate_monthly_payment(principal, rate, months)
+    monthly_rate = rate / (12 * 100)
+    balance = principal
+    for month in range(1, months + 1):
+        interest = balance * monthly_rate
+        if month == months:
+            # Retire any rounding residue with the final payment
+            principal_paid = balance
+            payment = interest + balance
+        else:
+            principal_paid = payment - interest
+        balance -= principal_paid
+        yield AmortizationRow(month, payment, interest, principal_paid, balance)
+
+def amortization_table(
+    principal: ArrayLike,
+    rate: ArrayLike,
+    months: ArrayLike,
+    money_mode: str = 'float'
+) -> Dict[str, np.ndarray]:
+    """
+    Build columnar amortization schedules for many loans at once.
+
+    In float mode balances use the closed form, so no month depends on the
+    previous one. Cents mode steps through the months instead: each month's
+    interest is rounded to the nearest cent and the final payment retires
+    whatever balance is left, so every schedule balances to the cent.
+    Months past a loan's term are zero.
+
+    Args:
+        principal: Loan principal amounts in dollars
+        rate: Annual interest rates as percentages
+        months: Total numbers of months
+        money_mode: 'float' for float dollars or 'cents' for int64 cents
+
+    Returns:
+        Dictionary with a 'Month' column and (loan x month) arrays for
+        'Payment', 'Interest', 'Principal' and 'Balance'
+    """
+    check_money_mode(money_mode)
+    principal, rate, months = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principal, dtype=float)),
+        np.atleast_1d(np.asarray(rate, dtype=float)),
+        np.atleast_1d(np.asarray(months, dtype=np.int64))
+    )
+    if money_mode == 'cents':
+        return _amortization_table_cents(np.maximum(to_cents(principal), 0), rate, months)
+    principal = np.maximum(principal, 0)
+    payment = calculate_monthly_payment_batch(principal, rate, months)[:, None]
+    monthly_rate = (rate / (12 * 100))[:, None]
+
+    month = np.arange(1, int(months.max(initial=0)) + 1)
+    elapsed = np.arange(len(month) + 1)[None, :]
+    growth = (1 + monthly_rate) ** elapsed
+    safe_rate = np.where(monthly_rate == 0, 1, monthly_rate)
+    balance = np.where(
+        monthly_rate == 0,
+        principal[:, None] - payment * elapsed,
+        principal[:, None] * growth - payment * (growth - 1) / safe_rate
+    )
+    # The final payment retires the loan, so the balance is zero from the end of the term
+    balance = np.where(elapsed < months[:, None], np.maximum(balance, 0), 0.0)
+    balance[:, 0] = np.where(months > 0, principal, 0.0)
+
+    opening = balance[:, :-1]
+    closing = balance[:, 1:]
+    in_term = month[None, :] <= months[:, None]
+    interest = np.where(in_term, opening * monthly_rate, 0.0)
+    principal_paid = opening - closing
+
+    return {
+        'Month': month,
+        'Payment': interest + principal_paid,
+        'Interest': interest,
+        'Principal': principal_paid,
+        'Balance': closing
+    }
+
+def _amortization_table_cents(principal: np.ndarray, rate: np.ndarray, months: np.ndarray) -> Dict[str, np.ndarray]:
+    """amortization_table for int64 principals in cents, rounding interest monthly"""
+    payment = round_cents(calculate_monthly_payment_batch(principal, rate, months))
+    monthly_rate = rate / (12 * 100)
+    month = np.arange(1, int(months.max(initial=0)) + 1)
+    columns = {key: np.zeros((len(principal), len(month)), dtype=np.int64)
+               for key in ('Payment', 'Interest', 'Principal', 'Balance')}
+
+    balance = principal.copy()
+    for index, current in enumerate(month):
+        in_term = current <= months
+        interest = np.where(in_term, round_cents(balance * monthly_rate), 0)
+        # Retire the rounding residue with the final payment
+        principal_paid = np.where(current == months, balance, np.minimum(payment - interest, balance))
+        principal_paid = np.where(in_term, principal_paid, 0)
+        balance = balance - principal_paid
+        columns['Interest'][:, index] = interest
+        columns['Principal'][:, index] = principal_paid
+        columns['Payment'][:, index] = interest + principal_paid
+        columns['Balance'][:, index] = balance
+    return {'Month': month, **columns}
+
+def annual_summary(table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Aggregate monthly amortization schedules by year.
+
+    Args:
+        table: Output of amortization_table
+
+    Returns:
+        Dictionary with a 'Year' column and (loan x year) arrays of annual
+        'Payment', 'Interest' and 'Principal' totals and year-end 'Balance'
+    """
+    months = len(table['Month'])
+    years = -(-months // 12)
+    pad = years * 12 - months
+    summary = {'Year': np.arange(1, years + 1)}
+    for key in ('Payment', 'Interest', 'Principal'):
+        values = np.pad(table[key], ((0, 0), (0, pad)))
+        summary[key] = values.reshape(len(values), years, 12).sum(axis=2)
+    balance = np.pad(table['Balance'], ((0, 0), (0, pad)))
+    summary['Balance'] = balance.reshape(len(balance), years, 12)[:, :, -1]
+    return summary
+
+def balance_at_year(table: Dict[str, np.ndarray], year: int) -> np.ndarray:
+    """
+    Get each loan's outstanding balance at the end of a year.
+
+    Args:
+        table: Output of amortization_table
+        year: Number of years elapsed
+
+    Returns:
+        Array with one balance per loan
+    """
+    month = year * 12
+    if month <= 0:
+        return table['Balance'][:, 0] + table['Principal'][:, 0]
+    if month > len(table['Month']):
+        return np.zeros(len(table['Balance']), dtype=table['Balance'].dtype)
+    return table['Balance'][:, month - 1]
+
+@timed
+def financing_amortization(inputs: FinancingInputs, money_mode: str = 'float') -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Build amortization schedules for the bond and commercial loan.
+
+    Total interest across both schedules equals the total_cost_of_borrowing
+    reported by calculate_financing_metrics, up to floating-point rounding,
+    whenever neither loan amount is negative. In cents mode it differs from
+    the cents-mode total_cost_of_borrowing only by the rounding residue
+    retired with each loan's final payment.
+
+    Args:
+        inputs: FinancingInputs dataclass containing all required parameters
+        money_mode: 'float' for float dollars or 'cents' for int64 cents
+
+    Returns:
+        Dictionary with 'bond' and 'commercial' amortization tables
+    """
+    return {
+        'bond': amortization_table(
+            inputs.total_bond_funding, inputs.bond_interest_rate, inputs.bond_term * 12, money_mode
+        ),
+        'commercial': amortization_table(
+            inputs.remaining_to_finance, inputs.commercial_interest_rate, inputs.commercial_term * 12,
+            money_mode
+        )
+    }
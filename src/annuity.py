@@ -0,0 +1,139 @@
+"""
+Annuity factor tables for the Daleview Pool Financial Calculator.
+Precomputes loan payment factors for every rate and term the financing sliders can select.
+
+The financing sliders move rates in 0.1% steps and terms in whole years, so
+every payment the app asks for uses one of a few thousand annuity factors.
+Each one is stored as the two terms calculate_monthly_payment divides,
+monthly_rate * growth and growth - 1 with growth = (1 + monthly_rate)**months,
+computed with the same float operations; payments from the table are
+bit-identical to the closed form. Rates and terms off the slider grid fall
+back to the closed form.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from . import config
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Slider ranges whose union the tables cover
+RATE_INPUTS = ('BOND_RATE', 'COMMERCIAL_RATE')
+TERM_INPUTS = ('BOND_TERM', 'COMMERCIAL_TERM')
+
+def _grid(keys: Tuple[str, ...]) -> Tuple[float, float, float]:
+    """Lowest value, highest value and finest step across several slider inputs"""
+    ranges = [config.get_input_range(key) for key in keys]
+    return (min(low for low, _ in ranges), max(high for _, high in ranges),
+            min(config.get_input_step(key) for key in keys))
+
+def grid_rates() -> List[float]:
+    """Annual rates, as percentages, that the rate sliders can select"""
+    low, high, step = _grid(RATE_INPUTS)
+    # Rounded to the same floats as the slider values, e.g. 5.6 rather than 3.0 + 26 * 0.1
+    return [round(low + step * k, 10) for k in range(int(round((high - low) / step)) + 1)]
+
+def grid_terms() -> List[int]:
+    """Loan terms, in years, that the term sliders can select"""
+    low, high, step = _grid(TERM_INPUTS)
+    return list(range(int(low), int(high) + 1, int(step)))
+
+def annuity_terms(monthly_rate: float, months: int) -> Tuple[float, float]:
+    """
+    Calculate the closed-form payment terms for a nonzero monthly rate.
+
+    Returns:
+        (monthly_rate * growth, growth - 1); the monthly payment is
+        principal * first / second
+    """
+    growth = (1 + monthly_rate)**months
+    return monthly_rate * growth, growth - 1
+
+@lru_cache(maxsize=None)
+def factor_table() -> Dict[Tuple[float, int], Tuple[float, float]]:
+    """
+    Get the process-wide annuity factors for every slider rate and term.
+
+    Returns:
+        Dictionary from (annual rate percentage, months) to annuity_terms
+    """
+    return {
+        (rate, years * 12): annuity_terms(rate / (12 * 100), years * 12)
+        for rate in grid_rates() if rate != 0
+        for years in grid_terms()
+    }
+
+def lookup(rate: float, months: int) -> Optional[Tuple[float, float]]:
+    """
+    Look up the annuity factors of an on-grid loan.
+
+    Args:
+        rate: Annual interest rate as percentage
+        months: Total number of months
+
+    Returns:
+        annuity_terms for the loan, or None if it is off the slider grid
+    """
+    return factor_table().get((rate, months))
+
+@dataclass(frozen=True)
+class AnnuityArrays:
+    """Container for the annuity factor table as (rate x term) arrays for batch lookups"""
+    rates: 'np.ndarray'
+    terms: 'np.ndarray'
+    numerator: 'np.ndarray'
+    denominator: 'np.ndarray'
+
+    def gather(self, rate: 'np.ndarray', months: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Gather the annuity factors of many loans.
+
+        Args:
+            rate: Annual interest rates as percentages
+            months: Total numbers of months, with the broadcast shape of rate
+
+        Returns:
+            (numerator, denominator, on_grid); entries where on_grid is False
+            hold placeholder factors and need the closed form
+        """
+        import numpy as np
+
+        low, step = self.rates[0], self.rates[1] - self.rates[0]
+        with np.errstate(invalid='ignore'):
+            rate_index = np.rint((rate - low) / step).astype(np.int64)
+        term_index = months // 12 - self.terms[0]
+        on_grid = ((rate_index >= 0) & (rate_index < len(self.rates))
+                   & (term_index >= 0) & (term_index < len(self.terms)) & (months % 12 == 0))
+        rate_index = np.where(on_grid, rate_index, 0)
+        term_index = np.where(on_grid, term_index, 0)
+        # Rates between grid points round onto one; only exact matches may use it
+        on_grid &= self.rates[rate_index] == rate
+        flat = rate_index * len(self.terms) + term_index
+        return self.numerator.ravel()[flat], self.denominator.ravel()[flat], on_grid
+
+@lru_cache(maxsize=None)
+def annuity_arrays() -> AnnuityArrays:
+    """
+    Get the process-wide annuity factor table as read-only arrays.
+
+    Returns:
+        AnnuityArrays built from factor_table
+    """
+    import numpy as np
+
+    rates, terms, table = grid_rates(), grid_terms(), factor_table()
+    # Zero rates have no annuity factor; their placeholder entries never match a lookup
+    factors = [[table.get((rate, years * 12), (np.nan, np.nan)) for years in terms] for rate in rates]
+    factors = np.array(factors)
+    arrays = AnnuityArrays(
+        rates=np.array(rates),
+        terms=np.array(terms, dtype=np.int64),
+        numerator=np.ascontiguousarray(factors[..., 0]),
+        denominator=np.ascontiguousarray(factors[..., 1])
+    )
+    for values in (arrays.rates, arrays.terms, arrays.numerator, arrays.denominator):
+        # The table is shared by every caller, so guard it against edits
+        values.flags.writeable = False
+    return arrays
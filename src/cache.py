@@ -0,0 +1,95 @@
+"""
+Shared result cache for the Daleview Pool Financial Calculator.
+Memoizes calculation results across reruns and user sessions in this process.
+"""
+from functools import lru_cache
+from typing import Dict, Union
+import numpy as np
+
+from .calculations import (
+    FinancingInputs, YearMetricsInputs,
+    calculate_financing_metrics, calculate_year_metrics
+)
+from .vectorized import ProjectionInputs, calculate_projections
+
+# Maximum number of results kept per cached function before LRU eviction
+CACHE_SIZE = 4096
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _financing_metrics(inputs: FinancingInputs) -> Dict[str, float]:
+    return calculate_financing_metrics(inputs)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _year_metrics(inputs: YearMetricsInputs) -> Dict[str, Union[int, float]]:
+    return calculate_year_metrics(inputs)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _projections(inputs: ProjectionInputs, horizon: int) -> Dict[str, np.ndarray]:
+    projections = calculate_projections(inputs, horizon=horizon)
+    # Cached arrays are shared by every session, so guard them against edits
+    for values in projections.values():
+        values.flags.writeable = False
+    return projections
+
+def cached_financing_metrics(inputs: FinancingInputs) -> Dict[str, float]:
+    """
+    Calculate financing metrics through the shared cache.
+
+    Args:
+        inputs: FinancingInputs dataclass containing all required parameters
+
+    Returns:
+        Dictionary containing all financing metrics
+    """
+    return dict(_financing_metrics(inputs))
+
+def cached_year_metrics(inputs: YearMetricsInputs) -> Dict[str, Union[int, float]]:
+    """
+    Calculate year metrics through the shared cache.
+
+    Args:
+        inputs: YearMetricsInputs dataclass containing all required parameters
+
+    Returns:
+        Dictionary containing calculated metrics for the specified year
+    """
+    return dict(_year_metrics(inputs))
+
+def cached_projections(inputs: ProjectionInputs, horizon: int = 20) -> Dict[str, np.ndarray]:
+    """
+    Calculate full-horizon projections through the shared cache.
+
+    Args:
+        inputs: ProjectionInputs holding scalar values for a single scenario
+        horizon: Last projection year
+
+    Returns:
+        Dictionary of read-only (1 x year) arrays from calculate_projections
+    """
+    return dict(_projections(inputs, horizon))
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get hit, miss and size counters for each shared cache.
+
+    Returns:
+        Dictionary keyed by cache name with hits, misses, size and maxsize
+    """
+    stats = {}
+    for name, cached in (('financing_metrics', _financing_metrics),
+                         ('year_metrics', _year_metrics),
+                         ('projections', _projections)):
+        info = cached.cache_info()
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize
+        }
+    return stats
+
+def clear_caches() -> None:
+    """Empty every shared cache and reset its counters"""
+    _financing_metrics.cache_clear()
+    _year_metrics.cache_clear()
+    _projections.cache_clear()
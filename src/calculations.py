@@ -2,12 +2,13 @@
 Core calculation functions for the Daleview Pool Financial Calculator.
 """
 from typing import Dict, Union
-import pandas as pd
 from dataclasses import dataclass
 
-@dataclass
+from .annuity import annuity_terms, lookup
+
+@dataclass(frozen=True)
 class FinancingInputs:
-    """Container for financing calculation inputs"""
+    """Container for financing calculation inputs (hashable, usable as a cache key)"""
     total_bond_funding: float
     bond_term: int
     bond_interest_rate: float
@@ -15,9 +16,9 @@ class FinancingInputs:
     commercial_term: int
     commercial_interest_rate: float
 
-@dataclass
+@dataclass(frozen=True)
 class YearMetricsInputs:
-    """Container for year metrics calculation inputs"""
+    """Container for year metrics calculation inputs (hashable, usable as a cache key)"""
     year: int
     future_total_revenue: float
     inflation_rate: float
@@ -41,8 +42,13 @@ def calculate_monthly_payment(principal: float, rate: float, months: int) -> flo
     """
     if principal <= 0:
         return 0
-    monthly_rate = rate / (12 * 100)
-    return principal * (monthly_rate * (1 + monthly_rate)**months) / ((1 + monthly_rate)**months - 1)
+    factors = lookup(rate, months)
+    if factors is None:
+        monthly_rate = rate / (12 * 100)
+        if monthly_rate == 0:
+            return principal / months
+        factors = annuity_terms(monthly_rate, months)
+    return principal * factors[0] / factors[1]
 
 def calculate_financing_metrics(inputs: FinancingInputs) -> Dict[str, float]:
     """
@@ -0,0 +1,255 @@
+"""
+Command-line batch runner for the Daleview Pool Financial Calculator.
+Streams scenario rows from CSV or Parquet through the calculation engine without Streamlit.
+
+Usage:
+    python -m src.cli scenarios.csv results.csv [--horizon 20] [--chunk-size 100000] [--money cents]
+        [--pools pools.csv]
+
+Input columns named after scenario parameters (see src.scenarios) are used
+as inputs; any other columns, such as a scenario id, are copied to the output.
+Missing parameters fall back to the calculator defaults. With --money cents
+every amount is computed in exact integer cents (see src.money) and written
+as dollars with two decimals. With --pools every scenario row is evaluated
+for each pool in a pool file (see src.portfolio), pool by pool within each chunk.
+"""
+import argparse
+import csv
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+
+from .money import MONEY_MODES, to_dollars
+from .portfolio import POOL_PARAMETERS, Portfolio, cross_params, load_portfolio
+from .scenarios import (
+    INTEGER_PARAMETERS, OPERATING_PARAMETERS, SCENARIO_PARAMETERS, default_scenario, evaluate_scenarios
+)
+
+INPUT_PARAMETERS = {**SCENARIO_PARAMETERS, **OPERATING_PARAMETERS}
+DEFAULT_REPORT_YEARS = (0, 5, 10, 15, 20)
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(('.parquet', '.pq'))
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet files require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Read a scenario file in fixed-size chunks of columns.
+
+    Args:
+        path: CSV or Parquet file path
+        chunk_size: Maximum rows per chunk
+
+    Yields:
+        Dictionary mapping column name to an array of that chunk's values
+    """
+    if _is_parquet(path):
+        pa = _import_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in batch.schema.names}
+        return
+
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                return
+            # Cells missing from short rows are blank, so they fall back to the defaults
+            yield {
+                name: np.array([row[index] if index < len(row) else '' for row in rows], dtype=object)
+                for index, name in enumerate(header)
+            }
+
+def _parse_parameter(name: str, values: np.ndarray, default: float) -> np.ndarray:
+    """Convert a raw column to numbers, filling blank cells with the default"""
+    if values.dtype == object:
+        values = np.where(values == '', default, values)
+    parsed = values.astype(float)
+    parsed[np.isnan(parsed)] = default
+    return parsed.astype(np.int64) if name in INTEGER_PARAMETERS else parsed
+
+def evaluate_chunk(
+    columns: Dict[str, np.ndarray],
+    horizon: int = 20,
+    report_years: Sequence[int] = DEFAULT_REPORT_YEARS,
+    money_mode: str = 'float',
+    portfolio: Optional[Portfolio] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate one chunk of scenario rows.
+
+    Args:
+        columns: Raw input columns from read_chunks
+        horizon: Last projection year
+        report_years: Years whose operating surplus is written out
+        money_mode: 'float' or 'cents'; amounts are written in dollars either way
+        portfolio: Pools to evaluate every row for, instead of the calculator's own pool
+
+    Returns:
+        Dictionary of pass-through columns followed by result columns
+
+    Raises:
+        ValueError: If the result columns do not line up row for row
+    """
+    rows = len(next(iter(columns.values())))
+    defaults = default_scenario()
+    params = {
+        name: _parse_parameter(name, values, defaults[name])
+        for name, values in columns.items() if name in INPUT_PARAMETERS
+    }
+    passthrough = {name: values for name, values in columns.items() if name not in INPUT_PARAMETERS}
+    # A file without parameter columns is the default scenario on every row;
+    # give one parameter a value per row so each row still gets a result
+    scenarios = params or {'total_cost': np.full(rows, defaults['total_cost'])}
+    output = {}
+    if portfolio is not None:
+        scenarios, _ = cross_params(portfolio, scenarios)
+        params = {name: values for name, values in scenarios.items() if name in params or name in POOL_PARAMETERS}
+        passthrough = {name: np.tile(values, portfolio.size) for name, values in passthrough.items()}
+        output['pool'] = np.repeat(np.array(portfolio.pools, dtype=object), rows)
+    results = evaluate_scenarios(scenarios, horizon=horizon, money_mode=money_mode)
+    surplus = results.projections['Operating Surplus']
+    dollars = to_dollars if money_mode == 'cents' else (lambda values: values)
+
+    output.update(passthrough)
+    output.update(params)
+    output.update({name: dollars(values) for name, values in results.metrics.items()})
+    for year in report_years:
+        if year <= horizon:
+            output[f'surplus_year_{year}'] = dollars(surplus[:, year])
+    deficit = surplus < 0
+    output['min_surplus'] = dollars(surplus.min(axis=1))
+    output['first_deficit_year'] = np.where(deficit.any(axis=1), deficit.argmax(axis=1), -1)
+    # Writers zip the columns together, so a short column would mislabel rows
+    if len({len(values) for values in output.values()}) != 1:
+        raise ValueError("result columns differ in length")
+    return output
+
+def _csv_format(values: np.ndarray) -> str:
+    """Get the %-format for one output column: cents for money, plain integers and text"""
+    if values.dtype.kind in 'iub':
+        return '%d'
+    if values.dtype.kind == 'f':
+        return '%.2f'
+    return '%s'
+
+def _csv_text(values: np.ndarray) -> List[str]:
+    """Quote text cells that contain separators, as the csv module would"""
+    return ['"' + v.replace('"', '""') + '"' if any(c in v for c in ',"\n') else v
+            for v in map(str, values.tolist())]
+
+class CsvResultWriter:
+    """Append result chunks to a CSV file"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', newline='')
+        self._header: Optional[List[str]] = None
+        self._row_format = ''
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append one chunk of result columns"""
+        if self._header is None:
+            self._header = list(columns)
+            csv.writer(self._file).writerow(self._header)
+            self._row_format = ','.join(_csv_format(columns[name]) for name in self._header) + '\n'
+        # One %-format per row is several times faster than csv.writer's float repr
+        cells = [
+            _csv_text(columns[name]) if columns[name].dtype.kind not in 'iubf' else columns[name].tolist()
+            for name in self._header
+        ]
+        self._file.writelines(self._row_format % row for row in zip(*cells))
+
+    def close(self) -> None:
+        """Flush and close the output file"""
+        self._file.close()
+
+class ParquetResultWriter:
+    """Append result chunks to a Parquet file as row groups"""
+
+    def __init__(self, path: str):
+        self._pa = _import_pyarrow()
+        self._path = path
+        self._writer = None
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append one chunk of result columns"""
+        table = self._pa.table({name: values for name, values in columns.items()})
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        """Flush and close the output file"""
+        if self._writer is not None:
+            self._writer.close()
+
+def run(input_path: str, output_path: str, chunk_size: int = 100_000, horizon: int = 20,
+        report_years: Sequence[int] = DEFAULT_REPORT_YEARS, money_mode: str = 'float',
+        pools_path: Optional[str] = None) -> int:
+    """
+    Stream every scenario in input_path through the engine into output_path.
+
+    Args:
+        input_path: CSV or Parquet scenario file
+        output_path: CSV or Parquet result file
+        chunk_size: Rows evaluated at a time; bounds memory use
+        horizon: Last projection year
+        report_years: Years whose operating surplus is written out
+        money_mode: 'float' for float dollars or 'cents' for exact integer-cents results
+        pools_path: Optional CSV or JSON pool file; every scenario is evaluated for each pool
+
+    Returns:
+        Number of scenarios written
+    """
+    portfolio = load_portfolio(pools_path) if pools_path else None
+    if portfolio is not None:
+        # Each scenario row becomes one output row per pool
+        chunk_size = max(1, chunk_size // portfolio.size)
+    writer = ParquetResultWriter(output_path) if _is_parquet(output_path) else CsvResultWriter(output_path)
+    rows = 0
+    try:
+        for columns in read_chunks(input_path, chunk_size):
+            output = evaluate_chunk(columns, horizon, report_years, money_mode, portfolio)
+            writer.write(output)
+            rows += len(output['future_surplus'])
+    finally:
+        writer.close()
+    return rows
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description='Evaluate Daleview Pool scenarios from a CSV or Parquet file.'
+    )
+    parser.add_argument('input', help='scenario file (.csv or .parquet)')
+    parser.add_argument('output', help='result file (.csv or .parquet)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='rows evaluated at a time')
+    parser.add_argument('--horizon', type=int, default=20, help='last projection year')
+    parser.add_argument('--years', type=int, nargs='+', default=list(DEFAULT_REPORT_YEARS),
+                        help='years whose operating surplus is written out')
+    parser.add_argument('--money', choices=MONEY_MODES, default='float',
+                        help='compute in float dollars or in exact integer cents')
+    parser.add_argument('--pools', help='pool file (.csv or .json) to evaluate every scenario for each pool')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = run(args.input, args.output, args.chunk_size, args.horizon, args.years, args.money, args.pools)
+    print(f"Wrote {rows:,} scenarios to {args.output} in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Memory-mapped columnar store for the Daleview Pool Financial Calculator.
+Writes sweep results as one raw binary file per column and reopens them zero-copy with numpy.memmap.
+
+A store is a directory holding <column>.bin files of native-endian values
+and a columns.json file with the row count, the dtype of each column and
+any attributes recorded by the writer. columns.json is rewritten after
+every chunk, so an interrupted sweep still opens with the rows written so far.
+"""
+import json
+import os
+import shutil
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+META_FILE = 'columns.json'
+FORMAT_VERSION = 1
+
+# Directory of derived data, such as sorted indexes, removed when a store is overwritten
+INDEX_DIRECTORY = 'index'
+
+# Suffix that marks an output path as a column store rather than a file
+STORE_SUFFIX = '.cols'
+
+RowSelection = Union[slice, np.ndarray, None]
+
+def is_column_store(path: str) -> bool:
+    """Check whether a path names a column store"""
+    return path.rstrip('/\\').lower().endswith(STORE_SUFFIX) or os.path.isfile(os.path.join(path, META_FILE))
+
+class ColumnStoreWriter:
+    """Append result chunks to a column store, one binary file per column"""
+
+    def __init__(self, path: str, attributes: Optional[Mapping[str, Any]] = None, overwrite: bool = False):
+        """
+        Create an empty store.
+
+        Args:
+            path: Store directory; created if missing
+            attributes: JSON-serializable metadata kept with the store, such as the sweep grid
+            overwrite: Replace the columns of an existing store
+
+        Raises:
+            FileExistsError: If path already holds a store and overwrite is False
+        """
+        if os.path.exists(os.path.join(path, META_FILE)):
+            if not overwrite:
+                raise FileExistsError(f"Column store already exists: {path}")
+            for name in ColumnStore(path).columns:
+                os.remove(os.path.join(path, f'{name}.bin'))
+            shutil.rmtree(os.path.join(path, INDEX_DIRECTORY), ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.rows = 0
+        # Identifies this write of the store, so data derived from an earlier one is not reused
+        self.generation = uuid.uuid4().hex
+        self._attributes = dict(attributes or {})
+        self._dtypes: Optional[Dict[str, np.dtype]] = None
+        self._files: Dict[str, Any] = {}
+        self._write_meta()
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Append one chunk of result columns.
+
+        Raises:
+            ValueError: If the chunk's columns or lengths differ from the first chunk's
+        """
+        arrays = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("All columns in a chunk must have the same length")
+
+        if self._dtypes is None:
+            self._dtypes = {name: values.dtype for name, values in arrays.items()}
+            for name, dtype in self._dtypes.items():
+                if dtype.hasobject:
+                    raise ValueError(f"Column {name} holds Python objects; only numeric columns can be stored")
+                self._files[name] = open(os.path.join(self.path, f'{name}.bin'), 'wb')
+        elif list(arrays) != list(self._dtypes):
+            raise ValueError("Chunk columns differ from the store's columns")
+
+        for name, values in arrays.items():
+            np.ascontiguousarray(values, dtype=self._dtypes[name]).tofile(self._files[name])
+            self._files[name].flush()
+        self.rows += lengths.pop()
+        self._write_meta()
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Record JSON-serializable metadata with the store, replacing earlier values"""
+        self._attributes.update(attributes)
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': self.rows,
+            'generation': self.generation,
+            'columns': {name: dtype.str for name, dtype in (self._dtypes or {}).items()},
+            'attributes': self._attributes
+        }
+        # Replace atomically so readers never see a partial file
+        temporary = os.path.join(self.path, META_FILE + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temporary, os.path.join(self.path, META_FILE))
+
+    def close(self) -> None:
+        """Close the column files"""
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self) -> 'ColumnStoreWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class ColumnStore:
+    """
+    Read-only view of a column store.
+
+    Columns are numpy memmaps over the files on disk, so opening a store and
+    slicing a column only reads the pages that are touched.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported column store version: {meta.get('version')}")
+        self.path = path
+        self.rows: int = meta['rows']
+        self.generation: Optional[str] = meta.get('generation')
+        self.attributes: Dict[str, Any] = meta['attributes']
+        self.dtypes: Dict[str, np.dtype] = {name: np.dtype(code) for name, code in meta['columns'].items()}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in the order they were written"""
+        return list(self.dtypes)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.dtypes
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Get a whole column as a read-only memmap"""
+        if name not in self.dtypes:
+            raise KeyError(f"Unknown column: {name}")
+        if name not in self._columns:
+            if self.rows == 0:
+                self._columns[name] = np.empty(0, dtype=self.dtypes[name])
+            else:
+                # Rows past the recorded count belong to a chunk still being written
+                self._columns[name] = np.memmap(
+                    os.path.join(self.path, f'{name}.bin'), dtype=self.dtypes[name], mode='r', shape=(self.rows,)
+                )
+        return self._columns[name]
+
+    def select(self, columns: Optional[Sequence[str]] = None, rows: RowSelection = None) -> Dict[str, np.ndarray]:
+        """
+        Read some rows of some columns into memory.
+
+        Args:
+            columns: Column names; defaults to every column
+            rows: Slice, integer indices or boolean mask; defaults to every row
+
+        Returns:
+            Dictionary of in-memory arrays
+        """
+        selection = slice(None) if rows is None else rows
+        return {name: np.array(self[name][selection]) for name in (columns or self.columns)}
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None, rows: RowSelection = None) -> 'pd.DataFrame':
+        """Read some rows of some columns into a DataFrame"""
+        import pandas as pd
+
+        return pd.DataFrame(self.select(columns, rows))
+
+    def chunks(self, chunk_size: int = 1_000_000, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over consecutive blocks of rows without loading the store.
+
+        Args:
+            chunk_size: Rows per block
+            columns: Column names; defaults to every column
+
+        Yields:
+            Dictionary of memmap slices for each block
+        """
+        names = list(columns or self.columns)
+        for start in range(0, self.rows, chunk_size):
+            yield {name: self[name][start:start + chunk_size] for name in names}
@@ -1,13 +1,19 @@
 """
 Chart components for the Daleview Pool Financial Calculator.
 Handles all data visualization using Plotly.
+
+Plotly and pandas are imported inside each render function so that they are
+only loaded once a chart or table is actually drawn.
 """
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, Dict, Sequence, Tuple
 from dataclasses import dataclass
 from .. import styles
+from ..instrumentation import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 COLUMN_NAMES = {
     'YEAR': 'Year',
@@ -25,6 +31,21 @@ CHART_METRICS = {
     COLUMN_NAMES['OPERATING_SURPLUS']: 'surplus'
 }
 
+# Display formats for numeric table columns (printf-style, applied by the
+# browser); the underlying values stay numeric
+TABLE_FORMATS = {
+    COLUMN_NAMES['YEAR']: "Year %d",
+    COLUMN_NAMES['REVENUE']: "$%,d",
+    COLUMN_NAMES['OPERATING_EXPENSES']: "$%,d",
+    COLUMN_NAMES['DEBT_SERVICE']: "$%,d",
+    COLUMN_NAMES['DEBT_PERCENTAGE']: "%d%%",
+    COLUMN_NAMES['OPERATING_SURPLUS']: "$%,d",
+    'Payment': "$%,d",
+    'Interest': "$%,d",
+    'Principal': "$%,d",
+    'Balance': "$%,d"
+}
+
 @dataclass
 class ChartDimensions:
     """Container for chart dimension calculations"""
@@ -45,7 +66,184 @@ class ChartDimensions:
             'r': self.margin_right
         }
 
-def render_funding_sources_chart(funding_data: pd.DataFrame, container_width: Optional[int] = None) -> None:
+def _figure_from_skeleton(skeleton: Dict[str, Any], trace_data: Sequence[Dict[str, Any]]):
+    """
+    Build a figure from a cached skeleton with only the trace data swapped in.
+    
+    The skeleton was validated by Plotly when it was built, so the figure is
+    assembled without validating every property again. The skeleton itself
+    is shared between sessions and is never modified.
+    
+    Args:
+        skeleton: Figure dictionary with layout and styled, empty traces
+        trace_data: Data properties (x, y, values...) for each trace in order
+    
+    Returns:
+        Plotly Figure ready for st.plotly_chart
+    """
+    import plotly.graph_objects as go
+    
+    return go.Figure({
+        'data': [{**trace, **data} for trace, data in zip(skeleton['data'], trace_data)],
+        'layout': skeleton['layout']
+    }, _validate=False)
+
+@lru_cache(maxsize=None)
+def _funding_sources_skeleton(height: int) -> Dict[str, Any]:
+    """Funding sources pie layout and styling, built once per chart height"""
+    import plotly.graph_objects as go
+    
+    dims = ChartDimensions(width=800, height=height)
+    fig = go.Figure(data=[go.Pie(
+        hole=.3,
+        textposition='outside',
+        textinfo='percent+label',
+        showlegend=True,
+        marker=dict(colors=styles.CHART_COLORS['funding_sources']),
+        hovertemplate="%{label}<br>$%{value:,.0f}<br>%{percent}<extra></extra>"
+    )])
+    fig.update_layout(
+        height=dims.height,
+        margin=dims.margins,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12
+        )
+    )
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _trends_skeleton(labels: Tuple[str, ...]) -> Dict[str, Any]:
+    """Financial trends layout and one styled line per metric, built once per set of metrics"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    for display_label in labels:
+        fig.add_trace(go.Scatter(
+            name=display_label,
+            line=dict(color=styles.CHART_COLORS['trends'][CHART_METRICS[display_label]]),
+            hovertemplate=f"{display_label}: ${'%{y:,.0f}'}<extra></extra>"
+        ))
+    
+    # Years stay numeric; the axis adds the "Year " prefix to ticks and hover
+    fig.update_layout(
+        title='20-Year Financial Trends',
+        xaxis_title='Year',
+        yaxis_title='Amount ($)',
+        height=400,
+        showlegend=True,
+        hovermode='x unified',
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12
+        ),
+        xaxis=dict(
+            tickprefix="Year "
+        ),
+        yaxis=dict(
+            tickformat="$,.0f"
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig.to_dict()
+
+def _axis_format(value_format: str) -> Dict[str, str]:
+    """Convert a Python format string such as "${:,.0f}" to Plotly axis tick settings"""
+    prefix, rest = value_format.split('{', 1)
+    spec, suffix = rest.split('}', 1)
+    return {'tickprefix': prefix, 'tickformat': spec.lstrip(':'), 'ticksuffix': suffix}
+
+def _table_format(value_format: str) -> str:
+    """Convert a Python format string such as "${:,.0f}" to a printf-style table column format"""
+    prefix, rest = value_format.split('{', 1)
+    spec, suffix = rest.split('}', 1)
+    spec = spec.lstrip(':')
+    if spec.endswith('.0f'):
+        spec = spec[:-3] + 'd'
+    return f"{prefix}%{spec}{suffix.replace('%', '%%')}"
+
+@lru_cache(maxsize=None)
+def _surplus_heatmap_skeleton(x_label: str, x_format: str, y_label: str, y_format: str) -> Dict[str, Any]:
+    """Surplus heatmap layout, color scale and current-scenario marker, built once per pair of inputs"""
+    import plotly.graph_objects as go
+    
+    x_axis, y_axis = _axis_format(x_format), _axis_format(y_format)
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        colorscale='RdYlGn',
+        zmid=0,
+        colorbar=dict(title='Surplus', tickprefix='$', tickformat=',.0f'),
+        hovertemplate=(
+            f"{x_label}: {x_axis['tickprefix']}%{{x:{x_axis['tickformat']}}}{x_axis['ticksuffix']}<br>"
+            f"{y_label}: {y_axis['tickprefix']}%{{y:{y_axis['tickformat']}}}{y_axis['ticksuffix']}<br>"
+            "Operating surplus: $%{z:,.0f}<extra></extra>"
+        )
+    ))
+    fig.add_trace(go.Scatter(
+        mode='markers',
+        name='Current inputs',
+        showlegend=False,
+        marker=dict(size=12, symbol='x', color='black'),
+        hovertemplate="Current inputs<extra></extra>"
+    ))
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        height=450,
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis=x_axis,
+        yaxis=y_axis,
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12
+        )
+    )
+    return fig.to_dict()
+
+@lru_cache(maxsize=None)
+def _tornado_skeleton(year: int) -> Dict[str, Any]:
+    """Tornado chart layout and the downside and upside bars, built once per year"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    for side, name in (('low', 'Lowest surplus'), ('high', 'Highest surplus')):
+        fig.add_trace(go.Bar(
+            orientation='h',
+            name=name,
+            marker=dict(color=styles.CHART_COLORS['tornado'][side]),
+            hovertemplate=f"%{{y}} at %{{customdata}}<br>Year {year} surplus: $%{{text:,.0f}}<extra></extra>",
+            textposition='none'
+        ))
+    fig.update_layout(
+        barmode='overlay',
+        xaxis_title=f'Year {year} Operating Surplus',
+        height=450,
+        margin=dict(t=20, b=20, l=20, r=20),
+        xaxis=dict(tickprefix="$", tickformat=",.0f"),
+        yaxis=dict(autorange='reversed'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hoverlabel=dict(
+            bgcolor="white",
+            font_size=12
+        )
+    )
+    return fig.to_dict()
+
+@timed
+def render_funding_sources_chart(funding_data: 'pd.DataFrame', container_width: Optional[int] = None) -> None:
     """
     Render funding sources pie chart with responsive sizing.
     
@@ -54,6 +252,8 @@ def render_funding_sources_chart(funding_data: pd.DataFrame, container_width: Op
         container_width: Optional width to make chart responsive
     """
     try:
+        import pandas as pd
+        
         # Validate input data
         if not isinstance(funding_data, pd.DataFrame):
             raise ValueError("funding_data must be a pandas DataFrame")
@@ -71,34 +271,11 @@ def render_funding_sources_chart(funding_data: pd.DataFrame, container_width: Op
             height=min(400, container_width * 0.6 if container_width else 400)
         )
         
-        # Create pie chart
-        fig = go.Figure(data=[go.Pie(
-            labels=funding_data['Source'],
-            values=funding_data['Amount'],
-            hole=.3,
-            textposition='outside',
-            textinfo='percent+label',
-            showlegend=True,
-            marker=dict(colors=styles.CHART_COLORS['funding_sources']),
-            hovertemplate="%{label}<br>$%{value:,.0f}<br>%{percent}<extra></extra>"
-        )])
-        
-        # Update layout
-        fig.update_layout(
-            height=dims.height,
-            margin=dims.margins,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12
-            )
-        )
+        # Only the slices change between reruns; the layout is cached
+        fig = _figure_from_skeleton(_funding_sources_skeleton(int(dims.height)), [{
+            'labels': funding_data['Source'].tolist(),
+            'values': funding_data['Amount'].to_numpy()
+        }])
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -106,7 +283,49 @@ def render_funding_sources_chart(funding_data: pd.DataFrame, container_width: Op
         st.error(f"Error rendering funding sources chart: {str(e)}")
         st.write("Please check your data and try again.")
 
-def render_projections_table(projections: pd.DataFrame) -> None:
+@timed
+def render_number_table(table: 'pd.DataFrame', formats: Optional[Dict[str, str]] = None) -> None:
+    """
+    Render a table of numbers with per-column display formats.
+    
+    Values are sent to the browser as numbers and formatted there through
+    column configuration, so no cell is converted to a string in Python and
+    long multi-scenario tables cost no more to prepare than short ones.
+    Whole-number formats are rounded first, as the browser truncates them.
+    
+    Args:
+        table: DataFrame to display
+        formats: Format strings by column name, overriding TABLE_FORMATS
+    """
+    import pandas as pd
+    
+    if not isinstance(table, pd.DataFrame):
+        raise ValueError("table must be a pandas DataFrame")
+    
+    formats = {
+        column: column_format
+        for column, column_format in {**TABLE_FORMATS, **(formats or {})}.items()
+        if column in table.columns
+    }
+    whole_numbers = [
+        column for column, column_format in formats.items()
+        if column_format.rstrip('%').endswith('d') and pd.api.types.is_float_dtype(table[column])
+    ]
+    if whole_numbers:
+        table = table.round({column: 0 for column in whole_numbers})
+    
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            column: st.column_config.NumberColumn(format=column_format)
+            for column, column_format in formats.items()
+        }
+    )
+
+@timed
+def render_projections_table(projections: 'pd.DataFrame') -> None:
     """
     Render the financial projections table with formatted values.
     
@@ -114,37 +333,50 @@ def render_projections_table(projections: pd.DataFrame) -> None:
         projections: DataFrame containing year-by-year projections
     """
     try:
-        if not isinstance(projections, pd.DataFrame):
-            raise ValueError("projections must be a pandas DataFrame")
+        render_number_table(projections)
         
-        display_df = projections.copy()
-        
-        # Format currency columns with consistent names
-        currency_columns = ['Revenue', 'Operating Expenses', 'Debt Service', 'Operating Surplus']
-        for col in currency_columns:
-            if col in display_df.columns:
-                # Format as currency with no decimal places
-                display_df[col] = display_df[col].apply(lambda x: f"${int(round(x)):,}")
-        
-        # Format percentage column as whole number
-        if 'Debt % of Costs' in display_df.columns:
-            display_df['Debt % of Costs'] = display_df['Debt % of Costs'].apply(lambda x: f"{int(round(x))}%")
-        
-        # Format year column
-        if 'Year' in display_df.columns:
-            display_df['Year'] = display_df['Year'].apply(lambda x: f"Year {x}")
+    except Exception as e:
+        st.error(f"Error rendering projections table: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_amortization_table(schedule: 'pd.DataFrame') -> None:
+    """
+    Render an annual amortization schedule with formatted values.
+    
+    Args:
+        schedule: DataFrame with Year, Payment, Interest, Principal and Balance columns
+    """
+    try:
+        render_number_table(schedule)
         
-        st.dataframe(
-            display_df,
-            hide_index=True,
-            use_container_width=True
-        )
+    except Exception as e:
+        st.error(f"Error rendering amortization schedule: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_sweep_rows(rows: 'pd.DataFrame', labels: Dict[str, Tuple[str, str]]) -> None:
+    """
+    Render rows read from a stored sweep.
+    
+    Args:
+        rows: DataFrame of stored columns, indexed by row number
+        labels: (label, Python display format) of each column
+    """
+    try:
+        table = rows.rename(columns={name: labels[name][0] for name in rows.columns})
+        table.insert(0, 'Row', rows.index)
+        render_number_table(table, formats={
+            'Row': "%d",
+            **{labels[name][0]: _table_format(labels[name][1]) for name in rows.columns}
+        })
         
     except Exception as e:
-        st.error(f"Error rendering projections table: {str(e)}")
+        st.error(f"Error rendering sweep rows: {str(e)}")
         st.write("Please check your data and try again.")
 
-def render_trends_chart(projections: pd.DataFrame) -> None:
+@timed
+def render_trends_chart(projections: 'pd.DataFrame') -> None:
     """
     Render the financial trends chart showing key metrics over time.
     
@@ -152,59 +384,217 @@ def render_trends_chart(projections: pd.DataFrame) -> None:
         projections: DataFrame containing year-by-year projections
     """
     try:
+        import pandas as pd
+        
         if not isinstance(projections, pd.DataFrame):
             raise ValueError("projections must be a pandas DataFrame")
         
-        # Create figure
-        fig = go.Figure()
+        # Only the series change between reruns; the layout and styling are cached
+        labels = tuple(label for label in CHART_METRICS if label in projections.columns)
+        years = projections['Year'].to_numpy()
+        fig = _figure_from_skeleton(_trends_skeleton(labels), [
+            {'x': years, 'y': projections[label].to_numpy(dtype=float)} for label in labels
+        ])
         
-        # Define metrics mapping (updated to match the actual column names)
-        metrics = {
-            'Revenue': 'revenue',
-            'Operating Expenses': 'expenses',
-            'Debt Service': 'debt',
-            'Operating Surplus': 'surplus'
-        }
+        st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error rendering trends chart: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_deficit_probability_chart(probabilities: 'pd.DataFrame') -> None:
+    """
+    Render the Monte Carlo probability of deficit by year.
+    
+    Args:
+        probabilities: DataFrame with Year and Probability of Deficit columns
+    """
+    try:
+        import pandas as pd
+        import plotly.graph_objects as go
+        
+        if not isinstance(probabilities, pd.DataFrame):
+            raise ValueError("probabilities must be a pandas DataFrame")
+        
+        fig = go.Figure(data=[go.Bar(
+            x=probabilities['Year'],
+            y=probabilities['Probability of Deficit'],
+            marker=dict(color=styles.CHART_COLORS['trends']['expenses']),
+            hovertemplate="Year %{x}<br>%{y:.1f}% chance of deficit<extra></extra>"
+        )])
         
-        # Add traces for each metric
-        for display_label, color_key in metrics.items():
-            if display_label in projections.columns:
-                fig.add_trace(go.Scatter(
-                    x=projections['Year'].apply(lambda x: f"Year {x}"),
-                    y=projections[display_label],
-                    name=display_label,
-                    line=dict(color=styles.CHART_COLORS['trends'][color_key]),
-                    hovertemplate=f"{display_label}: ${'%{y:,.0f}'}<extra></extra>"
-                ))
-        
-        # Update layout
         fig.update_layout(
-            title='20-Year Financial Trends',
             xaxis_title='Year',
-            yaxis_title='Amount ($)',
-            height=400,
-            showlegend=True,
-            hovermode='x unified',
+            yaxis_title='Probability of Deficit',
+            height=350,
+            margin=dict(t=20, b=20, l=20, r=20),
+            yaxis=dict(
+                range=[0, 100],
+                ticksuffix="%"
+            ),
             hoverlabel=dict(
                 bgcolor="white",
                 font_size=12
+            )
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error rendering deficit probability chart: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_funding_frontier_chart(frontier: 'pd.DataFrame', current: Dict[str, float]) -> None:
+    """
+    Render the Pareto frontier of funding mixes.
+    
+    Args:
+        frontier: DataFrame of frontier mixes with member_burden,
+            total_cost_of_borrowing, min_surplus and the funding inputs
+        current: Member burden and total cost of borrowing of the current mix
+    """
+    try:
+        import pandas as pd
+        import plotly.graph_objects as go
+        
+        if not isinstance(frontier, pd.DataFrame):
+            raise ValueError("frontier must be a pandas DataFrame")
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=frontier['member_burden'],
+            y=frontier['total_cost_of_borrowing'],
+            mode='markers',
+            name='Pareto-optimal mixes',
+            marker=dict(
+                size=7,
+                color=frontier['min_surplus'],
+                colorscale='RdYlGn',
+                cmid=0,
+                colorbar=dict(title='Min Surplus', tickprefix='$', tickformat=',.0f')
             ),
-            yaxis=dict(
-                tickformat="$,.0f"
-            ),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
+            customdata=frontier[[
+                'assessment_per_member', 'bond_participants', 'avg_bond_amount',
+                'bond_term', 'commercial_term', 'min_surplus'
+            ]],
+            hovertemplate=(
+                "Assessment: $%{customdata[0]:,.0f}<br>"
+                "Bonds: %{customdata[1]} x $%{customdata[2]:,.0f} over %{customdata[3]} years<br>"
+                "Commercial loan: %{customdata[4]} years<br>"
+                "Cost of borrowing: $%{y:,.0f}<br>"
+                "Minimum surplus: $%{customdata[5]:,.0f}<extra></extra>"
+            )
+        ))
+        fig.add_trace(go.Scatter(
+            x=[current['member_burden']],
+            y=[current['total_cost_of_borrowing']],
+            mode='markers',
+            name='Current mix',
+            marker=dict(size=14, symbol='x', color=styles.CHART_COLORS['trends']['debt']),
+            hovertemplate="Current mix<br>Cost of borrowing: $%{y:,.0f}<extra></extra>"
+        ))
+        
+        fig.update_layout(
+            xaxis_title='Member Burden (assessment + bond funding per member)',
+            yaxis_title='Total Cost of Borrowing',
+            height=450,
+            margin=dict(t=20, b=20, l=20, r=20),
+            xaxis=dict(tickprefix="$", tickformat=",.0f"),
+            yaxis=dict(tickprefix="$", tickformat=",.0f"),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0),
+            hoverlabel=dict(
+                bgcolor="white",
+                font_size=12
             )
         )
         
         st.plotly_chart(fig, use_container_width=True)
         
     except Exception as e:
-        st.error(f"Error rendering trends chart: {str(e)}")
+        st.error(f"Error rendering funding frontier chart: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_surplus_heatmap(
+    surplus: 'pd.DataFrame',
+    x_label: str,
+    x_format: str,
+    y_label: str,
+    y_format: str,
+    current: Tuple[float, float]
+) -> None:
+    """
+    Render the operating surplus over a grid of two inputs.
+    
+    Args:
+        surplus: DataFrame of surplus values with the y input values as the
+            index and the x input values as the columns
+        x_label: Display name of the x input
+        x_format: Python format string for x values, e.g. "${:,.0f}"
+        y_label: Display name of the y input
+        y_format: Python format string for y values
+        current: Current (x, y) input values, marked on the chart
+    """
+    try:
+        import numpy as np
+        import pandas as pd
+        
+        if not isinstance(surplus, pd.DataFrame):
+            raise ValueError("surplus must be a pandas DataFrame")
+        
+        # Only the grid and marker change between reruns; the layout is cached.
+        # Single precision halves the payload and is exact to well under a dollar.
+        fig = _figure_from_skeleton(_surplus_heatmap_skeleton(x_label, x_format, y_label, y_format), [
+            {
+                'x': surplus.columns.to_numpy(),
+                'y': surplus.index.to_numpy(),
+                'z': surplus.to_numpy(dtype=np.float32)
+            },
+            {'x': [current[0]], 'y': [current[1]]}
+        ])
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error rendering surplus heatmap: {str(e)}")
+        st.write("Please check your data and try again.")
+
+@timed
+def render_tornado_chart(tornado: 'pd.DataFrame', base_surplus: float, year: int) -> None:
+    """
+    Render the one-at-a-time sensitivity of the surplus as a tornado chart.
+    
+    Args:
+        tornado: DataFrame with Input, Low Surplus, High Surplus, Low Value and
+            High Value columns, largest swing first; values are display strings
+        base_surplus: Surplus of the current scenario, where the bars meet
+        year: Projection year of the surplus
+    """
+    try:
+        import pandas as pd
+        
+        if not isinstance(tornado, pd.DataFrame):
+            raise ValueError("tornado must be a pandas DataFrame")
+        
+        # Bars grow left and right from the current surplus
+        labels = tornado['Input'].tolist()
+        fig = _figure_from_skeleton(_tornado_skeleton(year), [
+            {
+                'y': labels,
+                'x': tornado[f'{side} Surplus'].to_numpy(dtype=float) - base_surplus,
+                'base': base_surplus,
+                'text': tornado[f'{side} Surplus'].to_numpy(dtype=float),
+                'customdata': tornado[f'{side} Value'].to_numpy()
+            }
+            for side in ('Low', 'High')
+        ])
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Error rendering tornado chart: {str(e)}")
         st.write("Please check your data and try again.")
 
 def format_currency(value: float) -> str:
@@ -3,9 +3,51 @@ Input components for the Daleview Pool Financial Calculator.
 Handles all user input sections and validation.
 """
 import streamlit as st
-from typing import Dict, Union
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 from .. import config
+from ..scenarios import SCENARIO_PARAMETERS
+from ..instrumentation import timed
+from ..query import OPERATORS, Condition, no_deficit_through
+from ..sweep import YEAR_METRIC_PREFIXES
 
+# Slider label and display format of every scenario input
+INPUT_LABELS: Dict[str, Tuple[str, str]] = {
+    'members': ("Future Number of Members", "{:,.0f}"),
+    'avg_dues': ("Future Average Dues per Member", "${:,.0f}"),
+    'swim_team': ("Swim Team Revenue", "${:,.0f}"),
+    'winter_swim': ("Winter Swim Revenue", "${:,.0f}"),
+    'other': ("Other Revenue", "${:,.0f}"),
+    'total_cost': ("Total Project Cost", "${:,.0f}"),
+    'assessment_per_member': ("One-Time Assessment per Member", "${:,.0f}"),
+    'bond_participants': ("Number of Bond Participants", "{:,.0f}"),
+    'avg_bond_amount': ("Average Bond Amount", "${:,.0f}"),
+    'bond_interest_rate': ("Bond Interest Rate", "{:.1f}%"),
+    'bond_term': ("Bond Term (Years)", "{:,.0f}"),
+    'commercial_interest_rate': ("Commercial Loan Interest Rate", "{:.1f}%"),
+    'commercial_term': ("Commercial Loan Term (Years)", "{:,.0f}"),
+    'inflation_rate': ("Annual Inflation Rate", "{:.1f}%")
+}
+
+# Label and display format of the per-scenario outcomes stored by a sweep
+SWEEP_OUTCOME_LABELS: Dict[str, Tuple[str, str]] = {
+    'future_surplus': ("Future Surplus", "${:,.0f}"),
+    'final_surplus': ("Final Year Surplus", "${:,.0f}"),
+    'min_surplus': ("Lowest Surplus", "${:,.0f}"),
+    'first_deficit_year': ("First Deficit Year", "{:,.0f}"),
+    'peak_debt_percentage': ("Peak Debt % of Costs", "{:.1f}%"),
+    'total_annual_debt_service': ("Annual Debt Service", "${:,.0f}"),
+    'total_cost_of_borrowing': ("Total Cost of Borrowing", "${:,.0f}")
+}
+
+# Inputs the break-even finder can solve for: (label, display format)
+BREAK_EVEN_PARAMETERS: Dict[str, Tuple[str, str]] = {
+    name: INPUT_LABELS[name] for name in (
+        'avg_dues', 'members', 'assessment_per_member', 'total_cost', 'bond_participants',
+        'avg_bond_amount', 'commercial_interest_rate', 'inflation_rate'
+    )
+}
+
+@timed
 def render_current_revenue_breakdown():
     """Render the current revenue breakdown section"""
     with st.expander("Current Revenue Breakdown", expanded=False):
@@ -23,22 +65,37 @@ def render_current_revenue_breakdown():
             col1.write(key)
             col2.write(value)
 
-def render_economic_assumptions():
-    """Render the economic assumptions section"""
+@timed
+def render_economic_assumptions(on_change: Optional[Callable[[], None]] = None):
+    """
+    Render the economic assumptions section.
+    
+    Args:
+        on_change: Optional callback run when the inflation rate changes
+    """
     with st.expander("Economic Assumptions", expanded=True):
+        inflation_range = config.get_input_range('INFLATION')
         inflation_rate = st.slider(
             "Annual Inflation Rate",
-            min_value=0.0,
-            max_value=5.0,
-            value=2.5,
-            step=0.1,
+            min_value=inflation_range[0],
+            max_value=inflation_range[1],
+            value=config.get_input_default('INFLATION'),
+            step=config.get_input_step('INFLATION'),
             format="%f%%",
-            help="Expected annual inflation rate"
+            help="Expected annual inflation rate",
+            key='inflation_rate',
+            on_change=on_change
         )
     return inflation_rate
 
-def render_future_revenue_model():
-    """Render the future revenue model section"""
+@timed
+def render_future_revenue_model(on_change: Optional[Callable[[], None]] = None):
+    """
+    Render the future revenue model section.
+    
+    Args:
+        on_change: Optional callback run when any revenue input changes
+    """
     with st.expander("Future Revenue Model", expanded=True):
         member_range = config.get_input_range('MEMBERS')
         dues_range = config.get_input_range('DUES')
@@ -48,7 +105,9 @@ def render_future_revenue_model():
             min_value=member_range[0],
             max_value=member_range[1],
             value=config.get_operating_metric('MEMBERS'),
-            step=5
+            step=config.get_input_step('MEMBERS'),
+            key='members',
+            on_change=on_change
         )
         
         future_avg_dues = st.slider(
@@ -56,8 +115,10 @@ def render_future_revenue_model():
             min_value=dues_range[0],
             max_value=dues_range[1],
             value=int(config.get_operating_metric('AVG_DUES')),
-            step=25,
-            format="$%d"
+            step=config.get_input_step('DUES'),
+            format="$%d",
+            key='avg_dues',
+            on_change=on_change
         )
     
     with st.expander("Future Non-Membership Revenue", expanded=False):
@@ -70,8 +131,10 @@ def render_future_revenue_model():
             min_value=swim_range[0],
             max_value=swim_range[1],
             value=config.get_operating_metric('SWIM_TEAM_REVENUE'),
-            step=1000,
-            format="$%d"
+            step=config.get_input_step('SWIM_TEAM'),
+            format="$%d",
+            key='swim_team',
+            on_change=on_change
         )
         
         future_winter_swim = st.slider(
@@ -79,8 +142,10 @@ def render_future_revenue_model():
             min_value=winter_range[0],
             max_value=winter_range[1],
             value=config.get_operating_metric('WINTER_SWIM_REVENUE'),
-            step=1000,
-            format="$%d"
+            step=config.get_input_step('WINTER_SWIM'),
+            format="$%d",
+            key='winter_swim',
+            on_change=on_change
         )
         
         future_other = st.slider(
@@ -88,8 +153,10 @@ def render_future_revenue_model():
             min_value=other_range[0],
             max_value=other_range[1],
             value=config.get_operating_metric('OTHER_REVENUE'),
-            step=1000,
-            format="$%d"
+            step=config.get_input_step('OTHER'),
+            format="$%d",
+            key='other',
+            on_change=on_change
         )
     
     revenue_model = {
@@ -136,8 +203,14 @@ def validate_revenue_model(revenue_model: Dict[str, Union[int, float]]) -> bool:
         st.error(f"Validation error: {e}")
         return False
 
-def render_project_cost_section():
-    """Render the project cost and assessment section"""
+@timed
+def render_project_cost_section(on_change: Optional[Callable[[], None]] = None):
+    """
+    Render the project cost and assessment section.
+    
+    Args:
+        on_change: Optional callback run when the cost or assessment changes
+    """
     with st.expander("Project Cost & Assessment", expanded=True):
         cost_range = config.get_input_range('PROJECT_COST')
         assessment_range = config.get_input_range('ASSESSMENT')
@@ -146,18 +219,22 @@ def render_project_cost_section():
             "Total Project Cost",
             min_value=cost_range[0],
             max_value=cost_range[1],
-            value=2_000_000,
-            step=100_000,
-            format="$%d"
+            value=config.get_input_default('PROJECT_COST'),
+            step=config.get_input_step('PROJECT_COST'),
+            format="$%d",
+            key='total_cost',
+            on_change=on_change
         )
         
         assessment_per_member = st.slider(
             "One-Time Assessment per Member",
             min_value=assessment_range[0],
             max_value=assessment_range[1],
-            value=2_000,
-            step=100,
-            format="$%d"
+            value=config.get_input_default('ASSESSMENT'),
+            step=config.get_input_step('ASSESSMENT'),
+            format="$%d",
+            key='assessment_per_member',
+            on_change=on_change
         )
         
         total_assessment = config.get_operating_metric('MEMBERS') * assessment_per_member
@@ -165,21 +242,33 @@ def render_project_cost_section():
     
     return total_cost, assessment_per_member, total_assessment
 
-def render_financing_options(future_members: int):
+@timed
+def render_financing_options(future_members: int, on_change: Optional[Callable[[], None]] = None):
     """
     Render the financing options section.
     
     Args:
         future_members: Number of future members for bond participation calculation
+        on_change: Optional callback run when any financing input changes
     """
+    # The slider takes its value only from session state, so capping it there
+    # never conflicts with a value= argument. It is written back every run:
+    # a new max_value makes a new widget, which would otherwise start at 0.
+    # Fewer future members than bond participants caps the kept value.
+    st.session_state.bond_participants = min(
+        st.session_state.get('bond_participants', config.get_input_default('BOND_PARTICIPANTS')),
+        future_members
+    )
+    
     with st.expander("Financing Options", expanded=True):
         st.write("**The Footnote (Membership Bond Program)**")
         bond_participants = st.slider(
             "Number of Bond Participants",
             min_value=0,
             max_value=future_members,
-            value=min(100, future_members),
-            step=5
+            step=config.get_input_step('BOND_PARTICIPANTS'),
+            key='bond_participants',
+            on_change=on_change
         )
         
         bond_range = config.get_input_range('BOND')
@@ -187,46 +276,60 @@ def render_financing_options(future_members: int):
             "Average Bond Amount",
             min_value=bond_range[0],
             max_value=bond_range[1],
-            value=5_000,
-            step=500,
-            format="$%d"
+            value=config.get_input_default('BOND'),
+            step=config.get_input_step('BOND'),
+            format="$%d",
+            key='avg_bond_amount',
+            on_change=on_change
         )
         
+        bond_rate_range = config.get_input_range('BOND_RATE')
         bond_interest_rate = st.slider(
             "Bond Interest Rate",
-            min_value=3.0,
-            max_value=8.0,
-            value=5.5,
-            step=0.1,
-            format="%f%%"
+            min_value=bond_rate_range[0],
+            max_value=bond_rate_range[1],
+            value=config.get_input_default('BOND_RATE'),
+            step=config.get_input_step('BOND_RATE'),
+            format="%f%%",
+            key='bond_interest_rate',
+            on_change=on_change
         )
         
+        bond_term_range = config.get_input_range('BOND_TERM')
         bond_term = st.slider(
             "Bond Term (Years)",
-            min_value=5,
-            max_value=15,
-            value=10,
-            step=1,
-            format="%d years"
+            min_value=bond_term_range[0],
+            max_value=bond_term_range[1],
+            value=config.get_input_default('BOND_TERM'),
+            step=config.get_input_step('BOND_TERM'),
+            format="%d years",
+            key='bond_term',
+            on_change=on_change
         )
         
         st.write("**Commercial Loan**")
+        commercial_rate_range = config.get_input_range('COMMERCIAL_RATE')
         commercial_interest_rate = st.slider(
             "Commercial Loan Interest Rate",
-            min_value=5.0,
-            max_value=12.0,
-            value=8.5,
-            step=0.1,
-            format="%f%%"
+            min_value=commercial_rate_range[0],
+            max_value=commercial_rate_range[1],
+            value=config.get_input_default('COMMERCIAL_RATE'),
+            step=config.get_input_step('COMMERCIAL_RATE'),
+            format="%f%%",
+            key='commercial_interest_rate',
+            on_change=on_change
         )
         
+        commercial_term_range = config.get_input_range('COMMERCIAL_TERM')
         commercial_term = st.slider(
             "Commercial Loan Term (Years)",
-            min_value=10,
-            max_value=30,
-            value=20,
-            step=1,
-            format="%d years"
+            min_value=commercial_term_range[0],
+            max_value=commercial_term_range[1],
+            value=config.get_input_default('COMMERCIAL_TERM'),
+            step=config.get_input_step('COMMERCIAL_TERM'),
+            format="%d years",
+            key='commercial_term',
+            on_change=on_change
         )
     
     return {
@@ -236,4 +339,241 @@ def render_financing_options(future_members: int):
         'bond_term': bond_term,
         'commercial_interest_rate': commercial_interest_rate,
         'commercial_term': commercial_term
-    }
\ No newline at end of file
+    }
+
+def scenario_from_state() -> Dict[str, Union[int, float]]:
+    """
+    Read the current scenario from the input widgets' state.
+    
+    Widget keys are the scenario parameter names, so a section can rebuild
+    its inputs during a fragment rerun without the other sections running.
+    
+    Returns:
+        Dictionary with a value for every scenario parameter
+    """
+    return {name: st.session_state[name] for name in SCENARIO_PARAMETERS}
+
+@timed
+def render_break_even_options() -> Tuple[str, int]:
+    """Render the break-even finder options and return (parameter, through year)"""
+    parameter = st.selectbox(
+        "Solve For",
+        options=list(BREAK_EVEN_PARAMETERS),
+        format_func=lambda name: BREAK_EVEN_PARAMETERS[name][0],
+        help="Input to adjust while every other input stays as set"
+    )
+    
+    through_year = st.slider(
+        "No Deficit Through Year",
+        min_value=0,
+        max_value=20,
+        value=5,
+        step=1,
+        help="Last projection year that must keep an operating surplus"
+    )
+    return parameter, through_year
+
+@timed
+def render_heatmap_options() -> Tuple[str, str, int]:
+    """Render the surplus heatmap options and return (x parameter, y parameter, comparison year)"""
+    x_col, y_col = st.columns(2)
+    with x_col:
+        x_parameter = st.selectbox(
+            "Horizontal Axis",
+            options=list(BREAK_EVEN_PARAMETERS),
+            index=list(BREAK_EVEN_PARAMETERS).index('avg_dues'),
+            format_func=lambda name: BREAK_EVEN_PARAMETERS[name][0],
+            help="First input to vary across its full range"
+        )
+    with y_col:
+        y_options = [name for name in BREAK_EVEN_PARAMETERS if name != x_parameter]
+        y_parameter = st.selectbox(
+            "Vertical Axis",
+            options=y_options,
+            index=y_options.index('members') if 'members' in y_options else 0,
+            format_func=lambda name: BREAK_EVEN_PARAMETERS[name][0],
+            help="Second input to vary across its full range"
+        )
+
+    year = st.slider(
+        "Compare With Year",
+        min_value=1,
+        max_value=20,
+        value=20,
+        step=1,
+        help="Projection year shown next to the first year"
+    )
+    return x_parameter, y_parameter, year
+
+def sweep_column_label(name: str) -> Tuple[str, str]:
+    """
+    Get the label and display format of a stored sweep column.
+
+    Args:
+        name: Column name, e.g. members, min_surplus or surplus_year_5
+
+    Returns:
+        (label, display format) tuple
+    """
+    if name in INPUT_LABELS:
+        return INPUT_LABELS[name]
+    if name in SWEEP_OUTCOME_LABELS:
+        return SWEEP_OUTCOME_LABELS[name]
+    prefix, _, year = name.rpartition('_year_')
+    for metric, metric_prefix in YEAR_METRIC_PREFIXES.items():
+        if prefix == metric_prefix and year.isdigit():
+            return f"{metric} Year {year}", "{:.1f}%" if metric_prefix == 'debt_percentage' else "${:,.0f}"
+    # Every other financing metric is a dollar amount
+    return name.replace('_', ' ').title(), "${:,.0f}"
+
+@timed
+def render_query_conditions(
+    columns: Sequence[str],
+    ranges: Dict[str, Tuple[float, float]],
+    horizon: Optional[int] = None
+) -> List[Condition]:
+    """
+    Render the sweep query filters and return the conditions they describe.
+
+    Args:
+        columns: Stored columns that can be filtered on
+        ranges: Smallest and largest value of each indexed column, for defaults
+        horizon: Last year the sweep projected; None for stores that do not
+            record it, which are assumed to use the default of 20 years
+
+    Returns:
+        List of conditions that must all hold
+    """
+    filtered = st.multiselect(
+        "Filter On",
+        options=list(columns),
+        default=[name for name in ('total_cost_of_borrowing',) if name in columns],
+        format_func=lambda name: sweep_column_label(name)[0],
+        help="Columns with an index are looked up without scanning the sweep"
+    )
+
+    conditions = []
+    for name in filtered:
+        label, _ = sweep_column_label(name)
+        low, high = (float(value) for value in ranges.get(name, (0.0, 0.0)))
+        op_col, value_col = st.columns([1, 2])
+        with op_col:
+            op = st.selectbox(label, options=OPERATORS, index=OPERATORS.index('<='), key=f'query_op_{name}')
+        with value_col:
+            if op in ('between', 'outside'):
+                low_col, high_col = st.columns(2)
+                with low_col:
+                    start = st.number_input("From", value=low, key=f'query_low_{name}')
+                with high_col:
+                    stop = st.number_input("To", value=high, key=f'query_high_{name}')
+                value = (start, stop)
+            else:
+                value = st.number_input("Value", value=(low + high) / 2, key=f'query_value_{name}')
+        conditions.append(Condition(name, op, value))
+
+    if 'first_deficit_year' in columns:
+        if st.checkbox("Require a surplus every year", value=True,
+                       help="Keep only scenarios with an operating surplus in every year through the chosen year"):
+            last_year = 20 if horizon is None else horizon
+            through_year = st.slider(
+                "No Deficit Through Year",
+                min_value=0,
+                max_value=last_year,
+                value=last_year,
+                step=1,
+                key='query_through_year',
+                help=f"The sweep projected surpluses through year {last_year}"
+            )
+            conditions.append(no_deficit_through(through_year, horizon))
+    return conditions
+
+@timed
+def render_uncertainty_options(on_change: Optional[Callable[[], None]] = None):
+    """
+    Render the Monte Carlo simulation options section.
+    
+    Args:
+        on_change: Optional callback run when any simulation option changes
+    """
+    with st.expander("Uncertainty Analysis", expanded=False):
+        st.checkbox(
+            "Run Monte Carlo simulation",
+            value=False,
+            help="Simulate random inflation, membership and non-dues revenue paths",
+            key='monte_carlo_enabled',
+            on_change=on_change
+        )
+        
+        st.slider(
+            "Simulated Paths",
+            min_value=1_000,
+            max_value=100_000,
+            value=10_000,
+            step=1_000,
+            key='monte_carlo_paths',
+            on_change=on_change
+        )
+        
+        st.slider(
+            "Inflation Volatility",
+            min_value=0.0,
+            max_value=3.0,
+            value=1.0,
+            step=0.1,
+            format="%f%%",
+            help="Standard deviation of the annual inflation rate",
+            key='inflation_volatility',
+            on_change=on_change
+        )
+        
+        st.slider(
+            "Membership Volatility",
+            min_value=0,
+            max_value=20,
+            value=5,
+            step=1,
+            format="%d%%",
+            help="Standard deviation of the future member count",
+            key='member_volatility',
+            on_change=on_change
+        )
+        
+        st.slider(
+            "Non-Membership Revenue Volatility",
+            min_value=0,
+            max_value=50,
+            value=10,
+            step=1,
+            format="%d%%",
+            help="Standard deviation of swim team, winter swim and other revenue",
+            key='revenue_volatility',
+            on_change=on_change
+        )
+        
+        st.number_input(
+            "Random Seed",
+            min_value=0,
+            value=0,
+            step=1,
+            key='monte_carlo_seed',
+            on_change=on_change
+        )
+    
+    return uncertainty_options_from_state()
+
+def uncertainty_options_from_state() -> Optional[Dict[str, Union[int, float]]]:
+    """
+    Read the Monte Carlo options from the section's widget state.
+    
+    Returns:
+        MonteCarloSettings arguments, or None if the simulation is disabled
+    """
+    if not st.session_state.get('monte_carlo_enabled', False):
+        return None
+    return {
+        'paths': st.session_state.monte_carlo_paths,
+        'seed': int(st.session_state.monte_carlo_seed),
+        'inflation_volatility': st.session_state.inflation_volatility,
+        'member_volatility': st.session_state.member_volatility / 100,
+        'revenue_volatility': st.session_state.revenue_volatility / 100
+    }
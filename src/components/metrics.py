@@ -2,10 +2,17 @@
 Metrics components for the Daleview Pool Financial Calculator.
 Handles display of financial metrics and warning messages.
 """
+import math
 import streamlit as st
-import pandas as pd
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+from .charts import render_number_table
+from ..instrumentation import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from ..instrumentation import Trace
+    from ..query import QueryResult
 
 @dataclass
 class FinancialMetrics:
@@ -31,6 +38,7 @@ class FinancialMetrics:
         """Calculate total cost of borrowing as percentage of project cost"""
         return (self.total_cost_of_borrowing / self.total_cost * 100) if self.total_cost > 0 else 0
 
+@timed
 def render_financial_impact_metrics(
     current_surplus: float,
     total_cost_of_borrowing: float,
@@ -91,7 +99,8 @@ def render_financial_impact_metrics(
             help="Projected annual operating surplus after renovation"
         )
 
-def render_projections_table(projections: pd.DataFrame) -> None:
+@timed
+def render_projections_table(projections: 'pd.DataFrame') -> None:
     """
     Render the financial projections table with formatted values.
     
@@ -99,35 +108,14 @@ def render_projections_table(projections: pd.DataFrame) -> None:
         projections: DataFrame containing year-by-year projections
     """
     try:
-        if not isinstance(projections, pd.DataFrame):
-            raise ValueError("projections must be a pandas DataFrame")
-        
-        display_df = projections.copy()
-        
-        # Format currency columns with consistent names
-        currency_columns = ['Revenue', 'Operating Expenses', 'Debt Service', 'Operating Surplus']
-        for col in currency_columns:
-            if col in display_df.columns:
-                display_df[col] = display_df[col].apply(lambda x: f"${x:,.0f}")
-        
-        # Format percentage column
-        if 'Debt % of Costs' in display_df.columns:
-            display_df['Debt % of Costs'] = display_df['Debt % of Costs'].apply(lambda x: f"{x:.1f}%")
-        
-        # Format year column
-        if 'Year' in display_df.columns:
-            display_df['Year'] = display_df['Year'].apply(lambda x: f"Year {x}")
-        
-        st.dataframe(
-            display_df,
-            hide_index=True,
-            use_container_width=True
-        )
+        # Same numeric table as the charts component, with one decimal on the debt share
+        render_number_table(projections, formats={'Debt % of Costs': "%.1f%%"})
         
     except Exception as e:
         st.error(f"Error rendering projections table: {str(e)}")
         st.write("Please check your data and try again.")
 
+@timed
 def render_warning_messages(future_surplus: float, year_5_surplus: float) -> None:
     """
     Render warning messages based on financial projections.
@@ -168,6 +156,7 @@ def render_warning_messages(future_surplus: float, year_5_surplus: float) -> Non
     else:
         st.success(f"✅ {message}")
 
+@timed
 def render_funding_metrics(
     total_assessment: float,
     assessment_per_member: float,
@@ -216,4 +205,114 @@ def render_funding_metrics(
     
     except Exception as e:
         st.error(f"Error calculating funding metrics: {str(e)}")
-        st.write("Please check your input values and try again.")
\ No newline at end of file
+        st.write("Please check your input values and try again.")
+
+@timed
+def render_break_even_result(
+    label: str,
+    value_format: str,
+    break_even: float,
+    current_value: float,
+    through_year: int
+) -> None:
+    """
+    Render the result of the break-even finder.
+    
+    Args:
+        label: Name of the input that was solved for
+        value_format: Format string for the input's values
+        break_even: Break-even value, or NaN if none exists in the input's range
+        current_value: Value currently set for the input
+        through_year: Last projection year that must keep an operating surplus
+    """
+    try:
+        if math.isnan(break_even):
+            st.warning(
+                f"No {label.lower()} within the calculator's range avoids a deficit "
+                f"through year {through_year} with the other inputs as set."
+            )
+            return
+        
+        difference = break_even - current_value
+        st.metric(
+            f"Break-Even {label}",
+            value_format.format(break_even),
+            delta=f"{'+' if difference >= 0 else '-'}{value_format.format(abs(difference))} vs current",
+            delta_color="off",
+            help=f"Least favorable value that keeps an operating surplus in every year through year {through_year}"
+        )
+    
+    except Exception as e:
+        st.error(f"Error rendering break-even result: {str(e)}")
+        st.write("Please check your input values and try again.")
+
+def render_performance_trace(trace: 'Trace') -> None:
+    """
+    Render the stage timings of one recorded run.
+    
+    Args:
+        trace: Finished trace from instrumentation.traced
+    """
+    try:
+        import pandas as pd
+        
+        st.metric(
+            "Run Time",
+            f"{trace.seconds * 1000:,.1f} ms",
+            help=f"{trace.label} run with {len(trace.stages)} timed stages"
+        )
+        if trace.memory_peak is not None:
+            st.metric(
+                "Process Peak Memory",
+                f"{trace.memory_peak / 1024**2:,.1f} MB",
+                help="Peak traced memory of the whole server process during the run, "
+                     "including other sessions running at the same time"
+            )
+        
+        # Nested stages are indented under the stage that called them
+        table = pd.DataFrame({
+            'Stage': ['\u2003' * stage.depth + stage.name for stage in trace.stages],
+            'Total (ms)': [stage.seconds * 1000 for stage in trace.stages],
+            'Self (ms)': [seconds * 1000 for seconds in trace.self_seconds()]
+        })
+        formats = {'Total (ms)': "%.2f", 'Self (ms)': "%.2f"}
+        if trace.track_memory:
+            # tracemalloc counts the whole process, not just this session
+            table['Process Memory (KB)'] = [stage.memory_delta / 1024 for stage in trace.stages]
+            formats['Process Memory (KB)'] = "%,d"
+        render_number_table(table, formats=formats)
+    
+    except Exception as e:
+        st.error(f"Error rendering performance trace: {str(e)}")
+        st.write("Please check your input values and try again.")
+
+@timed
+def render_query_result(result: 'QueryResult', total_rows: int) -> None:
+    """
+    Render the match count and timing of a sweep query.
+    
+    Args:
+        result: Result of SweepQuery.where
+        total_rows: Number of scenarios in the sweep
+    """
+    try:
+        share = result.count / total_rows * 100 if total_rows else 0.0
+        count_col, time_col = st.columns(2)
+        with count_col:
+            st.metric(
+                "Matching Scenarios",
+                f"{result.count:,}",
+                delta=f"{share:.2f}% of {total_rows:,}",
+                delta_color="off"
+            )
+        with time_col:
+            st.metric(
+                "Query Time",
+                f"{result.seconds * 1000:,.1f} ms",
+                help="Time to find the matching rows; reading the rows shown below is not included"
+            )
+        st.caption(" → ".join(result.plan))
+    
+    except Exception as e:
+        st.error(f"Error rendering query result: {str(e)}")
+        st.write("Please check your filters and try again.")
@@ -4,24 +4,42 @@ Includes current operating metrics and valid ranges for user inputs.
 """
 from typing import Dict, Union, Tuple
 
+def derive_operating_metrics(
+    metrics: Dict[str, Union[int, float]],
+    total_revenue: Union[int, float]
+) -> Dict[str, Union[int, float]]:
+    """
+    Add the operating metrics derived from a pool's reported figures.
+    
+    Works on scalars or on NumPy arrays holding one value per pool.
+    
+    Args:
+        metrics: MEMBERS, DUES_REVENUE, SWIM_TEAM_REVENUE, WINTER_SWIM_REVENUE and EXPENSES
+        total_revenue: Total annual revenue; whatever dues and swim programs
+            don't account for is other revenue
+    
+    Returns:
+        Copy of metrics with AVG_DUES, OTHER_REVENUE and TOTAL_REVENUE added
+    """
+    derived = dict(metrics)
+    derived['AVG_DUES'] = derived['DUES_REVENUE'] / derived['MEMBERS']
+    derived['OTHER_REVENUE'] = (total_revenue - derived['DUES_REVENUE']
+                                - derived['SWIM_TEAM_REVENUE']
+                                - derived['WINTER_SWIM_REVENUE'])
+    derived['TOTAL_REVENUE'] = (derived['DUES_REVENUE']
+                                + derived['SWIM_TEAM_REVENUE']
+                                + derived['WINTER_SWIM_REVENUE']
+                                + derived['OTHER_REVENUE'])
+    return derived
+
 # Operating metrics
-OPERATING_METRICS = {
+OPERATING_METRICS = derive_operating_metrics({
     'MEMBERS': 325,
     'DUES_REVENUE': 226760,
     'SWIM_TEAM_REVENUE': 45000,
     'WINTER_SWIM_REVENUE': 71000,
     'EXPENSES': 347000
-}
-
-# Calculate derived metrics
-OPERATING_METRICS['AVG_DUES'] = OPERATING_METRICS['DUES_REVENUE'] / OPERATING_METRICS['MEMBERS']
-OPERATING_METRICS['OTHER_REVENUE'] = (398000 - OPERATING_METRICS['DUES_REVENUE'] 
-                                    - OPERATING_METRICS['SWIM_TEAM_REVENUE']
-                                    - OPERATING_METRICS['WINTER_SWIM_REVENUE'])
-OPERATING_METRICS['TOTAL_REVENUE'] = (OPERATING_METRICS['DUES_REVENUE']
-                                    + OPERATING_METRICS['SWIM_TEAM_REVENUE']
-                                    + OPERATING_METRICS['WINTER_SWIM_REVENUE']
-                                    + OPERATING_METRICS['OTHER_REVENUE'])
+}, total_revenue=398000)
 
 # Input ranges with descriptive names
 INPUT_RANGES = {
@@ -32,7 +50,44 @@ INPUT_RANGES = {
     'OTHER': (0, 200_000),
     'PROJECT_COST': (1_000_000, 3_000_000),
     'ASSESSMENT': (0, 5_000),
-    'BOND': (1_000, 10_000)
+    'BOND_PARTICIPANTS': (0, 400),
+    'BOND': (1_000, 10_000),
+    'BOND_RATE': (3.0, 8.0),
+    'BOND_TERM': (5, 15),
+    'COMMERCIAL_RATE': (5.0, 12.0),
+    'COMMERCIAL_TERM': (10, 30),
+    'INFLATION': (0.0, 5.0)
+}
+
+# Slider step sizes for each input range
+INPUT_STEPS = {
+    'MEMBERS': 5,
+    'DUES': 25,
+    'SWIM_TEAM': 1000,
+    'WINTER_SWIM': 1000,
+    'OTHER': 1000,
+    'PROJECT_COST': 100_000,
+    'ASSESSMENT': 100,
+    'BOND_PARTICIPANTS': 5,
+    'BOND': 500,
+    'BOND_RATE': 0.1,
+    'BOND_TERM': 1,
+    'COMMERCIAL_RATE': 0.1,
+    'COMMERCIAL_TERM': 1,
+    'INFLATION': 0.1
+}
+
+# Default slider values for inputs not derived from operating metrics
+INPUT_DEFAULTS = {
+    'PROJECT_COST': 2_000_000,
+    'ASSESSMENT': 2_000,
+    'BOND_PARTICIPANTS': 100,
+    'BOND': 5_000,
+    'BOND_RATE': 5.5,
+    'BOND_TERM': 10,
+    'COMMERCIAL_RATE': 8.5,
+    'COMMERCIAL_TERM': 20,
+    'INFLATION': 2.5
 }
 
 def get_operating_metric(key: str) -> Union[int, float]:
@@ -50,7 +105,7 @@ def get_operating_metric(key: str) -> Union[int, float]:
     """
     return OPERATING_METRICS[key]
 
-def get_input_range(key: str) -> Tuple[int, int]:
+def get_input_range(key: str) -> Tuple[Union[int, float], Union[int, float]]:
     """
     Safely retrieve an input range.
     
@@ -63,4 +118,34 @@ def get_input_range(key: str) -> Tuple[int, int]:
     Raises:
         KeyError: If the range key doesn't exist
     """
-    return INPUT_RANGES[key]
\ No newline at end of file
+    return INPUT_RANGES[key]
+
+def get_input_step(key: str) -> Union[int, float]:
+    """
+    Safely retrieve an input slider step.
+    
+    Args:
+        key: The range key to retrieve the step for
+        
+    Returns:
+        The slider step size
+        
+    Raises:
+        KeyError: If the range key doesn't exist
+    """
+    return INPUT_STEPS[key]
+
+def get_input_default(key: str) -> Union[int, float]:
+    """
+    Safely retrieve a default input value.
+    
+    Args:
+        key: The range key to retrieve the default for
+        
+    Returns:
+        The default slider value
+        
+    Raises:
+        KeyError: If the range key doesn't exist
+    """
+    return INPUT_DEFAULTS[key]
@@ -0,0 +1,214 @@
+"""
+Dataflow model for the Daleview Pool Financial Calculator.
+Recomputes each derived quantity only when one of its declared inputs has changed.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+from . import config
+from .calculations import FinancingInputs
+from .cache import cached_financing_metrics, cached_projections
+from .instrumentation import stage
+from .scenarios import default_scenario
+from .vectorized import ProjectionInputs
+
+@dataclass(frozen=True)
+class Node:
+    """A derived quantity and the names of the values it is computed from"""
+    name: str
+    inputs: Tuple[str, ...]
+    compute: Callable[..., Any]
+
+def _same(a: Any, b: Any) -> bool:
+    """Compare node values, including dictionaries of numpy arrays"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return type(a) is type(b) and a == b
+
+class Graph:
+    """
+    Memoized dependency graph of input values and derived nodes.
+
+    Every value carries a version that only moves when the value actually
+    changes. A node is recomputed when it is read and the versions of its
+    inputs differ from those it was last computed with; if the new result
+    equals the old one its version is kept, so nothing downstream reruns.
+    """
+
+    def __init__(self, nodes: Iterable[Node], values: Optional[Mapping[str, Any]] = None):
+        self._nodes: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self._nodes:
+                raise ValueError(f"Duplicate node: {node.name}")
+            self._nodes[node.name] = node
+        self._values: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[int, ...]] = {}
+        self.evaluations: Counter = Counter()
+        self._check_acyclic()
+        if values:
+            self.set(**values)
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == 2 or name not in self._nodes:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle in dataflow graph: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dependency in self._nodes[name].inputs:
+                visit(dependency, path + (name,))
+            state[name] = 2
+
+        for name in self._nodes:
+            visit(name, ())
+
+    def set(self, **values: Any) -> None:
+        """
+        Update input values; unchanged values leave their dependents memoized.
+
+        Raises:
+            KeyError: If a name belongs to a derived node
+        """
+        for name, value in values.items():
+            if name in self._nodes:
+                raise KeyError(f"Cannot set derived node: {name}")
+            if name in self._values and _same(self._values[name], value):
+                continue
+            self._values[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, name: str) -> Any:
+        """
+        Get a value, recomputing only the stale nodes it depends on.
+
+        Raises:
+            KeyError: If the name is neither an input nor a node
+        """
+        node = self._nodes.get(name)
+        if node is None:
+            if name not in self._values:
+                raise KeyError(f"Unknown input: {name}")
+            return self._values[name]
+
+        arguments = [self.get(dependency) for dependency in node.inputs]
+        seen = tuple(self._versions[dependency] for dependency in node.inputs)
+        if self._seen.get(name) == seen:
+            return self._values[name]
+
+        with stage(f"dataflow.{name}"):
+            value = node.compute(*arguments)
+        self.evaluations[name] += 1
+        self._seen[name] = seen
+        if name not in self._values or not _same(self._values[name], value):
+            self._values[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+        return self._values[name]
+
+    def what_if(self, **changes: Any) -> 'Graph':
+        """
+        Copy the graph with some inputs changed.
+
+        The copy shares every memoized value with this graph, so it only
+        recomputes the nodes downstream of the changed inputs, and this graph
+        is left untouched. Node values must not be mutated in place.
+
+        Returns:
+            New Graph with the changes applied
+        """
+        graph = Graph.__new__(Graph)
+        graph._nodes = self._nodes
+        graph._values = dict(self._values)
+        graph._versions = dict(self._versions)
+        graph._seen = dict(self._seen)
+        graph.evaluations = Counter()
+        graph.set(**changes)
+        return graph
+
+    def what_ifs(self, edits: Sequence[Mapping[str, Any]], outputs: Sequence[str]) -> list:
+        """
+        Evaluate a batch of what-if edits against this graph.
+
+        Args:
+            edits: One dictionary of input changes per what-if
+            outputs: Node names to read for each what-if
+
+        Returns:
+            One dictionary of output values per edit
+        """
+        results = []
+        for changes in edits:
+            graph = self.what_if(**changes)
+            results.append({name: graph.get(name) for name in outputs})
+        return results
+
+def _financing_inputs(total_bond_funding, bond_term, bond_interest_rate, remaining_to_finance,
+                      commercial_term, commercial_interest_rate) -> FinancingInputs:
+    return FinancingInputs(
+        total_bond_funding=total_bond_funding,
+        bond_term=bond_term,
+        bond_interest_rate=bond_interest_rate,
+        remaining_to_finance=remaining_to_finance,
+        commercial_term=commercial_term,
+        commercial_interest_rate=commercial_interest_rate
+    )
+
+def _projections(future_total_revenue, inflation_rate, current_expenses, finance_metrics,
+                 bond_term, commercial_term) -> Dict[str, np.ndarray]:
+    return cached_projections(ProjectionInputs(
+        future_total_revenue=future_total_revenue,
+        inflation_rate=inflation_rate,
+        current_expenses=current_expenses,
+        annual_bond_payment=finance_metrics['annual_bond_payment'],
+        annual_loan_payment=finance_metrics['annual_loan_payment'],
+        bond_term=bond_term,
+        commercial_term=commercial_term
+    ), horizon=20)
+
+# The calculator's chain from inputs to results, as in streamlit_app
+FINANCIAL_MODEL = (
+    Node('future_total_revenue', ('members', 'avg_dues', 'swim_team', 'winter_swim', 'other'),
+         lambda members, avg_dues, swim_team, winter_swim, other:
+         members * avg_dues + swim_team + winter_swim + other),
+    Node('current_surplus', ('current_total_revenue', 'current_expenses'),
+         lambda revenue, expenses: revenue - expenses),
+    Node('total_assessment', ('current_members', 'assessment_per_member'),
+         lambda members, assessment: members * assessment),
+    Node('total_bond_funding', ('bond_participants', 'avg_bond_amount'),
+         lambda participants, amount: participants * amount),
+    Node('remaining_to_finance', ('total_cost', 'total_bond_funding', 'total_assessment'),
+         lambda total_cost, bond_funding, assessment: total_cost - bond_funding - assessment),
+    Node('financing_inputs', ('total_bond_funding', 'bond_term', 'bond_interest_rate',
+                              'remaining_to_finance', 'commercial_term', 'commercial_interest_rate'),
+         _financing_inputs),
+    Node('finance_metrics', ('financing_inputs',), cached_financing_metrics),
+    Node('future_surplus', ('future_total_revenue', 'current_expenses', 'finance_metrics'),
+         lambda revenue, expenses, metrics: revenue - expenses - metrics['total_annual_debt_service']),
+    Node('projections', ('future_total_revenue', 'inflation_rate', 'current_expenses', 'finance_metrics',
+                         'bond_term', 'commercial_term'),
+         _projections),
+    Node('year_5_surplus', ('projections',), lambda projections: projections['Operating Surplus'][0, 5])
+)
+
+def financial_model(**values: Any) -> Graph:
+    """
+    Build the calculator's dataflow graph.
+
+    Args:
+        values: Scenario parameter values; missing ones use default_scenario()
+
+    Returns:
+        Graph over FINANCIAL_MODEL with every input set
+    """
+    inputs = {
+        **default_scenario(),
+        'current_total_revenue': config.get_operating_metric('TOTAL_REVENUE'),
+        **values
+    }
+    return Graph(FINANCIAL_MODEL, inputs)
@@ -0,0 +1,130 @@
+"""
+Break-even goal seek for the Daleview Pool Financial Calculator.
+Finds the input value that keeps the operating surplus at or above zero, for many scenarios at once.
+"""
+from typing import Mapping, Optional, Tuple
+import numpy as np
+
+from . import config
+from .instrumentation import timed
+from .scenarios import INTEGER_PARAMETERS, SCENARIO_PARAMETERS, evaluate_scenarios
+from .vectorized import ArrayLike
+
+def minimum_surplus(params: Mapping[str, ArrayLike], through_year: int) -> np.ndarray:
+    """
+    Get the lowest operating surplus of each scenario over years 0..through_year.
+
+    Args:
+        params: Scenario parameters for evaluate_scenarios
+        through_year: Last year that must stay out of deficit
+
+    Returns:
+        Array with one minimum surplus per scenario
+    """
+    projections = evaluate_scenarios(params, horizon=through_year).projections
+    return projections['Operating Surplus'].min(axis=1)
+
+def snap_to_step(parameter: str, values: np.ndarray, increasing: np.ndarray) -> np.ndarray:
+    """
+    Move break-even values onto the parameter's slider grid without losing break-even.
+
+    Args:
+        parameter: Scenario parameter name
+        values: Exact break-even values
+        increasing: Whether the surplus rises with the parameter, per scenario
+
+    Returns:
+        Values rounded up (rising surplus) or down (falling surplus) to the slider step
+    """
+    key = SCENARIO_PARAMETERS[parameter]
+    low, _ = config.get_input_range(key)
+    step = config.get_input_step(key)
+    # Absorb bisection tolerance before rounding so exact grid points stay put
+    steps = (values - low) / step
+    steps = np.where(np.isclose(steps, np.round(steps), atol=1e-6), np.round(steps), steps)
+    snapped = low + step * np.where(increasing, np.ceil(steps), np.floor(steps))
+    return np.round(snapped, 10)
+
+@timed
+def solve_break_even(
+    parameter: str,
+    params: Mapping[str, ArrayLike],
+    through_year: int = 20,
+    bounds: Optional[Tuple[float, float]] = None,
+    tolerance: Optional[float] = None,
+    snap: bool = True
+) -> np.ndarray:
+    """
+    Find the break-even value of one input for many scenarios at once.
+
+    The break-even value is the least favorable value of the parameter for
+    which the operating surplus stays at or above zero in every year through
+    through_year: the minimum for inputs that raise the surplus (dues,
+    members, assessment) and the maximum for inputs that lower it (project
+    cost, interest rates). All scenarios are bisected together, one batched
+    evaluation per iteration.
+
+    Args:
+        parameter: Scenario parameter to solve for
+        params: Fixed values for the other parameters, scalars or per-scenario arrays
+        through_year: Last year that must stay out of deficit
+        bounds: Search interval; defaults to the parameter's input range
+        tolerance: Bisection tolerance; defaults to 1e-6 of the interval, or
+            a single unit for whole-number parameters
+        snap: Round results onto the slider step
+
+    Returns:
+        Array with one break-even value per scenario; the bound itself if the
+        whole interval breaks even and NaN if no value in it does
+    """
+    if parameter not in SCENARIO_PARAMETERS:
+        raise KeyError(f"Unknown scenario parameter: {parameter}")
+    low, high = bounds or config.get_input_range(SCENARIO_PARAMETERS[parameter])
+    integer = parameter in INTEGER_PARAMETERS
+    tolerance = tolerance or (1 if integer else (high - low) * 1e-6)
+
+    fixed = {name: np.atleast_1d(value) for name, value in params.items() if name != parameter}
+    size = np.broadcast_shapes(*(value.shape for value in fixed.values()), (1,))[0]
+    fixed = {name: np.broadcast_to(value, (size,)) for name, value in fixed.items()}
+
+    def objective(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+        # Only the scenarios still being bisected are evaluated
+        subset = {name: value[index] for name, value in fixed.items()}
+        return minimum_surplus({**subset, parameter: values}, through_year)
+
+    everything = np.arange(size)
+    lo = np.full(size, float(low))
+    hi = np.full(size, float(high))
+    f_lo = objective(lo, everything)
+    f_hi = objective(hi, everything)
+    increasing = f_hi >= f_lo
+
+    # Orient each scenario so 'bad' is the side in deficit and 'good' breaks even
+    bad = np.where(increasing, lo, hi)
+    good = np.where(increasing, hi, lo)
+    f_bad = np.where(increasing, f_lo, f_hi)
+    f_good = np.where(increasing, f_hi, f_lo)
+
+    result = np.full(size, np.nan)
+    always = f_bad >= 0
+    result[always] = bad[always]
+    active = ~always & (f_good >= 0)
+
+    while True:
+        active &= np.abs(good - bad) > tolerance
+        if not active.any():
+            break
+        index = np.flatnonzero(active)
+        mid = (bad[index] + good[index]) / 2
+        if integer:
+            mid = np.floor(mid)
+        ok = objective(mid, index) >= 0
+        good[index[ok]] = mid[ok]
+        bad[index[~ok]] = mid[~ok]
+    solved = ~always & (f_good >= 0)
+    result[solved] = good[solved]
+
+    if snap:
+        result = np.where(np.isnan(result), np.nan, snap_to_step(parameter, result, increasing))
+        result = np.clip(result, low, high)
+    return result
@@ -0,0 +1,189 @@
+"""
+Rerun instrumentation for the Daleview Pool Financial Calculator.
+Times each stage of a page run, with optional memory deltas, and exports the traces as JSON lines.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Append every finished trace to this JSON-lines file when set
+TRACE_FILE = os.environ.get('DALEVIEW_TRACE_FILE')
+
+# Each Streamlit session runs its script in its own thread, so the trace
+# being recorded is kept per thread
+_local = threading.local()
+
+# tracemalloc is process-wide; it runs while any trace is tracking memory
+_memory_lock = threading.Lock()
+_memory_users = 0
+
+_UNTRACED = nullcontext()
+
+@dataclass
+class Stage:
+    """Container for one timed stage of a run"""
+    name: str
+    depth: int
+    start: float
+    seconds: float = 0.0
+    memory_delta: Optional[int] = None
+
+@dataclass
+class Trace:
+    """Container for the stages of one page or fragment run"""
+    label: str
+    timestamp: float
+    track_memory: bool = False
+    seconds: float = 0.0
+    # Process-wide peak since this or a concurrent memory-tracked trace started
+    memory_peak: Optional[int] = None
+    stages: List[Stage] = field(default_factory=list)
+
+    def self_seconds(self) -> List[float]:
+        """Time spent in each stage outside the stages nested in it"""
+        own = [stage.seconds for stage in self.stages]
+        parents: List[int] = []
+        for index, stage in enumerate(self.stages):
+            while parents and self.stages[parents[-1]].depth >= stage.depth:
+                parents.pop()
+            if parents:
+                own[parents[-1]] -= stage.seconds
+            parents.append(index)
+        return own
+
+    def to_record(self) -> Dict[str, Any]:
+        """Trace as a JSON-serializable dictionary"""
+        return asdict(self)
+
+class _StageTimer:
+    """Context manager recording one stage into the active trace"""
+
+    def __init__(self, trace: Trace, name: str):
+        self._trace = trace
+        self._stage = Stage(name=name, depth=_local.depth, start=0.0)
+
+    def __enter__(self) -> Stage:
+        trace, stage = self._trace, self._stage
+        trace.stages.append(stage)
+        _local.depth += 1
+        if trace.track_memory:
+            self._memory = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        stage.start = self._start - _local.started
+        return stage
+
+    def __exit__(self, *exc_info) -> None:
+        stage = self._stage
+        stage.seconds = time.perf_counter() - self._start
+        if self._trace.track_memory:
+            stage.memory_delta = tracemalloc.get_traced_memory()[0] - self._memory
+        _local.depth -= 1
+
+def active_trace() -> Optional[Trace]:
+    """Get the trace being recorded in this thread, if any"""
+    return getattr(_local, 'trace', None)
+
+def stage(name: str):
+    """
+    Time a block as a stage of the active trace.
+
+    Without an active trace this returns a shared no-op context manager, so
+    uninstrumented runs only pay for one attribute lookup.
+
+    Args:
+        name: Stage name shown in the trace
+    """
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return _UNTRACED
+    return _StageTimer(trace, name)
+
+def timed(func: Optional[Callable] = None, *, name: Optional[str] = None) -> Callable:
+    """
+    Decorate a function so each call is a stage of the active trace.
+
+    Args:
+        func: Function to time
+        name: Stage name; defaults to module.function, e.g. charts.render_trends_chart
+    """
+    if func is None:
+        return functools.partial(timed, name=name)
+    stage_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = getattr(_local, 'trace', None)
+        if trace is None:
+            return func(*args, **kwargs)
+        with _StageTimer(trace, stage_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def _acquire_memory_tracking() -> None:
+    global _memory_users
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _memory_users += 1
+
+def _release_memory_tracking() -> None:
+    global _memory_users
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0:
+            tracemalloc.stop()
+
+@contextmanager
+def traced(label: str, track_memory: bool = False) -> Iterator[Trace]:
+    """
+    Record a trace of every stage run inside the block in this thread.
+
+    Memory deltas come from tracemalloc, which slows the traced code down
+    noticeably; leave track_memory off for timings alone. tracemalloc is
+    process-wide, so deltas and memory_peak include allocations by other
+    sessions running at the same time, and each memory-tracked trace resets
+    the peak for every other one. Treat them as exact only for a single session.
+
+    Args:
+        label: Name of the run, e.g. page or a fragment key
+        track_memory: Record the change in allocated memory for each stage
+
+    Yields:
+        The Trace being recorded; it is complete once the block exits
+    """
+    if active_trace() is not None:
+        raise RuntimeError("A trace is already being recorded in this thread")
+    trace = Trace(label=label, timestamp=time.time(), track_memory=track_memory)
+    if track_memory:
+        _acquire_memory_tracking()
+        tracemalloc.reset_peak()
+    _local.trace, _local.depth, _local.started = trace, 0, time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.seconds = time.perf_counter() - _local.started
+        _local.trace = None
+        if track_memory:
+            trace.memory_peak = tracemalloc.get_traced_memory()[1]
+            _release_memory_tracking()
+
+def append_trace(trace: Trace, path: str) -> None:
+    """
+    Append a finished trace to a JSON-lines file.
+
+    Args:
+        trace: Trace to write
+        path: File to append one JSON record to
+    """
+    with open(path, 'a') as f:
+        f.write(json.dumps(trace.to_record()) + '\n')
+
+def traces_to_jsonl(traces: List[Trace]) -> str:
+    """Serialize traces as JSON lines, for download"""
+    return ''.join(json.dumps(trace.to_record()) + '\n' for trace in traces)
@@ -0,0 +1,41 @@
+"""
+Fixed-point money for the Daleview Pool Financial Calculator.
+Converts between float dollars and int64 cents with one defined rounding rule.
+
+The batch engines take money_mode='cents' to keep every amount as an int64
+number of cents. Amounts are rounded to the nearest cent, ties to even, at
+each defined step (inputs, monthly payments, monthly interest and each
+year's inflated revenue and expenses); everything after a rounding step is
+exact integer arithmetic, so results are identical on every platform.
+"""
+from typing import Union
+import numpy as np
+
+MONEY_MODES = ('float', 'cents')
+
+def check_money_mode(money_mode: str) -> None:
+    """
+    Validate a money_mode argument.
+
+    Raises:
+        ValueError: If money_mode is not one of MONEY_MODES
+    """
+    if money_mode not in MONEY_MODES:
+        raise ValueError(f"money_mode must be one of {MONEY_MODES}, got {money_mode!r}")
+
+def round_cents(cents: Union[float, np.ndarray]) -> np.ndarray:
+    """Round fractional cent amounts to whole cents, ties to even"""
+    return np.rint(cents).astype(np.int64)
+
+def to_cents(dollars: Union[float, np.ndarray]) -> np.ndarray:
+    """Convert dollar amounts to int64 cents, rounding to the nearest cent"""
+    return round_cents(np.asarray(dollars, dtype=float) * 100)
+
+def to_dollars(cents: Union[int, np.ndarray]) -> np.ndarray:
+    """
+    Convert int64 cents to float dollars.
+
+    Every cent amount below 2**53 / 100 dollars maps to the float nearest to
+    it, so formatting with two decimals or to_cents gives the cents back exactly.
+    """
+    return np.asarray(cents) / 100
@@ -0,0 +1,299 @@
+"""
+Monte Carlo simulation for the Daleview Pool Financial Calculator.
+Draws inflation, membership and non-dues revenue paths and projects them in batches.
+"""
+import os
+import threading
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+import numpy as np
+
+from .scenarios import default_scenario, evaluate_scenarios
+
+# Path counts above this are spread across a process pool by default
+PARALLEL_THRESHOLD = 500_000
+
+@dataclass
+class MonteCarloSettings:
+    """Container for Monte Carlo simulation settings"""
+    paths: int = 10_000
+    seed: int = 0
+    horizon: int = 20
+    inflation_volatility: float = 1.0
+    member_volatility: float = 0.05
+    revenue_volatility: float = 0.10
+    chunk_size: int = 50_000
+    processes: Optional[int] = None
+    keep_paths: bool = False
+
+@dataclass
+class MonteCarloResult:
+    """Container for Monte Carlo simulation results"""
+    paths: int
+    years: np.ndarray
+    deficit_probability: np.ndarray
+    mean_surplus: np.ndarray
+    surplus_std: np.ndarray
+    surplus: Optional[np.ndarray] = None
+
+class MonteCarloCancelled(Exception):
+    """Raised when a simulation is cancelled before every chunk has run"""
+
+def draw_paths(
+    base: Mapping[str, Union[int, float]],
+    settings: MonteCarloSettings,
+    rng: np.random.Generator,
+    size: int
+) -> Dict[str, np.ndarray]:
+    """
+    Draw random scenario paths around a base scenario.
+
+    Inflation varies year by year around the base rate. Member count and
+    each non-dues revenue stream vary once per path.
+
+    Args:
+        base: Base scenario parameters
+        settings: Simulation settings with the volatilities to apply
+        rng: Random generator to draw from
+        size: Number of paths to draw
+
+    Returns:
+        Scenario parameters for evaluate_scenarios, one value per path
+    """
+    inflation = base['inflation_rate'] + settings.inflation_volatility * rng.standard_normal((size, settings.horizon))
+    members = np.maximum(np.round(base['members'] * (1 + settings.member_volatility * rng.standard_normal(size))), 1)
+
+    # Lognormal multipliers with a mean of one keep revenue positive
+    sigma = settings.revenue_volatility
+    multipliers = np.exp(sigma * rng.standard_normal((3, size)) - sigma**2 / 2)
+
+    return {
+        **base,
+        'inflation_rate': inflation,
+        'members': members,
+        'swim_team': base['swim_team'] * multipliers[0],
+        'winter_swim': base['winter_swim'] * multipliers[1],
+        'other': base['other'] * multipliers[2]
+    }
+
+def simulate_chunk(
+    base: Mapping[str, Union[int, float]],
+    settings: MonteCarloSettings,
+    seed: np.random.SeedSequence,
+    size: int
+) -> np.ndarray:
+    """
+    Simulate one chunk of paths.
+
+    Args:
+        base: Base scenario parameters
+        settings: Simulation settings
+        seed: Seed for this chunk's random generator
+        size: Number of paths in the chunk
+
+    Returns:
+        (path x year) array of operating surplus
+    """
+    params = draw_paths(base, settings, np.random.default_rng(seed), size)
+    return evaluate_scenarios(params, horizon=settings.horizon).projections['Operating Surplus']
+
+def _simulate_into(
+    buffers: Dict[str, np.ndarray],
+    base: Mapping[str, Union[int, float]],
+    settings: MonteCarloSettings,
+    index: int,
+    seed: np.random.SeedSequence,
+    start: int,
+    size: int
+) -> int:
+    """Simulate chunk `index` and write its per-year reductions (and paths) into the buffers"""
+    surplus = simulate_chunk(base, settings, seed, size)
+    buffers['totals'][0, index] = (surplus < 0).sum(axis=0)
+    buffers['totals'][1, index] = surplus.sum(axis=0)
+    buffers['totals'][2, index] = (surplus**2).sum(axis=0)
+    if 'surplus' in buffers:
+        buffers['surplus'][start:start + size] = surplus
+    return size
+
+def _buffer_shapes(settings: MonteCarloSettings, chunks: int) -> Dict[str, Tuple[int, ...]]:
+    years = settings.horizon + 1
+    shapes = {'totals': (3, chunks, years)}
+    if settings.keep_paths:
+        shapes['surplus'] = (settings.paths, years)
+    return shapes
+
+# Shared buffers and run inputs of the simulation a pool worker belongs to
+_worker: Dict[str, object] = {}
+
+def _attach_worker(
+    names: Dict[str, str],
+    shapes: Dict[str, Tuple[int, ...]],
+    base: Mapping[str, Union[int, float]],
+    settings: MonteCarloSettings
+) -> None:
+    """Pool initializer: map the parent's shared buffers once per worker process"""
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    _worker.update(
+        blocks=blocks,
+        buffers={key: np.ndarray(shapes[key], dtype=np.float64, buffer=blocks[key].buf) for key in blocks},
+        base=base,
+        settings=settings
+    )
+
+def _simulate_shared(index: int, seed: np.random.SeedSequence, start: int, size: int) -> int:
+    """Pool task: simulate one chunk straight into the shared buffers; only the path count is returned"""
+    return _simulate_into(_worker['buffers'], _worker['base'], _worker['settings'], index, seed, start, size)
+
+def _shared_array(shape: Tuple[int, ...]) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    """Allocate a float64 array in shared memory, released once the array is garbage collected"""
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    array = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    weakref.finalize(array, _release_block, block)
+    return array, block
+
+def _release_block(block: shared_memory.SharedMemory) -> None:
+    block.close()
+    block.unlink()
+
+def run_monte_carlo(
+    base: Optional[Mapping[str, Union[int, float]]] = None,
+    settings: Optional[MonteCarloSettings] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None
+) -> MonteCarloResult:
+    """
+    Run a Monte Carlo simulation of the operating surplus.
+
+    Paths are split into fixed-size chunks with their own spawned seeds, so
+    results for a given seed are identical whether chunks run in-process or
+    across a process pool. Pool workers write each chunk's per-year totals,
+    and with keep_paths every path's surplus, straight into shared-memory
+    arrays; only a path count travels back to this process.
+
+    Args:
+        base: Base scenario parameters; missing values use default_scenario()
+        settings: Simulation settings; defaults to MonteCarloSettings()
+        progress: Called with (completed paths, total paths) after each chunk
+        cancel: Event that stops the simulation once set; chunks already
+            running finish first
+
+    Returns:
+        MonteCarloResult with the per-year probability of a deficit
+
+    Raises:
+        MonteCarloCancelled: If cancel was set before every chunk had run
+    """
+    base = {**default_scenario(), **(base or {})}
+    settings = settings or MonteCarloSettings()
+    cancel = cancel or threading.Event()
+
+    starts = list(range(0, settings.paths, settings.chunk_size))
+    sizes = [min(settings.chunk_size, settings.paths - start) for start in starts]
+    seeds = np.random.SeedSequence(settings.seed).spawn(len(sizes))
+    shapes = _buffer_shapes(settings, len(sizes))
+
+    processes = settings.processes
+    if processes is None:
+        processes = (os.cpu_count() or 1) if settings.paths > PARALLEL_THRESHOLD else 1
+    processes = min(processes, len(sizes))
+
+    completed = 0
+    if processes == 1:
+        buffers = {key: np.empty(shape) for key, shape in shapes.items()}
+        for index, (seed, start, size) in enumerate(zip(seeds, starts, sizes)):
+            if cancel.is_set():
+                raise MonteCarloCancelled(f"Cancelled after {completed:,} of {settings.paths:,} paths")
+            completed += _simulate_into(buffers, base, settings, index, seed, start, size)
+            if progress:
+                progress(completed, settings.paths)
+    else:
+        shared = {key: _shared_array(shape) for key, shape in shapes.items()}
+        buffers = {key: array for key, (array, _) in shared.items()}
+        names = {key: block.name for key, (_, block) in shared.items()}
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_attach_worker, initargs=(names, shapes, base, settings)
+        ) as pool:
+            pending = {
+                pool.submit(_simulate_shared, index, seed, start, size)
+                for index, (seed, start, size) in enumerate(zip(seeds, starts, sizes))
+            }
+            while pending:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed += future.result()
+                    if progress:
+                        progress(completed, settings.paths)
+                if cancel.is_set() and pending:
+                    for future in pending:
+                        future.cancel()
+                    raise MonteCarloCancelled(f"Cancelled after {completed:,} of {settings.paths:,} paths")
+
+    deficits, sums, squares = buffers['totals'].sum(axis=1)
+    mean = sums / settings.paths
+    return MonteCarloResult(
+        paths=settings.paths,
+        years=np.arange(settings.horizon + 1),
+        deficit_probability=deficits / settings.paths,
+        mean_surplus=mean,
+        surplus_std=np.sqrt(np.maximum(squares / settings.paths - mean**2, 0)),
+        surplus=buffers.get('surplus')
+    )
+
+class MonteCarloJob:
+    """
+    Monte Carlo simulation running on a background thread, for a UI to poll.
+
+    The simulation starts as soon as the job is created. Progress can be read
+    at any time, cancel() stops it between chunks and result() waits for it.
+    """
+
+    def __init__(
+        self,
+        base: Optional[Mapping[str, Union[int, float]]] = None,
+        settings: Optional[MonteCarloSettings] = None
+    ):
+        self.settings = settings or MonteCarloSettings()
+        self.completed_paths = 0
+        self._cancel = threading.Event()
+        self._future: Future = Future()
+        self._thread = threading.Thread(target=self._run, args=(base,), daemon=True)
+        self._thread.start()
+
+    def _run(self, base: Optional[Mapping[str, Union[int, float]]]) -> None:
+        def record(completed: int, total: int) -> None:
+            self.completed_paths = completed
+
+        try:
+            self._future.set_result(run_monte_carlo(base, self.settings, progress=record, cancel=self._cancel))
+        except BaseException as e:
+            self._future.set_exception(e)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of paths simulated so far"""
+        return self.completed_paths / self.settings.paths
+
+    def done(self) -> bool:
+        """Whether the simulation has finished, failed or been cancelled"""
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to timeout seconds for the simulation to finish; returns whether it has"""
+        return not wait([self._future], timeout).not_done
+
+    def cancel(self) -> None:
+        """Stop the simulation after the chunks already running"""
+        self._cancel.set()
+
+    def result(self, timeout: Optional[float] = None) -> MonteCarloResult:
+        """
+        Wait for the simulation and return its result.
+
+        Raises:
+            MonteCarloCancelled: If the job was cancelled
+            concurrent.futures.TimeoutError: If it is still running after timeout seconds
+        """
+        return self._future.result(timeout)
@@ -0,0 +1,219 @@
+"""
+Funding mix optimizer for the Daleview Pool Financial Calculator.
+Searches assessment, bond and loan term combinations for the Pareto frontier of cost, member burden and surplus.
+"""
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Union
+import numpy as np
+
+from .instrumentation import timed
+from .scenarios import default_scenario, evaluate_scenarios
+from .sweep import slider_values
+from .vectorized import FinancingBatch, calculate_financing_metrics_batch, calculate_inflation_factors
+
+# Funding inputs the optimizer searches, with the default number of evenly
+# spaced points per axis; None searches every slider step
+FUNDING_AXES: Dict[str, Optional[int]] = {
+    'assessment_per_member': None,
+    'bond_participants': 17,
+    'avg_bond_amount': 10,
+    'bond_term': None,
+    'commercial_term': 5
+}
+
+@dataclass
+class FundingFrontier:
+    """Container for the Pareto-optimal funding mixes"""
+    points: Dict[str, np.ndarray]
+    evaluated: int
+
+    @property
+    def size(self) -> int:
+        """Number of funding mixes on the frontier"""
+        return len(self.points['member_burden'])
+
+def _minimum_surplus(
+    revenue: float,
+    expenses: float,
+    factors: np.ndarray,
+    bond_payment: np.ndarray,
+    loan_payment: np.ndarray,
+    bond_term: np.ndarray,
+    commercial_term: np.ndarray
+) -> np.ndarray:
+    """
+    Get the lowest operating surplus over the horizon without projecting every year.
+
+    Debt service is constant between loan payoffs and revenue and expenses
+    share one inflation factor, so the surplus is monotonic on each stretch
+    and its minimum falls at the first or last year of one of them. Values
+    use the same operations as calculate_projections and match it exactly.
+    """
+    horizon = len(factors) - 1
+    first = np.minimum(bond_term, commercial_term)
+    second = np.maximum(bond_term, commercial_term)
+    years = np.stack([
+        np.zeros_like(first), first - 1, first, second - 1, second, np.full_like(first, horizon)
+    ], axis=1).clip(0, horizon)
+    inflation_factor = factors[years]
+
+    year_bond_payment = np.where(years < bond_term[:, None], bond_payment[:, None], 0.0)
+    year_loan_payment = np.where(years < commercial_term[:, None], loan_payment[:, None], 0.0)
+    total_costs = expenses * inflation_factor + (year_bond_payment + year_loan_payment)
+    return (revenue * inflation_factor - total_costs).min(axis=1)
+
+def pareto_mask(cost: np.ndarray, burden: np.ndarray, surplus: np.ndarray) -> np.ndarray:
+    """
+    Flag the points no other point beats on every objective.
+
+    Lower cost, lower burden and higher surplus are better. Points are swept
+    in order of burden while a staircase of the best surplus available at
+    each cost among lower-burden points is kept; only the staircase is ever
+    compared against, so pruning is far cheaper than all-pairs dominance.
+    Of identical points only the first is kept.
+
+    Args:
+        cost: Total cost of borrowing per point
+        burden: Member burden per point
+        surplus: Minimum surplus per point
+
+    Returns:
+        Boolean array marking the non-dominated points
+    """
+    order = np.lexsort((-surplus, cost, burden))
+    b, c, s = burden[order], cost[order], surplus[order]
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    ends = np.r_[starts[1:], len(b)]
+
+    keep = np.zeros(len(b), dtype=bool)
+    stair_cost = np.empty(0)
+    stair_surplus = np.empty(0)
+    for start, end in zip(starts, ends):
+        level_cost, level_surplus = c[start:end], s[start:end]
+        # Within one burden level, sorted by cost, keep each new best surplus
+        best_before = np.maximum.accumulate(np.r_[-np.inf, level_surplus[:-1]])
+        ok = level_surplus > best_before
+        if stair_cost.size:
+            # Dominated by a lower-burden point that costs no more and earns no less
+            i = np.searchsorted(stair_cost, level_cost, side='right') - 1
+            ok &= ~((i >= 0) & (stair_surplus[np.maximum(i, 0)] >= level_surplus))
+        if ok.any():
+            keep[start:end] = ok
+            merged_cost = np.r_[stair_cost, level_cost[ok]]
+            merged_surplus = np.r_[stair_surplus, level_surplus[ok]]
+            merged = np.lexsort((-merged_surplus, merged_cost))
+            merged_cost, merged_surplus = merged_cost[merged], merged_surplus[merged]
+            step = merged_surplus > np.maximum.accumulate(np.r_[-np.inf, merged_surplus[:-1]])
+            stair_cost, stair_surplus = merged_cost[step], merged_surplus[step]
+
+    mask = np.zeros(len(b), dtype=bool)
+    mask[order] = keep
+    return mask
+
+@timed
+def funding_frontier(
+    params: Optional[Mapping[str, Union[int, float]]] = None,
+    axes: Optional[Mapping[str, Union[int, Sequence[float], None]]] = None,
+    horizon: int = 20
+) -> FundingFrontier:
+    """
+    Find the Pareto frontier of funding mixes for one scenario.
+
+    Every combination of assessment per member, bond participants, average
+    bond amount and bond and commercial loan terms is scored on total cost
+    of borrowing, member burden (assessment plus bond funding per current
+    member) and minimum operating surplus through the horizon. Combinations
+    raising the same bond funding are evaluated once, keeping the one with
+    the smallest average bond; mixes that raise more than the project cost
+    are skipped, as is the term of any loan with nothing borrowed.
+
+    Args:
+        params: Fixed values for the other scenario parameters; missing
+            parameters use default_scenario()
+        axes: Points per funding axis (count, explicit values or None for
+            every slider step); defaults to FUNDING_AXES
+        horizon: Last projection year for the minimum surplus
+
+    Returns:
+        FundingFrontier with the non-dominated mixes sorted by member burden
+    """
+    params = dict(params or {})
+    axes = {**FUNDING_AXES, **(axes or {})}
+    values = {
+        name: np.asarray(points) if isinstance(points, (list, tuple, np.ndarray)) else slider_values(name, points)
+        for name, points in axes.items()
+    }
+    for name in FUNDING_AXES:
+        params.pop(name, None)
+    base = evaluate_scenarios(params, horizon=None)
+    base_params = {**default_scenario(), **params}
+
+    # Bond funding depends only on participants x amount; keep one pair per total
+    participants, amount = np.meshgrid(values['bond_participants'], values['avg_bond_amount'], indexing='ij')
+    participants = np.minimum(participants.ravel(), base_params['members'])
+    amount = amount.ravel()
+    pair = np.lexsort((amount, participants * amount))
+    bond_funding, first = np.unique((participants * amount)[pair], return_index=True)
+    participants, amount = participants[pair][first], amount[pair][first]
+
+    # Assessment x bond funding combinations that do not exceed the project cost
+    assessment_index, bond_index = np.meshgrid(
+        np.arange(len(values['assessment_per_member'])), np.arange(len(bond_funding)), indexing='ij'
+    )
+    assessment_index, bond_index = assessment_index.ravel(), bond_index.ravel()
+    total_assessment = base_params['current_members'] * values['assessment_per_member'][assessment_index]
+    remaining = base_params['total_cost'] - bond_funding[bond_index] - total_assessment
+    feasible = remaining >= 0
+    assessment_index, bond_index, remaining = assessment_index[feasible], bond_index[feasible], remaining[feasible]
+
+    # Cross with loan terms, dropping the term of a loan that borrows nothing
+    bond_terms, commercial_terms = values['bond_term'], values['commercial_term']
+    mix, bond_term_index, commercial_term_index = (
+        a.ravel() for a in np.meshgrid(
+            np.arange(len(remaining)), np.arange(len(bond_terms)), np.arange(len(commercial_terms)), indexing='ij'
+        )
+    )
+    used = (
+        ((bond_funding[bond_index][mix] > 0) | (bond_term_index == 0)) &
+        ((remaining[mix] > 0) | (commercial_term_index == 0))
+    )
+    mix, bond_term_index, commercial_term_index = mix[used], bond_term_index[used], commercial_term_index[used]
+
+    candidates = {
+        'assessment_per_member': values['assessment_per_member'][assessment_index[mix]],
+        'bond_participants': participants[bond_index[mix]],
+        'avg_bond_amount': amount[bond_index[mix]],
+        'bond_term': bond_terms[bond_term_index],
+        'commercial_term': commercial_terms[commercial_term_index],
+        'total_bond_funding': bond_funding[bond_index[mix]].astype(float),
+        'remaining_to_finance': remaining[mix].astype(float)
+    }
+    finance_metrics = calculate_financing_metrics_batch(FinancingBatch(
+        total_bond_funding=candidates['total_bond_funding'],
+        bond_term=candidates['bond_term'],
+        bond_interest_rate=base_params['bond_interest_rate'],
+        remaining_to_finance=candidates['remaining_to_finance'],
+        commercial_term=candidates['commercial_term'],
+        commercial_interest_rate=base_params['commercial_interest_rate']
+    ))
+    candidates['total_cost_of_borrowing'] = finance_metrics['total_cost_of_borrowing']
+    candidates['total_annual_debt_service'] = finance_metrics['total_annual_debt_service']
+    candidates['member_burden'] = (
+        candidates['assessment_per_member'] + candidates['total_bond_funding'] / base_params['current_members']
+    )
+    candidates['min_surplus'] = _minimum_surplus(
+        revenue=float(base.metrics['future_total_revenue'][0]),
+        expenses=float(base_params['current_expenses']),
+        factors=calculate_inflation_factors(base_params['inflation_rate'], horizon)[0],
+        bond_payment=finance_metrics['annual_bond_payment'],
+        loan_payment=finance_metrics['annual_loan_payment'],
+        bond_term=candidates['bond_term'],
+        commercial_term=candidates['commercial_term']
+    )
+
+    mask = pareto_mask(
+        candidates['total_cost_of_borrowing'], candidates['member_burden'], candidates['min_surplus']
+    )
+    order = np.lexsort((candidates['total_cost_of_borrowing'][mask], candidates['member_burden'][mask]))
+    points = {name: column[mask][order] for name, column in candidates.items()}
+    return FundingFrontier(points=points, evaluated=len(mask))
@@ -0,0 +1,248 @@
+"""
+Portfolio evaluation for the Daleview Pool Financial Calculator.
+Loads operating metrics for many pools from a file and evaluates every pool against shared financing scenarios.
+
+A pool file is CSV or JSON with one record per pool:
+
+    pool,members,dues_revenue,swim_team_revenue,winter_swim_revenue,total_revenue,expenses
+    Daleview,325,226760,45000,71000,398000,347000
+
+other_revenue may be given instead of total_revenue. JSON files hold a list
+of such records, or an object with the list under "pools".
+"""
+import csv
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+
+from . import config
+from .scenarios import OPERATING_PARAMETERS, SCENARIO_PARAMETERS, evaluate_scenarios
+from .vectorized import ArrayLike
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Pool file columns and the operating metric each one holds
+POOL_FIELDS = {
+    'members': 'MEMBERS',
+    'dues_revenue': 'DUES_REVENUE',
+    'swim_team_revenue': 'SWIM_TEAM_REVENUE',
+    'winter_swim_revenue': 'WINTER_SWIM_REVENUE',
+    'expenses': 'EXPENSES'
+}
+
+# Scenario parameters that come from each pool's operating metrics, as in default_scenario
+POOL_PARAMETERS = {
+    'members': 'MEMBERS',
+    'avg_dues': 'AVG_DUES',
+    'swim_team': 'SWIM_TEAM_REVENUE',
+    'winter_swim': 'WINTER_SWIM_REVENUE',
+    'other': 'OTHER_REVENUE',
+    **OPERATING_PARAMETERS
+}
+
+# Number of pool files kept parsed in memory
+PORTFOLIO_CACHE_SIZE = 16
+
+@dataclass(frozen=True)
+class Portfolio:
+    """Container for the operating metrics of many pools, one array entry per pool"""
+    pools: Tuple[str, ...]
+    metrics: Mapping[str, np.ndarray]
+
+    @property
+    def size(self) -> int:
+        """Number of pools"""
+        return len(self.pools)
+
+    def scenario_params(self) -> Dict[str, np.ndarray]:
+        """Each pool's operating metrics as evaluate_scenarios parameters"""
+        return {name: self.metrics[key] for name, key in POOL_PARAMETERS.items()}
+
+@dataclass
+class PortfolioResults:
+    """Container for every pool evaluated against every financing scenario"""
+    pools: Tuple[str, ...]
+    scenarios: Dict[str, np.ndarray]
+    metrics: Dict[str, np.ndarray]
+    projections: Optional[Dict[str, np.ndarray]] = None
+
+    def to_frame(self, metrics: Optional[List[str]] = None) -> 'pd.DataFrame':
+        """
+        Flatten the results to one row per pool and scenario.
+
+        Args:
+            metrics: Metric names to include; defaults to every metric
+
+        Returns:
+            DataFrame with pool, scenario number, scenario inputs and metrics
+        """
+        import pandas as pd
+
+        pools, scenarios = next(iter(self.metrics.values())).shape
+        frame = pd.DataFrame({
+            'pool': np.repeat(np.array(self.pools, dtype=object), scenarios),
+            'scenario': np.tile(np.arange(scenarios), pools)
+        })
+        for name, values in self.scenarios.items():
+            if values.ndim == 1:
+                frame[name] = np.tile(values, pools)
+        for name in metrics or list(self.metrics):
+            frame[name] = self.metrics[name].ravel()
+        return frame
+
+def _pool_records(path: str) -> List[Dict[str, str]]:
+    """Read the raw pool records of a CSV or JSON file"""
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            data = json.load(f)
+        records = data['pools'] if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            raise ValueError(f"{path}: expected a list of pool records")
+        return records
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def parse_portfolio(records: List[Mapping[str, object]], source: str = 'pools') -> Portfolio:
+    """
+    Build a portfolio from pool records.
+
+    Args:
+        records: One mapping per pool with the POOL_FIELDS columns, a pool
+            name and total_revenue or other_revenue
+        source: Name used in error messages
+
+    Returns:
+        Portfolio with derived AVG_DUES, OTHER_REVENUE and TOTAL_REVENUE
+
+    Raises:
+        ValueError: If a record is missing a column or holds an invalid value
+    """
+    if not records:
+        raise ValueError(f"{source}: no pools found")
+
+    columns = {name: [] for name in (*POOL_FIELDS, 'revenue')}
+    pools = []
+    for number, record in enumerate(records, start=1):
+        pool = str(record.get('pool') or f"Pool {number}")
+        revenue_field = 'total_revenue' if record.get('total_revenue') not in (None, '') else 'other_revenue'
+        try:
+            values = {name: float(record[name]) for name in POOL_FIELDS}
+            values['revenue'] = float(record[revenue_field])
+        except KeyError as e:
+            raise ValueError(f"{source}: {pool} is missing {e.args[0]}") from None
+        except (TypeError, ValueError):
+            raise ValueError(f"{source}: {pool} has a non-numeric value") from None
+        if values['members'] <= 0 or values['members'] != int(values['members']):
+            raise ValueError(f"{source}: {pool} must have a positive whole number of members")
+        if revenue_field == 'other_revenue':
+            values['revenue'] += values['dues_revenue'] + values['swim_team_revenue'] + values['winter_swim_revenue']
+        pools.append(pool)
+        for name, value in values.items():
+            columns[name].append(value)
+
+    metrics = {key: np.array(columns[name]) for name, key in POOL_FIELDS.items()}
+    metrics['MEMBERS'] = metrics['MEMBERS'].astype(np.int64)
+    metrics = config.derive_operating_metrics(metrics, total_revenue=np.array(columns['revenue']))
+    for values in metrics.values():
+        # Parsed portfolios are shared through the cache, so guard them against edits
+        values.flags.writeable = False
+    return Portfolio(pools=tuple(pools), metrics=metrics)
+
+@lru_cache(maxsize=PORTFOLIO_CACHE_SIZE)
+def _load_portfolio(path: str, modified: int, size: int) -> Portfolio:
+    return parse_portfolio(_pool_records(path), source=os.path.basename(path))
+
+def load_portfolio(path: str) -> Portfolio:
+    """
+    Load a pool file, parsing it only the first time or after it changes.
+
+    Args:
+        path: CSV or JSON pool file
+
+    Returns:
+        Portfolio shared by every caller in this process
+    """
+    stat = os.stat(path)
+    return _load_portfolio(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+def cross_params(portfolio: Portfolio, scenarios: Mapping[str, ArrayLike]) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Pair every pool with every financing scenario.
+
+    Args:
+        portfolio: Pools to evaluate
+        scenarios: Financing scenario parameters, each a scalar or a 1-D
+            array with one value per scenario
+
+    Returns:
+        (evaluate_scenarios parameters with pool-major rows, number of scenarios)
+
+    Raises:
+        ValueError: If a scenario sets a parameter that comes from the pool file
+    """
+    overlap = set(scenarios) & set(POOL_PARAMETERS)
+    if overlap:
+        raise ValueError(f"Parameters set by each pool's operating metrics: {sorted(overlap)}")
+    arrays = {name: np.atleast_1d(np.asarray(values)) for name, values in scenarios.items()}
+    count = np.broadcast_shapes(*(a.shape[:1] for a in arrays.values())) if arrays else (1,)
+    params = {}
+    for name, a in arrays.items():
+        # Yearly inflation paths keep their year axis
+        a = np.broadcast_to(a, count + a.shape[1:])
+        params[name] = np.tile(a, (portfolio.size,) + (1,) * (a.ndim - 1))
+    params.update({
+        name: np.repeat(values, count[0]) for name, values in portfolio.scenario_params().items()
+    })
+    return params, count[0]
+
+def evaluate_portfolio(
+    portfolio: Portfolio,
+    scenarios: Mapping[str, ArrayLike],
+    horizon: int = 20,
+    keep_projections: bool = False,
+    money_mode: str = 'float'
+) -> PortfolioResults:
+    """
+    Evaluate every pool against every financing scenario in one batch.
+
+    Args:
+        portfolio: Pools to evaluate
+        scenarios: Financing scenario parameters, each a scalar or a 1-D
+            array with one value per scenario; anything not given, other than
+            the pools' own operating metrics, uses the calculator defaults
+        horizon: Last projection year
+        keep_projections: Also return the (pool x scenario x year) projections
+        money_mode: 'float' for float dollars or 'cents' for int64 cents
+
+    Returns:
+        PortfolioResults with (pool x scenario) metrics, including
+        min_surplus, final_surplus and first_deficit_year (-1 if none)
+    """
+    unknown = set(scenarios) - set(SCENARIO_PARAMETERS)
+    if unknown:
+        raise KeyError(f"Unknown scenario parameters: {sorted(unknown)}")
+    params, count = cross_params(portfolio, scenarios)
+    results = evaluate_scenarios(params, horizon=horizon, money_mode=money_mode)
+    shape = (portfolio.size, count)
+
+    surplus = results.projections['Operating Surplus']
+    deficit = surplus < 0
+    metrics = {name: values.reshape(shape) for name, values in results.metrics.items()}
+    metrics.update({
+        'final_surplus': surplus[:, -1].reshape(shape),
+        'min_surplus': surplus.min(axis=1).reshape(shape),
+        'first_deficit_year': np.where(deficit.any(axis=1), deficit.argmax(axis=1), -1).reshape(shape)
+    })
+    projections = None
+    if keep_projections:
+        projections = {name: values.reshape(shape + values.shape[1:]) for name, values in results.projections.items()}
+    return PortfolioResults(
+        pools=portfolio.pools,
+        scenarios={name: params[name][:count] for name in scenarios},
+        metrics=metrics,
+        projections=projections
+    )
@@ -0,0 +1,308 @@
+"""
+Indexed queries over stored sweep results for the Daleview Pool Financial Calculator.
+Builds sorted indexes beside a column store and answers filtered lookups without full scans.
+
+A sorted index on a column is two files in the store's index directory: the
+row numbers in value order (<column>.order.bin) and the values in that order
+(<column>.values.bin). A range condition on an indexed column is a binary
+search into the sorted values, so its matching rows are found by reading a
+few pages. The most selective indexed condition picks the candidate rows and
+every other condition is checked against those rows alone.
+"""
+import json
+import math
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .colstore import INDEX_DIRECTORY, META_FILE, ColumnStore
+from .instrumentation import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INDEX_FILE = 'index.json'
+
+# Condition operators; between and outside take an inclusive (low, high) pair
+OPERATORS = ('<', '<=', '>', '>=', '==', '!=', 'between', 'outside')
+
+# Rows per block when a query has to scan a column
+SCAN_CHUNK_SIZE = 4_000_000
+
+Value = Union[int, float]
+
+@dataclass(frozen=True)
+class Condition:
+    """Container for one filter on a stored column"""
+    column: str
+    op: str
+    value: Union[Value, Tuple[Value, Value]]
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"Unknown operator {self.op!r}; expected one of {', '.join(OPERATORS)}")
+
+    def intervals(self) -> List[Tuple[float, bool, float, bool]]:
+        """Matching values as (low, low inclusive, high, high inclusive) intervals"""
+        inf = float('inf')
+        if self.op in ('between', 'outside'):
+            low, high = self.value
+            if self.op == 'between':
+                return [(low, True, high, True)]
+            return [(-inf, True, low, False), (high, False, inf, True)]
+        value = self.value
+        return {
+            '<': [(-inf, True, value, False)],
+            '<=': [(-inf, True, value, True)],
+            '>': [(value, False, inf, True)],
+            '>=': [(value, True, inf, True)],
+            '==': [(value, True, value, True)],
+            '!=': [(-inf, True, value, False), (value, False, inf, True)]
+        }[self.op]
+
+    def mask(self, values: np.ndarray) -> np.ndarray:
+        """Boolean mask of the values that satisfy the condition"""
+        mask = np.zeros(len(values), dtype=bool)
+        for low, low_inclusive, high, high_inclusive in self.intervals():
+            above = values >= low if low_inclusive else values > low
+            below = values <= high if high_inclusive else values < high
+            mask |= above & below
+        return mask
+
+def no_deficit_through(year: int, horizon: Optional[int] = None) -> Condition:
+    """
+    Condition for scenarios whose surplus stays positive every year through year.
+
+    Args:
+        year: Last year that must have a surplus
+        horizon: Last year the sweep evaluated, e.g. SweepQuery.horizon
+
+    Raises:
+        ValueError: If year is past the horizon, where no deficit was looked for
+    """
+    if horizon is not None and year > horizon:
+        raise ValueError(f"The sweep only projected through year {horizon}, not year {year}")
+    # first_deficit_year is -1 when the surplus never goes negative through the horizon
+    return Condition('first_deficit_year', 'outside', (0, year))
+
+def _search(values: np.ndarray, bound: float, side: str) -> int:
+    """Binary search a sorted column for a bound, without converting the column to the bound's type"""
+    if math.isinf(bound):
+        return 0 if bound < 0 else len(values)
+    if values.dtype.kind in 'iu' and bound != math.floor(bound):
+        # Values either side of a fractional bound are split at its floor
+        bound, side = math.floor(bound), 'right'
+    return int(np.searchsorted(values, values.dtype.type(bound), side=side))
+
+def _is_current(meta: Dict, store: ColumnStore) -> bool:
+    """Whether index metadata was built from the store's current rows"""
+    return meta['rows'] == store.rows and meta.get('generation') == store.generation
+
+@timed
+def build_indexes(path: str, columns: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Build sorted indexes for columns of a column store.
+
+    Each column is sorted in memory, so building needs room for one column
+    and its row order; querying afterwards does not.
+
+    Args:
+        path: Column store directory
+        columns: Columns to index; defaults to every column
+
+    Returns:
+        Names of the indexed columns
+    """
+    store = ColumnStore(path)
+    directory = os.path.join(path, INDEX_DIRECTORY)
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, INDEX_FILE)
+    meta = {'rows': store.rows, 'generation': store.generation, 'columns': {}}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            existing = json.load(f)
+        if _is_current(existing, store):
+            meta = existing
+
+    order_dtype = np.uint32 if store.rows < 2**32 else np.int64
+    names = list(columns or store.columns)
+    for name in names:
+        values = np.asarray(store[name])
+        order = np.argsort(values, kind='stable').astype(order_dtype, copy=False)
+        order.tofile(os.path.join(directory, f'{name}.order.bin'))
+        values[order].tofile(os.path.join(directory, f'{name}.values.bin'))
+        meta['columns'][name] = np.dtype(order_dtype).str
+
+    temporary = meta_path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temporary, meta_path)
+    return names
+
+@dataclass
+class QueryResult:
+    """Container for the rows matching a query"""
+    rows: np.ndarray
+    seconds: float
+    plan: List[str]
+
+    @property
+    def count(self) -> int:
+        """Number of matching rows"""
+        return len(self.rows)
+
+class SweepQuery:
+    """Filtered lookups over a column store, using its sorted indexes where they exist"""
+
+    def __init__(self, path: str):
+        self.store = ColumnStore(path)
+        self._directory = os.path.join(path, INDEX_DIRECTORY)
+        self._index_dtypes: Dict[str, np.dtype] = {}
+        meta_path = os.path.join(self._directory, INDEX_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            # An index built before more rows were appended, or from an
+            # overwritten store, would not match the columns
+            if _is_current(meta, self.store):
+                self._index_dtypes = {name: np.dtype(code) for name, code in meta['columns'].items()}
+        self._indexes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def horizon(self) -> Optional[int]:
+        """Last projection year of the sweep, or None if the store does not record it"""
+        return self.store.attributes.get('horizon')
+
+    @property
+    def indexed_columns(self) -> List[str]:
+        """Columns with a usable sorted index"""
+        return [name for name in self.store.columns if name in self._index_dtypes]
+
+    def _index(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Row order and sorted values of an indexed column, as memmaps"""
+        if column not in self._indexes:
+            shape = (self.store.rows,)
+            self._indexes[column] = (
+                np.memmap(os.path.join(self._directory, f'{column}.order.bin'),
+                          dtype=self._index_dtypes[column], mode='r', shape=shape),
+                np.memmap(os.path.join(self._directory, f'{column}.values.bin'),
+                          dtype=self.store.dtypes[column], mode='r', shape=shape)
+            )
+        return self._indexes[column]
+
+    def value_range(self, column: str) -> Optional[Tuple[Value, Value]]:
+        """Smallest and largest value of an indexed column, or None without an index"""
+        if column not in self._index_dtypes or self.store.rows == 0:
+            return None
+        _, values = self._index(column)
+        return values[0].item(), values[-1].item()
+
+    def _positions(self, condition: Condition) -> List[Tuple[int, int]]:
+        """Ranges of positions in a column's sorted values that satisfy a condition"""
+        _, values = self._index(condition.column)
+        positions = []
+        for low, low_inclusive, high, high_inclusive in condition.intervals():
+            start = _search(values, low, 'left' if low_inclusive else 'right')
+            stop = _search(values, high, 'right' if high_inclusive else 'left')
+            if stop > start:
+                positions.append((start, stop))
+        return positions
+
+    def _validate(self, conditions: Sequence[Condition]) -> None:
+        for condition in conditions:
+            if condition.column not in self.store:
+                raise KeyError(f"Unknown column: {condition.column}")
+
+    def count(self, conditions: Sequence[Condition]) -> int:
+        """
+        Count the rows matching every condition.
+
+        A single indexed condition is counted from its index alone.
+        """
+        self._validate(conditions)
+        if len(conditions) == 1 and conditions[0].column in self._index_dtypes:
+            return sum(stop - start for start, stop in self._positions(conditions[0]))
+        return self.where(conditions).count
+
+    @timed(name='query.where')
+    def where(self, conditions: Sequence[Condition]) -> QueryResult:
+        """
+        Find the rows matching every condition.
+
+        Args:
+            conditions: Conditions that must all hold; an empty list matches every row
+
+        Returns:
+            QueryResult with the matching row numbers in ascending order
+        """
+        self._validate(conditions)
+        start_time = time.perf_counter()
+        indexed = [(self._positions(c), c) for c in conditions if c.column in self._index_dtypes]
+        scanned = [c for c in conditions if c.column not in self._index_dtypes]
+
+        if indexed:
+            # Seed with the condition matching the fewest rows, then check the rest on those rows only
+            indexed.sort(key=lambda item: sum(stop - start for start, stop in item[0]))
+            positions, first = indexed[0]
+            order, _ = self._index(first.column)
+            rows = np.sort(np.concatenate(
+                [order[start:stop] for start, stop in positions] or [np.empty(0, dtype=order.dtype)]
+            )).astype(np.int64)
+            plan = [f"index {first.column}: {len(rows):,} rows"]
+            for condition in [c for _, c in indexed[1:]] + scanned:
+                rows = rows[condition.mask(self.store[condition.column][rows])]
+                plan.append(f"filter {condition.column}: {len(rows):,} rows")
+        else:
+            matches = []
+            for offset in range(0, self.store.rows, SCAN_CHUNK_SIZE):
+                block = slice(offset, offset + SCAN_CHUNK_SIZE)
+                mask = np.ones(min(SCAN_CHUNK_SIZE, self.store.rows - offset), dtype=bool)
+                for condition in scanned:
+                    mask &= condition.mask(self.store[condition.column][block])
+                matches.append(np.flatnonzero(mask) + offset)
+            rows = np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+            plan = [f"scan {self.store.rows:,} rows: {len(rows):,} rows"]
+        return QueryResult(rows=rows, seconds=time.perf_counter() - start_time, plan=plan)
+
+    def fetch(
+        self,
+        conditions: Sequence[Condition],
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = 1000
+    ) -> 'pd.DataFrame':
+        """
+        Read the rows matching every condition into a DataFrame.
+
+        Args:
+            conditions: Conditions that must all hold
+            columns: Columns to read; defaults to every column
+            limit: Maximum rows to read, in row order; None reads every match
+
+        Returns:
+            DataFrame indexed by row number
+        """
+        rows = self.where(conditions).rows[:limit]
+        frame = self.store.to_frame(columns, rows)
+        frame.index = rows
+        return frame
+
+@lru_cache(maxsize=8)
+def _open_query(path: str, modified: Tuple[float, ...]) -> SweepQuery:
+    return SweepQuery(path)
+
+def open_query(path: str) -> SweepQuery:
+    """
+    Open a store for querying, reusing the open store until it or its indexes change.
+
+    Args:
+        path: Column store directory
+
+    Returns:
+        SweepQuery shared by every caller in this process
+    """
+    meta_files = (os.path.join(path, META_FILE), os.path.join(path, INDEX_DIRECTORY, INDEX_FILE))
+    modified = tuple(os.path.getmtime(f) if os.path.exists(f) else 0.0 for f in meta_files)
+    return _open_query(os.path.abspath(path), modified)
@@ -0,0 +1,155 @@
+"""
+Scenario evaluation for the Daleview Pool Financial Calculator.
+Runs the calculator's full input-to-result chain over many scenarios at once.
+"""
+from typing import Dict, Mapping, Optional, Union
+from dataclasses import dataclass
+import numpy as np
+
+from . import config
+from .money import check_money_mode, to_cents, to_dollars
+from .vectorized import (
+    ArrayLike, FinancingBatch, ProjectionInputs,
+    calculate_financing_metrics_batch, calculate_projections
+)
+
+# Scenario parameters and the config key holding their range, step and default
+SCENARIO_PARAMETERS = {
+    'members': 'MEMBERS',
+    'avg_dues': 'DUES',
+    'swim_team': 'SWIM_TEAM',
+    'winter_swim': 'WINTER_SWIM',
+    'other': 'OTHER',
+    'total_cost': 'PROJECT_COST',
+    'assessment_per_member': 'ASSESSMENT',
+    'bond_participants': 'BOND_PARTICIPANTS',
+    'avg_bond_amount': 'BOND',
+    'bond_interest_rate': 'BOND_RATE',
+    'bond_term': 'BOND_TERM',
+    'commercial_interest_rate': 'COMMERCIAL_RATE',
+    'commercial_term': 'COMMERCIAL_TERM',
+    'inflation_rate': 'INFLATION'
+}
+
+# Operating parameters that are fixed by the pool rather than set by a slider
+OPERATING_PARAMETERS = {
+    'current_members': 'MEMBERS',
+    'current_expenses': 'EXPENSES'
+}
+
+# Parameters that only take whole-number values
+INTEGER_PARAMETERS = {'members', 'bond_participants', 'bond_term', 'commercial_term', 'current_members'}
+
+@dataclass
+class ScenarioResults:
+    """Container for batched scenario evaluation results"""
+    metrics: Dict[str, np.ndarray]
+    projections: Optional[Dict[str, np.ndarray]] = None
+
+    @property
+    def size(self) -> int:
+        """Number of evaluated scenarios"""
+        return len(self.metrics['future_surplus'])
+
+def default_scenario() -> Dict[str, Union[int, float]]:
+    """
+    Get the scenario shown when the calculator first loads.
+
+    Returns:
+        Dictionary with a value for every scenario and operating parameter
+    """
+    scenario = {
+        'members': config.get_operating_metric('MEMBERS'),
+        'avg_dues': int(config.get_operating_metric('AVG_DUES')),
+        'swim_team': config.get_operating_metric('SWIM_TEAM_REVENUE'),
+        'winter_swim': config.get_operating_metric('WINTER_SWIM_REVENUE'),
+        'other': config.get_operating_metric('OTHER_REVENUE')
+    }
+    for name, key in SCENARIO_PARAMETERS.items():
+        if name not in scenario:
+            scenario[name] = config.get_input_default(key)
+    for name, key in OPERATING_PARAMETERS.items():
+        scenario[name] = config.get_operating_metric(key)
+    return scenario
+
+def evaluate_scenarios(
+    params: Mapping[str, ArrayLike],
+    horizon: Optional[int] = 20,
+    money_mode: str = 'float'
+) -> ScenarioResults:
+    """
+    Evaluate the calculator for many scenarios at once.
+
+    Mirrors the chain in streamlit_app.main: revenue model, funding mix,
+    financing metrics and year-by-year projections.
+
+    Args:
+        params: Scenario parameter values, each a scalar or a 1-D array with
+            one value per scenario. Missing parameters use default_scenario().
+        horizon: Last projection year, or None to skip the projections
+        money_mode: 'float' for float dollars, or 'cents' for exact int64
+            cents in every money metric and projection (see src.money)
+
+    Returns:
+        ScenarioResults with per-scenario metrics and, if requested,
+        (scenario x year) projections
+    """
+    check_money_mode(money_mode)
+    unknown = set(params) - set(SCENARIO_PARAMETERS) - set(OPERATING_PARAMETERS)
+    if unknown:
+        raise KeyError(f"Unknown scenario parameters: {sorted(unknown)}")
+
+    values = {**default_scenario(), **params}
+    arrays = {name: np.atleast_1d(np.asarray(value)) for name, value in values.items()}
+    shape = np.broadcast_shapes(*(a.shape[:1] for a in arrays.values()))
+    p = {name: np.broadcast_to(a, shape + a.shape[1:]) for name, a in arrays.items()}
+
+    future_total_revenue = (
+        p['members'] * p['avg_dues'] +
+        p['swim_team'] +
+        p['winter_swim'] +
+        p['other']
+    )
+
+    # Bond participation is capped by the member count, as on the slider
+    bond_participants = np.minimum(p['bond_participants'], p['members'])
+    total_bond_funding = bond_participants * p['avg_bond_amount']
+    total_assessment = p['current_members'] * p['assessment_per_member']
+    remaining_to_finance = p['total_cost'] - total_bond_funding - total_assessment
+
+    finance_metrics = calculate_financing_metrics_batch(FinancingBatch(
+        total_bond_funding=total_bond_funding,
+        bond_term=p['bond_term'],
+        bond_interest_rate=p['bond_interest_rate'],
+        remaining_to_finance=remaining_to_finance,
+        commercial_term=p['commercial_term'],
+        commercial_interest_rate=p['commercial_interest_rate']
+    ), money_mode=money_mode)
+
+    # Revenue and funding amounts are rounded to whole cents once, here
+    money = to_cents if money_mode == 'cents' else (lambda values: values.astype(float))
+    metrics = {
+        'future_total_revenue': money(future_total_revenue),
+        'total_assessment': money(total_assessment),
+        'total_bond_funding': money(total_bond_funding),
+        'remaining_to_finance': money(remaining_to_finance),
+        **finance_metrics
+    }
+    metrics['future_surplus'] = (metrics['future_total_revenue'] - money(p['current_expenses']) -
+                                 finance_metrics['total_annual_debt_service'])
+
+    projections = None
+    if horizon is not None:
+        # Projection inputs are dollars; cents convert back to exactly the same cents
+        dollars = to_dollars if money_mode == 'cents' else (lambda values: values)
+        projections = calculate_projections(ProjectionInputs(
+            future_total_revenue=dollars(metrics['future_total_revenue']),
+            inflation_rate=p['inflation_rate'],
+            current_expenses=p['current_expenses'],
+            annual_bond_payment=dollars(finance_metrics['annual_bond_payment']),
+            annual_loan_payment=dollars(finance_metrics['annual_loan_payment']),
+            bond_term=p['bond_term'],
+            commercial_term=p['commercial_term']
+        ), horizon=horizon, money_mode=money_mode)
+
+    return ScenarioResults(metrics=metrics, projections=projections)
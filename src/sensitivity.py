@@ -0,0 +1,177 @@
+"""
+Sensitivity analysis for the Daleview Pool Financial Calculator.
+Evaluates two-input surplus surfaces and one-at-a-time tornado perturbations in single batched calls.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .instrumentation import timed
+from .scenarios import SCENARIO_PARAMETERS, default_scenario, evaluate_scenarios
+from .sweep import slider_values
+
+# Default number of points along each axis of a surface
+SURFACE_POINTS = 201
+
+# Maximum number of surfaces kept before LRU eviction
+SURFACE_CACHE_SIZE = 64
+
+# Number of evenly spaced values each input takes across its range in a tornado analysis
+TORNADO_POINTS = 11
+
+@dataclass
+class SurplusSurface:
+    """Container for the operating surplus over a grid of two inputs"""
+    x_parameter: str
+    y_parameter: str
+    x: np.ndarray
+    y: np.ndarray
+    year: int
+    first_year_surplus: np.ndarray
+    final_year_surplus: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Number of points along the y and x axes"""
+        return len(self.y), len(self.x)
+
+@lru_cache(maxsize=SURFACE_CACHE_SIZE)
+def _surface(
+    x_parameter: str,
+    y_parameter: str,
+    fixed: Tuple[Tuple[str, Union[int, float]], ...],
+    year: int,
+    points: int
+) -> SurplusSurface:
+    x = slider_values(x_parameter, points)
+    y = slider_values(y_parameter, points)
+    grid_y, grid_x = np.meshgrid(y, x, indexing='ij')
+    results = evaluate_scenarios(
+        {**dict(fixed), x_parameter: grid_x.ravel(), y_parameter: grid_y.ravel()},
+        horizon=year
+    )
+    surplus = results.projections['Operating Surplus']
+    surface = SurplusSurface(
+        x_parameter=x_parameter,
+        y_parameter=y_parameter,
+        x=x,
+        y=y,
+        year=year,
+        first_year_surplus=surplus[:, 0].reshape(grid_x.shape),
+        final_year_surplus=surplus[:, year].reshape(grid_x.shape)
+    )
+    # Cached arrays are shared by every session, so guard them against edits
+    for values in (surface.x, surface.y, surface.first_year_surplus, surface.final_year_surplus):
+        values.flags.writeable = False
+    return surface
+
+@timed
+def surplus_surface(
+    x_parameter: str,
+    y_parameter: str,
+    params: Mapping[str, Union[int, float]],
+    year: int = 20,
+    points: int = SURFACE_POINTS
+) -> SurplusSurface:
+    """
+    Get the operating surplus over a grid of two inputs, through a shared cache.
+
+    Both inputs take evenly spaced values across their slider ranges (every
+    step for whole-number inputs with fewer steps than points); all other
+    inputs stay at the given values. The whole grid is evaluated in a single
+    evaluate_scenarios call.
+
+    Args:
+        x_parameter: Scenario parameter along the x axis
+        y_parameter: Scenario parameter along the y axis
+        params: Values for the other scenario parameters; missing ones use
+            default_scenario()
+        year: Projection year compared with year 0
+        points: Number of points along each axis
+
+    Returns:
+        SurplusSurface with read-only (y x x) surplus arrays
+    """
+    if x_parameter == y_parameter:
+        raise ValueError("x_parameter and y_parameter must differ")
+    fixed = tuple(sorted(
+        (name, value) for name, value in params.items() if name not in (x_parameter, y_parameter)
+    ))
+    return _surface(x_parameter, y_parameter, fixed, year, points)
+
+@dataclass
+class Tornado:
+    """Container for one year's one-at-a-time sensitivity, largest swing first"""
+    year: int
+    base_surplus: float
+    parameters: List[str]
+    low_surplus: np.ndarray
+    high_surplus: np.ndarray
+    low_value: np.ndarray
+    high_value: np.ndarray
+
+    @property
+    def swing(self) -> np.ndarray:
+        """Spread between the highest and lowest surplus for each input"""
+        return self.high_surplus - self.low_surplus
+
+@timed
+def tornado_analysis(
+    params: Mapping[str, Union[int, float]],
+    years: Sequence[int] = (5, 20),
+    parameters: Optional[Sequence[str]] = None,
+    points: int = TORNADO_POINTS
+) -> Dict[int, Tornado]:
+    """
+    Rank inputs by how far they move the operating surplus on their own.
+
+    Each input in turn takes evenly spaced values across its slider range
+    while every other input stays at its given value. The lowest and highest
+    surplus reached is kept, so inputs with a non-monotonic effect (loan
+    terms) are ranked by their full spread rather than their endpoints. The
+    base scenario and every perturbation are evaluated in one
+    evaluate_scenarios call.
+
+    Args:
+        params: Current scenario parameters; missing ones use default_scenario()
+        years: Projection years to rank the inputs for
+        parameters: Inputs to perturb; defaults to every scenario parameter
+        points: Number of values per input across its range
+
+    Returns:
+        Dictionary of Tornado results keyed by year
+    """
+    base = {**default_scenario(), **params}
+    parameters = list(parameters or SCENARIO_PARAMETERS)
+    values = [slider_values(name, points) for name in parameters]
+    counts = np.array([len(v) for v in values])
+
+    # Row 0 is the base scenario; each input's values follow in one block
+    batch = {
+        name: np.full(1 + counts.sum(), base[name], dtype=np.result_type(base[name], v))
+        for name, v in zip(parameters, values)
+    }
+    offsets = 1 + np.r_[0, np.cumsum(counts)[:-1]]
+    for name, offset, v in zip(parameters, offsets, values):
+        batch[name][offset:offset + len(v)] = v
+    surplus = evaluate_scenarios({**base, **batch}, horizon=max(years)).projections['Operating Surplus']
+
+    results = {}
+    for year in years:
+        per_input = np.split(surplus[1:, year], np.cumsum(counts)[:-1])
+        low = np.array([block.argmin() for block in per_input])
+        high = np.array([block.argmax() for block in per_input])
+        low_surplus = np.array([block[i] for block, i in zip(per_input, low)])
+        high_surplus = np.array([block[i] for block, i in zip(per_input, high)])
+        order = np.argsort(low_surplus - high_surplus, kind='stable')
+        results[year] = Tornado(
+            year=year,
+            base_surplus=float(surplus[0, year]),
+            parameters=[parameters[i] for i in order],
+            low_surplus=low_surplus[order],
+            high_surplus=high_surplus[order],
+            low_value=np.array([values[i][low[i]] for i in order], dtype=float),
+            high_value=np.array([values[i][high[i]] for i in order], dtype=float)
+        )
+    return results
@@ -0,0 +1,394 @@
+"""
+Local JSON calculation service for the Daleview Pool Financial Calculator.
+Serves financing metrics, projections and sweeps over HTTP from a bounded worker pool, without Streamlit.
+
+Usage:
+    python -m src.service [--port 8765] [--workers 4] [--queue-size 64] [--pool thread|process]
+
+Endpoints (POST bodies and responses are JSON):
+    POST /financing-metrics   {"inputs": {...FinancingInputs fields}} or {"batch": [{...}, ...]}
+    POST /projections         {"inputs": {...ProjectionInputs fields}, "horizon": 20} or {"batch": [...]}
+    POST /sweep               {"axes": {"members": 10, "avg_dues": [600, 700]}, "fixed": {...},
+                               "horizon": 20, "metrics": false, "report_years": [5]}
+    GET  /stats               per-endpoint latency percentiles, cache counters and queue state
+    GET  /health              {"status": "ok"}
+
+When every worker is busy and the queue is full, requests get 503 with a
+Retry-After header instead of waiting. Results are cached across requests:
+financing metrics and projections through src.cache, sweeps by request body.
+With --pool process each worker process keeps its own cache.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .cache import cache_stats, cached_financing_metrics, cached_projections
+from .calculations import FinancingInputs
+from .sweep import evaluate_chunk, make_grid
+from .vectorized import ProjectionInputs
+
+DEFAULT_PORT = 8765
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Largest batch and sweep a single request may ask for
+MAX_BATCH_SIZE = 100_000
+MAX_SWEEP_POINTS = 1_000_000
+
+# Sweep responses kept for repeated requests
+SWEEP_CACHE_SIZE = 32
+
+# Most recent requests per endpoint used for latency percentiles
+LATENCY_WINDOW = 10_000
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+class RequestError(ValueError):
+    """Raised for a request the service cannot evaluate; answered with 400"""
+
+def _items(payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+    """Get the input records of a single or batched request, and whether it was batched"""
+    if 'batch' in payload:
+        batch = payload['batch']
+        if not isinstance(batch, list):
+            raise RequestError("batch must be a list of input objects")
+        if len(batch) > MAX_BATCH_SIZE:
+            raise RequestError(f"batch holds {len(batch):,} items; the limit is {MAX_BATCH_SIZE:,}")
+        return batch, True
+    if 'inputs' in payload:
+        return [payload['inputs']], False
+    raise RequestError("request must hold inputs or batch")
+
+def _build(cls: Callable, item: Any):
+    """Build an inputs dataclass from a JSON object"""
+    if not isinstance(item, dict):
+        raise RequestError("each input must be a JSON object")
+    try:
+        return cls(**item)
+    except TypeError as e:
+        raise RequestError(f"invalid {cls.__name__}: {e}") from None
+
+def _json_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert arrays and NumPy scalars to JSON-ready lists and numbers"""
+    return {key: value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value
+            for key, value in values.items()}
+
+def _is_whole(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _check_axes(axes: Any) -> None:
+    """Reject sweep axes make_grid cannot build a grid from"""
+    if isinstance(axes, list):
+        if not all(isinstance(name, str) for name in axes):
+            raise RequestError("axes listed by name must be parameter names")
+        return
+    if not isinstance(axes, dict):
+        raise RequestError("sweep needs axes: parameter names, or names mapped to values or point counts")
+    for name, values in axes.items():
+        if values is None or (_is_whole(values) and 0 < values <= MAX_SWEEP_POINTS):
+            continue
+        if not isinstance(values, list) or not values or not all(_is_number(value) for value in values):
+            raise RequestError(f"axis {name} must be a point count from 1 to {MAX_SWEEP_POINTS:,}, "
+                               "a non-empty list of numbers or null")
+
+def _horizon(payload: Dict[str, Any]) -> int:
+    """Get a request's projection horizon"""
+    horizon = payload.get('horizon', 20)
+    if not _is_whole(horizon) or not 0 <= horizon <= 100:
+        raise RequestError("horizon must be a whole number of years from 0 to 100")
+    return horizon
+
+def _financing_inputs(item: Any) -> FinancingInputs:
+    """Build FinancingInputs, rejecting loan terms the payment formula cannot use"""
+    inputs = _build(FinancingInputs, item)
+    for name in ('bond_term', 'commercial_term'):
+        term = getattr(inputs, name)
+        if not _is_whole(term) or term <= 0:
+            raise RequestError(f"{name} must be a whole number of years above 0")
+    return inputs
+
+def financing_metrics_endpoint(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Financing metrics for one or many FinancingInputs, through the shared cache"""
+    items, batched = _items(payload)
+    try:
+        results = [_json_values(cached_financing_metrics(_financing_inputs(item))) for item in items]
+    except TypeError:
+        raise RequestError("financing inputs must be single numbers") from None
+    return {'results': results} if batched else {'result': results[0]}
+
+def projections_endpoint(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Year-by-year projections for one or many scalar ProjectionInputs, through the shared cache"""
+    items, batched = _items(payload)
+    horizon = _horizon(payload)
+    results = []
+    for item in items:
+        inputs = _build(ProjectionInputs, item)
+        try:
+            projections = cached_projections(inputs, horizon)
+        except TypeError:
+            raise RequestError("projection inputs must be single numbers") from None
+        results.append({key: values[0].tolist() for key, values in projections.items()})
+    return {'results': results} if batched else {'result': results[0]}
+
+@lru_cache(maxsize=SWEEP_CACHE_SIZE)
+def _sweep(request: str) -> Dict[str, Any]:
+    payload = json.loads(request)
+    try:
+        grid = make_grid(payload['axes'], payload.get('fixed'))
+        if grid.size > MAX_SWEEP_POINTS:
+            raise RequestError(f"sweep has {grid.size:,} points; the limit is {MAX_SWEEP_POINTS:,}. "
+                               "Run larger sweeps with src.sweep.run_sweep")
+        columns = evaluate_chunk(
+            grid, 0, grid.size,
+            horizon=payload.get('horizon', 20),
+            metrics=bool(payload.get('metrics', False)),
+            report_years=tuple(payload.get('report_years', ()))
+        )
+    except KeyError as e:
+        raise RequestError(f"unknown scenario parameter {e.args[0]}") from None
+    return {'rows': grid.size, 'columns': _json_values(columns)}
+
+def sweep_endpoint(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Every point of a grid of scenario parameters, cached by request"""
+    _check_axes(payload.get('axes'))
+    _horizon(payload)
+    report_years = payload.get('report_years', [])
+    if not isinstance(report_years, list) or not all(_is_whole(year) and year >= 0 for year in report_years):
+        raise RequestError("report_years must be a list of whole numbers of years")
+    fixed = payload.get('fixed', {})
+    if not isinstance(fixed, dict) or not all(_is_number(value) for value in fixed.values()):
+        raise RequestError("fixed must map parameter names to numbers")
+    return _sweep(json.dumps(payload, sort_keys=True))
+
+# POST paths and the function answering each; functions must be picklable for process pools
+ENDPOINTS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    '/financing-metrics': financing_metrics_endpoint,
+    '/projections': projections_endpoint,
+    '/sweep': sweep_endpoint
+}
+
+def _cache_stats() -> Dict[str, Any]:
+    stats = cache_stats()
+    info = _sweep.cache_info()
+    stats['sweep'] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+    return stats
+
+class LatencyStats:
+    """Thread-safe request counters and recent latencies for each endpoint"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._window = window
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, seconds: float, status: int) -> None:
+        """Record one finished request"""
+        with self._lock:
+            if endpoint not in self._counts:
+                self._latencies[endpoint] = deque(maxlen=self._window)
+                self._counts[endpoint] = {'requests': 0, 'invalid': 0, 'errors': 0, 'rejected': 0}
+            counts = self._counts[endpoint]
+            counts['requests'] += 1
+            if status == 503:
+                counts['rejected'] += 1
+            elif status >= 500:
+                counts['errors'] += 1
+            elif status >= 400:
+                counts['invalid'] += 1
+            else:
+                self._latencies[endpoint].append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and latency percentiles, in milliseconds, of successful requests per endpoint"""
+        with self._lock:
+            snapshot = {name: (dict(self._counts[name]), np.array(latencies))
+                        for name, latencies in self._latencies.items()}
+        summary = {}
+        for name, (counts, latencies) in snapshot.items():
+            summary[name] = counts
+            if len(latencies):
+                values = np.percentile(latencies * 1000, LATENCY_PERCENTILES)
+                summary[name].update({f'p{p}_ms': round(float(v), 3) for p, v in zip(LATENCY_PERCENTILES, values)})
+                summary[name]['max_ms'] = round(float(latencies.max() * 1000), 3)
+        return summary
+
+class ServiceBusy(Exception):
+    """Raised when every worker is busy and the queue is full"""
+
+class CalculationService:
+    """Worker pool with a bounded queue and per-endpoint latency statistics"""
+
+    def __init__(self, workers: int = 4, queue_size: int = 64, pool: str = 'thread'):
+        """
+        Args:
+            workers: Requests evaluated at once
+            queue_size: Requests allowed to wait for a worker before new ones are rejected
+            pool: 'thread' to share one result cache, or 'process' for parallel CPU work
+        """
+        if pool not in ('thread', 'process'):
+            raise ValueError("pool must be 'thread' or 'process'")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pool = pool
+        self.stats = LatencyStats()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Executor = (ThreadPoolExecutor(max_workers=workers, thread_name_prefix='calc')
+                                    if pool == 'thread' else ProcessPoolExecutor(max_workers=workers))
+
+    def submit(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate a request on the worker pool and wait for its result.
+
+        Raises:
+            ServiceBusy: If the queue is full
+            ValueError: If the request is invalid
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusy()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(ENDPOINTS[endpoint], payload).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def status(self) -> Dict[str, Any]:
+        """Latency statistics, cache counters and queue state"""
+        status = {
+            'endpoints': self.stats.summary(),
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'in_flight': self._in_flight,
+            'pool': self.pool
+        }
+        if self.pool == 'thread':
+            status['cache'] = _cache_stats()
+        return status
+
+    def shutdown(self) -> None:
+        """Stop the worker pool once running requests finish"""
+        self._executor.shutdown(wait=True)
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front end; each connection is handled on its own thread"""
+    server_version = 'DaleviewCalc/1.0'
+    service: CalculationService
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == '/stats':
+            self._send(200, self.service.status())
+        elif self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        else:
+            self._send(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        status = self._respond()
+        if self.path in ENDPOINTS:
+            self.service.stats.record(self.path, time.perf_counter() - start, status)
+
+    def _respond(self) -> int:
+        if self.path not in ENDPOINTS:
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return 404
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {'error': f"request body over {MAX_BODY_BYTES:,} bytes"})
+            return 413
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise RequestError("request body must be a JSON object")
+            result = self.service.submit(self.path, payload)
+        except ServiceBusy:
+            self._send(503, {'error': "all workers busy, try again"}, {'Retry-After': '1'})
+            return 503
+        except ValueError as e:
+            # Includes RequestError, malformed JSON and inputs the calculations reject
+            self._send(400, {'error': str(e)})
+            return 400
+        except Exception as e:
+            self._send(500, {'error': f"{type(e).__name__}: {e}"})
+            return 500
+        self._send(200, result)
+        return 200
+
+    def log_message(self, format: str, *args) -> None:
+        # Per-request logging would dominate the cost of small requests; see /stats
+        pass
+
+def make_server(host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                service: Optional[CalculationService] = None) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server; call serve_forever() on it to start serving.
+
+    Args:
+        host: Interface to listen on; the default only accepts local connections
+        port: TCP port, or 0 for any free port
+        service: Worker pool to evaluate requests on; defaults to CalculationService()
+
+    Returns:
+        ThreadingHTTPServer whose handler's service attribute is the worker pool
+    """
+    handler = type('Handler', (_Handler,), {'service': service or CalculationService()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.service',
+        description='Serve the Daleview Pool calculator as a local JSON API.'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='interface to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port')
+    parser.add_argument('--workers', type=int, default=4, help='requests evaluated at once')
+    parser.add_argument('--queue-size', type=int, default=64, help='requests waiting before new ones get 503')
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread',
+                        help='worker threads sharing one cache, or worker processes')
+    args = parser.parse_args(argv)
+
+    service = CalculationService(args.workers, args.queue_size, args.pool)
+    server = make_server(args.host, args.port, service)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"with {args.workers} {args.pool} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,5 +20,9 @@ CHART_COLORS = {
         'expenses': 'red',
         'debt': 'blue',
         'surplus': 'purple'
+    },
+    'tornado': {
+        'low': '#ff9999',
+        'high': '#99ff99'
     }
 }
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Sensitivity sweep engine for the Daleview Pool Financial Calculator.
+Evaluates the Cartesian grid of calculator inputs in bounded-memory chunks.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Sequence, Union
+import numpy as np
+
+from . import config
+from .scenarios import SCENARIO_PARAMETERS, evaluate_scenarios
+
+# Outcome columns written for every grid point; first_deficit_year is -1
+# when the surplus stays positive through the horizon
+SWEEP_OUTCOMES = [
+    'future_surplus',
+    'final_surplus',
+    'min_surplus',
+    'first_deficit_year',
+    'peak_debt_percentage',
+    'total_annual_debt_service',
+    'total_cost_of_borrowing'
+]
+
+# Year metric columns written for each report year, as <prefix>_year_<n>
+YEAR_METRIC_PREFIXES = {
+    'Revenue': 'revenue',
+    'Operating Expenses': 'operating_expenses',
+    'Debt Service': 'debt_service',
+    'Debt % of Costs': 'debt_percentage',
+    'Operating Surplus': 'surplus'
+}
+
+@dataclass
+class SweepGrid:
+    """Container for a Cartesian grid of scenario parameters"""
+    axes: Dict[str, np.ndarray]
+    fixed: Dict[str, Union[int, float]] = field(default_factory=dict)
+
+    @property
+    def shape(self) -> tuple:
+        """Number of points along each swept axis"""
+        return tuple(len(values) for values in self.axes.values())
+
+    @property
+    def size(self) -> int:
+        """Total number of grid points"""
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def scenarios(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """
+        Get the parameters for a contiguous block of grid points.
+
+        Args:
+            start: First flat grid index
+            stop: One past the last flat grid index
+
+        Returns:
+            Dictionary of scenario parameters for evaluate_scenarios
+        """
+        indices = np.unravel_index(np.arange(start, stop, dtype=np.int64), self.shape)
+        params = dict(self.fixed)
+        for (name, values), index in zip(self.axes.items(), indices):
+            params[name] = values[index]
+        return params
+
+def slider_values(name: str, points: Optional[int] = None) -> np.ndarray:
+    """
+    Get the values a scenario parameter can take on its slider.
+
+    Args:
+        name: Scenario parameter name from SCENARIO_PARAMETERS
+        points: Optional number of evenly spaced points instead of every step
+
+    Returns:
+        Array of parameter values across the configured input range
+    """
+    key = SCENARIO_PARAMETERS[name]
+    low, high = config.get_input_range(key)
+    if points is not None:
+        values = np.linspace(low, high, points)
+    else:
+        step = config.get_input_step(key)
+        values = low + step * np.arange(int(round((high - low) / step)) + 1)
+    if isinstance(low, int) and isinstance(high, int):
+        return np.unique(np.round(values).astype(np.int64))
+    return np.round(values, 10)
+
+def make_grid(
+    axes: Union[Sequence[str], Mapping[str, Union[int, Sequence[float], None]]],
+    fixed: Optional[Mapping[str, Union[int, float]]] = None
+) -> SweepGrid:
+    """
+    Build a sweep grid from parameter names and their values.
+
+    Args:
+        axes: Parameter names to sweep over their full slider range, or a
+            mapping from name to explicit values, a point count, or None
+        fixed: Values for parameters that are not swept; anything else uses
+            the calculator defaults
+
+    Returns:
+        SweepGrid ready for run_sweep
+    """
+    if not isinstance(axes, Mapping):
+        axes = {name: None for name in axes}
+
+    grid_axes = {}
+    for name, values in axes.items():
+        if values is None or isinstance(values, int):
+            grid_axes[name] = slider_values(name, values)
+        else:
+            grid_axes[name] = np.asarray(values)
+    return SweepGrid(axes=grid_axes, fixed=dict(fixed or {}))
+
+def evaluate_chunk(
+    grid: SweepGrid,
+    start: int,
+    stop: int,
+    horizon: int = 20,
+    metrics: bool = False,
+    report_years: Sequence[int] = ()
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate one block of grid points.
+
+    Args:
+        grid: Grid being swept
+        start: First flat grid index
+        stop: One past the last flat grid index
+        horizon: Last projection year for the surplus outcomes
+        metrics: Also write every financing metric from evaluate_scenarios
+        report_years: Years whose year metrics are written out
+
+    Returns:
+        Dictionary of swept input columns followed by SWEEP_OUTCOMES columns,
+        then any financing metric and year metric columns
+    """
+    params = grid.scenarios(start, stop)
+    results = evaluate_scenarios(params, horizon=horizon)
+    surplus = results.projections['Operating Surplus']
+    deficit = surplus < 0
+
+    columns = {name: params[name] for name in grid.axes}
+    columns.update({
+        'future_surplus': results.metrics['future_surplus'],
+        'final_surplus': surplus[:, -1],
+        'min_surplus': surplus.min(axis=1),
+        'first_deficit_year': np.where(deficit.any(axis=1), deficit.argmax(axis=1), -1),
+        'peak_debt_percentage': results.projections['Debt % of Costs'].max(axis=1),
+        'total_annual_debt_service': results.metrics['total_annual_debt_service'],
+        'total_cost_of_borrowing': results.metrics['total_cost_of_borrowing']
+    })
+    if metrics:
+        columns.update({name: values for name, values in results.metrics.items() if name not in columns})
+    for year in report_years:
+        if year <= horizon:
+            for metric, prefix in YEAR_METRIC_PREFIXES.items():
+                columns[f'{prefix}_year_{year}'] = results.projections[metric][:, year]
+    return columns
+
+class CsvSweepWriter:
+    """Append sweep result chunks to a CSV file as they arrive"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', newline='')
+        self._header_written = False
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append one chunk of result columns"""
+        if not self._header_written:
+            self._file.write(','.join(columns) + '\n')
+            self._header_written = True
+        np.savetxt(self._file, np.column_stack(list(columns.values())), fmt='%.10g', delimiter=',')
+
+    def close(self) -> None:
+        """Flush and close the output file"""
+        self._file.close()
+
+    def __enter__(self) -> 'CsvSweepWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def run_sweep(
+    grid: SweepGrid,
+    writer,
+    chunk_size: int = 100_000,
+    processes: Optional[int] = None,
+    horizon: int = 20,
+    progress: Optional[Callable[[int, int], None]] = None,
+    metrics: bool = False,
+    report_years: Sequence[int] = ()
+) -> int:
+    """
+    Evaluate every grid point and stream the results to a writer.
+
+    Chunks are evaluated across a process pool and written in grid order.
+    At most two chunks per worker are in flight, so memory stays bounded
+    regardless of grid size.
+
+    Args:
+        grid: Grid to sweep
+        writer: Object with a write(columns) method, e.g. CsvSweepWriter or
+            colstore.ColumnStoreWriter for sweeps too large for memory;
+            writers with set_attributes also record the horizon
+        chunk_size: Grid points evaluated per task
+        processes: Worker processes; defaults to all cores, 1 runs in-process
+        horizon: Last projection year for the surplus outcomes
+        progress: Optional callback receiving (rows_done, total_rows)
+        metrics: Also write every financing metric from evaluate_scenarios
+        report_years: Years whose year metrics are written out
+
+    Returns:
+        Number of rows written
+    """
+    total = grid.size
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    processes = processes or os.cpu_count() or 1
+    done = 0
+    if hasattr(writer, 'set_attributes'):
+        # first_deficit_year of -1 only means no deficit through this year
+        writer.set_attributes(horizon=horizon)
+
+    def emit(columns: Dict[str, np.ndarray]) -> None:
+        nonlocal done
+        writer.write(columns)
+        done += len(columns['future_surplus'])
+        if progress is not None:
+            progress(done, total)
+
+    if processes == 1:
+        for start, stop in bounds:
+            emit(evaluate_chunk(grid, start, stop, horizon, metrics, report_years))
+        return done
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for start, stop in bounds:
+            pending.append(pool.submit(evaluate_chunk, grid, start, stop, horizon, metrics, report_years))
+            if len(pending) >= 2 * processes:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return done
@@ -0,0 +1,298 @@
+"""
+Vectorized calculation functions for the Daleview Pool Financial Calculator.
+NumPy counterparts of src.calculations for evaluating many scenarios at once.
+"""
+from typing import Dict, Sequence, Union
+from dataclasses import dataclass
+import numpy as np
+
+from .annuity import annuity_arrays
+from .calculations import FinancingInputs
+from .money import check_money_mode, round_cents, to_cents
+
+ArrayLike = Union[float, int, Sequence[float], np.ndarray]
+
+@dataclass
+class FinancingBatch:
+    """Struct-of-arrays container for batched financing calculation inputs"""
+    total_bond_funding: np.ndarray
+    bond_term: np.ndarray
+    bond_interest_rate: np.ndarray
+    remaining_to_finance: np.ndarray
+    commercial_term: np.ndarray
+    commercial_interest_rate: np.ndarray
+
+    def __post_init__(self):
+        self.total_bond_funding = np.asarray(self.total_bond_funding, dtype=float)
+        self.bond_term = np.asarray(self.bond_term, dtype=np.int64)
+        self.bond_interest_rate = np.asarray(self.bond_interest_rate, dtype=float)
+        self.remaining_to_finance = np.asarray(self.remaining_to_finance, dtype=float)
+        self.commercial_term = np.asarray(self.commercial_term, dtype=np.int64)
+        self.commercial_interest_rate = np.asarray(self.commercial_interest_rate, dtype=float)
+
+    @classmethod
+    def from_inputs(cls, inputs: Sequence[FinancingInputs]) -> 'FinancingBatch':
+        """Build a batch from a sequence of scalar FinancingInputs"""
+        return cls(
+            total_bond_funding=[i.total_bond_funding for i in inputs],
+            bond_term=[i.bond_term for i in inputs],
+            bond_interest_rate=[i.bond_interest_rate for i in inputs],
+            remaining_to_finance=[i.remaining_to_finance for i in inputs],
+            commercial_term=[i.commercial_term for i in inputs],
+            commercial_interest_rate=[i.commercial_interest_rate for i in inputs]
+        )
+
+def _growth_factor(monthly_rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Calculate (1 + monthly_rate)**months element-wise.
+
+    NumPy's SIMD power can differ from the C library pow used by Python floats
+    in the last bit, so the factor is evaluated once per distinct
+    (rate, months) pair with Python's pow and gathered back. Rates and terms
+    come from small slider grids, so the number of distinct pairs stays small.
+
+    Args:
+        monthly_rate: Monthly interest rates as fractions
+        months: Loan lengths in months
+
+    Returns:
+        Array of growth factors with the broadcast shape of the inputs
+    """
+    monthly_rate, months = np.broadcast_arrays(monthly_rate, months)
+    if monthly_rate.size == 0:
+        return np.empty(monthly_rate.shape)
+    rates, rate_index = np.unique(monthly_rate.ravel(), return_inverse=True)
+    terms, term_index = np.unique(months.ravel(), return_inverse=True)
+    pairs, inverse = np.unique(rate_index * len(terms) + term_index, return_inverse=True)
+    factors = np.array([
+        (1 + rates[pair // len(terms)])**int(terms[pair % len(terms)])
+        for pair in pairs.tolist()
+    ])
+    return factors[inverse].reshape(monthly_rate.shape)
+
+def calculate_monthly_payment_batch(principal: ArrayLike, rate: ArrayLike, months: ArrayLike) -> np.ndarray:
+    """
+    Calculate monthly payments for many loans at once.
+
+    Matches calculate_monthly_payment element-wise, including the
+    zero-principal and zero-rate cases. Loans on the slider grid gather their
+    factors from the annuity table; only the rest are computed.
+
+    Args:
+        principal: Loan principal amounts
+        rate: Annual interest rates as percentages
+        months: Total numbers of months
+
+    Returns:
+        Array of monthly payment amounts
+    """
+    principal, rate, months = np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(rate, dtype=float),
+        np.asarray(months, dtype=np.int64)
+    )
+    monthly_rate = rate / (12 * 100)
+    payment = np.zeros(principal.shape)
+
+    zero_rate = (principal > 0) & (monthly_rate == 0)
+    payment[zero_rate] = principal[zero_rate] / months[zero_rate]
+
+    amortized = (principal > 0) & (monthly_rate != 0)
+    if amortized.any():
+        months = months[amortized]
+        numerator, denominator, on_grid = annuity_arrays().gather(rate[amortized], months)
+        if not on_grid.all():
+            off_grid = ~on_grid
+            r = monthly_rate[amortized][off_grid]
+            growth = _growth_factor(r, months[off_grid])
+            numerator[off_grid] = r * growth
+            denominator[off_grid] = growth - 1
+        payment[amortized] = principal[amortized] * numerator / denominator
+    return payment
+
+def calculate_financing_metrics_batch(inputs: FinancingBatch, money_mode: str = 'float') -> Dict[str, np.ndarray]:
+    """
+    Calculate financing metrics for a batch of bond and commercial loan mixes.
+
+    In cents mode the loan amounts are rounded to whole cents and each
+    monthly payment to the nearest cent; annual and total amounts follow
+    exactly from those.
+
+    Args:
+        inputs: FinancingBatch containing one array per financing parameter
+        money_mode: 'float' for float dollars or 'cents' for int64 cents
+
+    Returns:
+        Dictionary with the same keys as calculate_financing_metrics, each
+        holding an array with one value per scenario
+    """
+    check_money_mode(money_mode)
+    cents = money_mode == 'cents'
+    bond_funding = to_cents(inputs.total_bond_funding) if cents else inputs.total_bond_funding
+    remaining_to_finance = to_cents(inputs.remaining_to_finance) if cents else inputs.remaining_to_finance
+
+    # Calculate bond payments; the payment is proportional to the principal,
+    # so a principal in cents gives the payment in cents
+    bond_monthly_payment = calculate_monthly_payment_batch(
+        bond_funding,
+        inputs.bond_interest_rate,
+        inputs.bond_term * 12
+    )
+    if cents:
+        bond_monthly_payment = round_cents(bond_monthly_payment)
+    annual_bond_payment = bond_monthly_payment * 12
+    total_bond_cost = annual_bond_payment * inputs.bond_term
+
+    # Calculate commercial loan payments
+    loan_monthly_payment = calculate_monthly_payment_batch(
+        remaining_to_finance,
+        inputs.commercial_interest_rate,
+        inputs.commercial_term * 12
+    )
+    if cents:
+        loan_monthly_payment = round_cents(loan_monthly_payment)
+    annual_loan_payment = loan_monthly_payment * 12
+    total_loan_cost = annual_loan_payment * inputs.commercial_term
+
+    return {
+        'monthly_bond_payment': bond_monthly_payment,
+        'annual_bond_payment': annual_bond_payment,
+        'total_bond_cost': total_bond_cost,
+        'monthly_loan_payment': loan_monthly_payment,
+        'annual_loan_payment': annual_loan_payment,
+        'total_loan_cost': total_loan_cost,
+        'total_annual_debt_service': annual_bond_payment + annual_loan_payment,
+        'total_cost_of_borrowing': (total_bond_cost + total_loan_cost -
+                                  bond_funding - remaining_to_finance)
+    }
+
+@dataclass(frozen=True)
+class ProjectionInputs:
+    """
+    Container for full-horizon projection inputs.
+
+    Each field may be a scalar or a 1-D array with one value per scenario.
+    inflation_rate may also be a 2-D (scenario x year) array holding the rate
+    applied in each of years 1..horizon. Instances holding only scalars are
+    hashable and can be used as cache keys.
+    """
+    future_total_revenue: ArrayLike
+    inflation_rate: ArrayLike
+    current_expenses: ArrayLike
+    annual_bond_payment: ArrayLike
+    annual_loan_payment: ArrayLike
+    bond_term: ArrayLike
+    commercial_term: ArrayLike
+
+def calculate_inflation_factors(inflation_rate: ArrayLike, horizon: int) -> np.ndarray:
+    """
+    Calculate cumulative inflation factors for years 0..horizon.
+
+    Args:
+        inflation_rate: Annual inflation rate as percentage, either one value
+            per scenario or a (scenario x horizon) array of yearly rates
+        horizon: Last projection year
+
+    Returns:
+        (scenario x horizon + 1) array of inflation factors, 1.0 in year 0
+    """
+    rate = np.atleast_1d(np.asarray(inflation_rate, dtype=float))
+    if rate.ndim == 1:
+        rate = np.broadcast_to(rate[:, None], (rate.shape[0], horizon))
+    factors = np.ones((rate.shape[0], horizon + 1))
+    np.cumprod(1 + rate[:, :horizon] / 100, axis=1, out=factors[:, 1:])
+    return factors
+
+def calculate_projections(
+    inputs: ProjectionInputs,
+    horizon: int = 20,
+    money_mode: str = 'float'
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate financial metrics for every year 0..horizon of many scenarios.
+
+    Vectorized counterpart of calling calculate_year_metrics once per year;
+    values agree with it up to floating-point rounding of the inflation factor.
+    In cents mode the dollar inputs are rounded to whole cents and each year's
+    inflated revenue and expenses to the nearest cent; debt service and
+    surplus are then exact.
+
+    Args:
+        inputs: ProjectionInputs with scalar or per-scenario values in dollars
+        horizon: Last projection year
+        money_mode: 'float' for float dollars or 'cents' for int64 cents
+
+    Returns:
+        Dictionary keyed by the calculate_year_metrics column names, each
+        holding a (scenario x year) array; 'Debt % of Costs' is a float
+        percentage in either mode
+    """
+    check_money_mode(money_mode)
+    money = to_cents if money_mode == 'cents' else (lambda values: np.asarray(values, dtype=float))
+    revenue = np.atleast_1d(money(inputs.future_total_revenue))
+    expenses = np.atleast_1d(money(inputs.current_expenses))
+    bond_payment = np.atleast_1d(money(inputs.annual_bond_payment))
+    loan_payment = np.atleast_1d(money(inputs.annual_loan_payment))
+    bond_term = np.atleast_1d(np.asarray(inputs.bond_term))
+    commercial_term = np.atleast_1d(np.asarray(inputs.commercial_term))
+    inflation_rate = np.asarray(inputs.inflation_rate, dtype=float)
+
+    scenarios = np.broadcast_shapes(
+        revenue.shape, expenses.shape, bond_payment.shape, loan_payment.shape,
+        bond_term.shape, commercial_term.shape, np.atleast_1d(inflation_rate).shape[:1]
+    )[0]
+    if inflation_rate.ndim < 2:
+        inflation_rate = np.broadcast_to(np.atleast_1d(inflation_rate), (scenarios,))
+    else:
+        inflation_rate = np.broadcast_to(inflation_rate, (scenarios, inflation_rate.shape[1]))
+
+    years = np.arange(horizon + 1)
+    inflation_factor = calculate_inflation_factors(inflation_rate, horizon)
+
+    projected_revenue = revenue[:, None] * inflation_factor
+    projected_expenses = expenses[:, None] * inflation_factor
+    if money_mode == 'cents':
+        projected_revenue = round_cents(projected_revenue)
+        projected_expenses = round_cents(projected_expenses)
+
+    # Debt service is paid while the year is inside each loan's term
+    year_bond_payment = np.where(years < bond_term[:, None], bond_payment[:, None], 0)
+    year_loan_payment = np.where(years < commercial_term[:, None], loan_payment[:, None], 0)
+    year_debt_service = year_bond_payment + year_loan_payment
+
+    total_costs = projected_expenses + year_debt_service
+    debt_service_percentage = np.divide(
+        year_debt_service * 100, total_costs,
+        out=np.zeros(total_costs.shape), where=total_costs > 0
+    )
+    operating_surplus = projected_revenue - total_costs
+
+    return {
+        'Year': np.broadcast_to(years, operating_surplus.shape),
+        'Revenue': projected_revenue,
+        'Operating Expenses': projected_expenses,
+        'Debt Service': year_debt_service,
+        'Debt % of Costs': debt_service_percentage,
+        'Operating Surplus': operating_surplus
+    }
+
+def projections_to_frame(projections: Dict[str, np.ndarray], scenario: int = 0, years: Sequence[int] = None):
+    """
+    Convert one scenario of calculate_projections output to a DataFrame.
+
+    Args:
+        projections: Output of calculate_projections
+        scenario: Row of the scenario to extract
+        years: Optional subset of years to keep
+
+    Returns:
+        pandas DataFrame with one row per year, matching the columns built
+        from calculate_year_metrics
+    """
+    import pandas as pd
+
+    columns = {key: values[scenario] for key, values in projections.items()}
+    frame = pd.DataFrame(columns)
+    if years is not None:
+        frame = frame[frame['Year'].isin(years)].reset_index(drop=True)
+    return frame
@@ -1,9 +1,346 @@
+import functools
+import time
 import streamlit as st
-import pandas as pd
-from src import config, styles
-from src.calculations import FinancingInputs, YearMetricsInputs, calculate_financing_metrics, calculate_year_metrics
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from src import config, instrumentation, styles
+from src.dataflow import Graph, financial_model
+from src.vectorized import projections_to_frame
+from src.montecarlo import MonteCarloJob, MonteCarloSettings
+from src.amortization import annual_summary, financing_amortization
+from src.goalseek import solve_break_even
+from src.optimize import funding_frontier
+from src.sensitivity import surplus_surface, tornado_analysis
 from src.components import inputs, metrics, charts
 
+# Fragments to redraw when an input section changes; every other part of the
+# page keeps what it last drew
+SECTION_DEPENDENCIES = {
+    'economic': ['warnings', 'break_even', 'surplus_heatmap', 'tornado', 'funding_optimizer',
+                 'projections', 'monte_carlo'],
+    'revenue': ['revenue_inputs', 'financing_inputs', 'impact', 'warnings', 'break_even',
+                'surplus_heatmap', 'tornado', 'funding_optimizer', 'projections', 'monte_carlo'],
+    'project_cost': ['project_cost_inputs', 'impact', 'warnings', 'break_even', 'surplus_heatmap',
+                     'tornado', 'funding_sources', 'funding_optimizer', 'projections', 'monte_carlo'],
+    'financing': ['impact', 'warnings', 'break_even', 'surplus_heatmap', 'tornado', 'funding_sources',
+                  'funding_optimizer', 'projections', 'monte_carlo'],
+    'uncertainty': ['monte_carlo']
+}
+
+# Number of recent runs kept for the performance panel
+PERFORMANCE_HISTORY = 50
+
+@contextmanager
+def recorded_run(label: str) -> Iterator[None]:
+    """Trace a page or fragment run while the performance panel is on"""
+    if not st.session_state.get('show_performance', False) or instrumentation.active_trace() is not None:
+        yield
+        return
+    with instrumentation.traced(label, track_memory=st.session_state.get('track_memory', False)) as trace:
+        yield
+    if 'performance_traces' not in st.session_state:
+        st.session_state.performance_traces = deque(maxlen=PERFORMANCE_HISTORY)
+    st.session_state.performance_traces.append(trace)
+    if instrumentation.TRACE_FILE:
+        instrumentation.append_trace(trace, instrumentation.TRACE_FILE)
+
+def traced_fragment(func: Callable[[], None]) -> Callable[[], None]:
+    """Time a fragment as a stage of the page run, or as a run of its own when it reruns alone"""
+    timed = instrumentation.timed(func, name=f"fragment.{func.__name__}")
+    
+    @functools.wraps(func)
+    def run():
+        with recorded_run(func.__name__):
+            return timed()
+    return run
+
+def rerun_dependents(section: str) -> Callable[[], None]:
+    """Build a widget callback that reruns only the fragments depending on a section"""
+    def callback():
+        fragments = list(SECTION_DEPENDENCIES[section])
+        # A lower member count caps bond participation, which changes the funding mix
+        if section == 'revenue' and st.session_state.bond_participants > st.session_state.members:
+            fragments.append('funding_sources')
+        st.rerun(fragments)
+    return callback
+
+def current_model() -> Optional[Graph]:
+    """
+    Get this session's dataflow model, updated to the input widgets' state.
+    
+    Each fragment reads only the values it draws, and the model recomputes
+    only what changed upstream of them since they were last read.
+    
+    Returns:
+        The session's Graph, or None if the revenue model is invalid
+    """
+    if 'financial_model' not in st.session_state:
+        st.session_state.financial_model = financial_model()
+    model = st.session_state.financial_model
+    model.set(**inputs.scenario_from_state())
+    if model.get('future_total_revenue') <= 0:
+        return None
+    return model
+
+@st.fragment(key='revenue_inputs')
+@traced_fragment
+def revenue_inputs_section():
+    """Future revenue inputs, rerun to revalidate the revenue model"""
+    return inputs.render_future_revenue_model(on_change=rerun_dependents('revenue'))
+
+@st.fragment(key='project_cost_inputs')
+@traced_fragment
+def project_cost_section():
+    """Project cost inputs, rerun to refresh the total assessment"""
+    inputs.render_project_cost_section(on_change=rerun_dependents('project_cost'))
+
+@st.fragment(key='financing_inputs')
+@traced_fragment
+def financing_section():
+    """Financing inputs, rerun when the member count caps bond participation"""
+    inputs.render_financing_options(st.session_state.members, on_change=rerun_dependents('financing'))
+
+@st.fragment(key='impact')
+@traced_fragment
+def impact_section():
+    """Financial impact metrics; independent of inflation"""
+    model = current_model()
+    if model is None:
+        return
+    metrics.render_financial_impact_metrics(
+        current_surplus=model.get('current_surplus'),
+        total_cost_of_borrowing=model.get('finance_metrics')['total_cost_of_borrowing'],
+        total_annual_debt_service=model.get('finance_metrics')['total_annual_debt_service'],
+        future_surplus=model.get('future_surplus'),
+        total_cost=inputs.scenario_from_state()['total_cost']
+    )
+
+@st.fragment(key='warnings')
+@traced_fragment
+def warnings_section():
+    """Surplus warnings for the first year and year 5"""
+    model = current_model()
+    if model is None:
+        return
+    metrics.render_warning_messages(model.get('future_surplus'), model.get('year_5_surplus'))
+
+@st.fragment(key='break_even')
+@traced_fragment
+def break_even_section():
+    """Value of one input at which the current scenario just avoids a deficit"""
+    model = current_model()
+    if model is None:
+        return
+    scenario = inputs.scenario_from_state()
+    with st.expander("🎯 Break-Even Finder", expanded=False):
+        parameter, through_year = inputs.render_break_even_options()
+        label, value_format = inputs.BREAK_EVEN_PARAMETERS[parameter]
+        metrics.render_break_even_result(
+            label=label,
+            value_format=value_format,
+            break_even=solve_break_even(parameter, scenario, through_year)[0],
+            current_value=scenario[parameter],
+            through_year=through_year
+        )
+
+@st.fragment(key='surplus_heatmap')
+@traced_fragment
+def surplus_heatmap_section():
+    """Operating surplus over a grid of two inputs, the others held at their current values"""
+    import pandas as pd
+    
+    model = current_model()
+    if model is None:
+        return
+    scenario = inputs.scenario_from_state()
+    # Track the expander state so the grid is only evaluated while it is open
+    expander = st.expander("🗺️ Surplus Heatmap", expanded=False, key='surplus_heatmap_open', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        x_parameter, y_parameter, year = inputs.render_heatmap_options()
+        surface = surplus_surface(x_parameter, y_parameter, scenario, year=year)
+        x_label, x_format = inputs.BREAK_EVEN_PARAMETERS[x_parameter]
+        y_label, y_format = inputs.BREAK_EVEN_PARAMETERS[y_parameter]
+        for tab, surplus in zip(st.tabs(["First Year", f"Year {year}"]),
+                                [surface.first_year_surplus, surface.final_year_surplus]):
+            with tab:
+                charts.render_surplus_heatmap(
+                    pd.DataFrame(surplus, index=surface.y, columns=surface.x),
+                    x_label=x_label,
+                    x_format=x_format,
+                    y_label=y_label,
+                    y_format=y_format,
+                    current=(scenario[x_parameter], scenario[y_parameter])
+                )
+
+@st.fragment(key='tornado')
+@traced_fragment
+def tornado_section():
+    """Inputs ranked by how far each one alone moves the year-5 and year-20 surplus"""
+    import pandas as pd
+    
+    model = current_model()
+    if model is None:
+        return
+    expander = st.expander("🌪️ Input Sensitivity", expanded=False, key='tornado_open', on_change='rerun')
+    with expander:
+        if not expander.open:
+            return
+        st.caption("Each input moves across its full range while the others stay as set")
+        results = tornado_analysis(inputs.scenario_from_state(), years=(5, 20))
+        for tab, tornado in zip(st.tabs([f"Year {year}" for year in results]), results.values()):
+            with tab:
+                labels = [inputs.INPUT_LABELS[name] for name in tornado.parameters]
+                charts.render_tornado_chart(pd.DataFrame({
+                    'Input': [label for label, _ in labels],
+                    'Low Surplus': tornado.low_surplus,
+                    'High Surplus': tornado.high_surplus,
+                    'Low Value': [value_format.format(value)
+                                  for (_, value_format), value in zip(labels, tornado.low_value)],
+                    'High Value': [value_format.format(value)
+                                   for (_, value_format), value in zip(labels, tornado.high_value)]
+                }), base_surplus=tornado.base_surplus, year=tornado.year)
+
+@st.fragment(key='funding_sources')
+@traced_fragment
+def funding_sources_section():
+    """Funding mix metrics, chart and amortization; independent of revenue and inflation"""
+    import pandas as pd
+    
+    model = current_model()
+    if model is None:
+        return
+    scenario = inputs.scenario_from_state()
+    
+    st.subheader(f"Project Funding Sources (Total Project Cost: ${scenario['total_cost']:,.0f})")
+    metric_col, chart_col = st.columns([1, 3])
+    
+    with metric_col:
+        metrics.render_funding_metrics(
+            total_assessment=model.get('total_assessment'),
+            assessment_per_member=scenario['assessment_per_member'],
+            total_bond_funding=model.get('total_bond_funding'),
+            bond_participants=scenario['bond_participants'],
+            remaining_to_finance=model.get('remaining_to_finance'),
+            total_cost=scenario['total_cost']
+        )
+    
+    with chart_col:
+        funding_data = pd.DataFrame({
+            'Source': ['Assessments', 'The Footnote', 'Commercial Loan'],
+            'Amount': [model.get('total_assessment'), model.get('total_bond_funding'),
+                       model.get('remaining_to_finance')]
+        })
+        charts.render_funding_sources_chart(funding_data)
+    
+    # Principal/interest split and outstanding balance for each loan
+    with st.expander("Amortization Schedules", expanded=False):
+        schedules = financing_amortization(model.get('financing_inputs'))
+        for tab, loan in zip(st.tabs(["The Footnote", "Commercial Loan"]), ['bond', 'commercial']):
+            with tab:
+                summary = annual_summary(schedules[loan])
+                charts.render_amortization_table(pd.DataFrame({
+                    key: values if key == 'Year' else values[0]
+                    for key, values in summary.items()
+                }))
+
+@st.fragment(key='funding_optimizer')
+@traced_fragment
+def funding_optimizer_section():
+    """Pareto-optimal alternatives to the current funding mix"""
+    import pandas as pd
+    
+    model = current_model()
+    if model is None:
+        return
+    scenario = inputs.scenario_from_state()
+    with st.expander("Funding Mix Optimizer", expanded=False):
+        if st.checkbox(
+            "Search funding mixes",
+            value=False,
+            help="Compare assessment, bond and loan term combinations for this project cost"
+        ):
+            frontier = funding_frontier(scenario)
+            st.caption(f"{frontier.size:,} of {frontier.evaluated:,} funding mixes are not beaten on "
+                       "cost of borrowing, member burden and minimum 20-year surplus at once")
+            charts.render_funding_frontier_chart(pd.DataFrame(frontier.points), current={
+                'member_burden': (scenario['assessment_per_member'] +
+                                  model.get('total_bond_funding') / config.get_operating_metric('MEMBERS')),
+                'total_cost_of_borrowing': model.get('finance_metrics')['total_cost_of_borrowing']
+            })
+
+@st.fragment(key='projections')
+@traced_fragment
+def projections_section():
+    """Projection table and trend chart"""
+    model = current_model()
+    if model is None:
+        return
+    st.subheader("20-Year Financial Projections")
+    
+    # Show key years in the table and the full annual series in the chart
+    key_years = [0, 5, 10, 15, 20]
+    charts.render_projections_table(projections_to_frame(model.get('projections'), years=key_years))
+    charts.render_trends_chart(projections_to_frame(model.get('projections')))
+
+@st.fragment(key='monte_carlo')
+@traced_fragment
+def monte_carlo_section():
+    """Monte Carlo probability of deficit, drawn only while the simulation is enabled"""
+    import pandas as pd
+    
+    model = current_model()
+    uncertainty_options = inputs.uncertainty_options_from_state()
+    if model is None or uncertainty_options is None:
+        return
+    st.divider()
+    st.subheader("Probability of Deficit")
+    settings = MonteCarloSettings(**uncertainty_options)
+    job = MonteCarloJob(inputs.scenario_from_state(), settings)
+    progress = st.progress(0.0)
+    # The simulation runs on the job's own thread, outside this run's trace,
+    # so the wait for it stands in for it as a stage
+    try:
+        with instrumentation.stage('montecarlo.run_monte_carlo'):
+            while not job.wait(timeout=0.1):
+                progress.progress(job.progress, text=f"Simulated {job.completed_paths:,} of {settings.paths:,} paths")
+    finally:
+        # An input change interrupts this run; stop the now stale simulation
+        job.cancel()
+    progress.empty()
+    simulation = job.result()
+    st.caption(f"Based on {simulation.paths:,} simulated paths of inflation, membership "
+               "and non-membership revenue")
+    charts.render_deficit_probability_chart(pd.DataFrame({
+        'Year': simulation.years,
+        'Probability of Deficit': simulation.deficit_probability * 100
+    }))
+
+@st.fragment
+def performance_panel():
+    """Stage timings of this session's recent page and fragment runs"""
+    traces = list(st.session_state.get('performance_traces', []))[::-1]
+    st.subheader("⏱️ Performance")
+    if not traces:
+        st.caption("No runs recorded yet")
+        return
+    st.button("Refresh", help="Show fragment runs recorded since the panel was drawn")
+    index = st.selectbox(
+        "Run",
+        options=range(len(traces)),
+        format_func=lambda i: (f"{time.strftime('%H:%M:%S', time.localtime(traces[i].timestamp))} "
+                               f"{traces[i].label} ({traces[i].seconds * 1000:,.0f} ms)")
+    )
+    metrics.render_performance_trace(traces[index])
+    st.download_button(
+        "Download traces (JSON lines)",
+        data=instrumentation.traces_to_jsonl(traces[::-1]),
+        file_name="daleview-traces.jsonl",
+        mime="application/jsonl"
+    )
+
 def main():
     # Only show the app content after successful authentication
     st.title("Daleview Pool Renovation Financial Model")
@@ -66,117 +403,30 @@ def main():
 
     # Left column - Input sections
     with left_col:
-        # Render input sections and collect their returns
         inputs.render_current_revenue_breakdown()
-        inflation_rate = inputs.render_economic_assumptions()
+        inputs.render_economic_assumptions(on_change=rerun_dependents('economic'))
         
-        revenue_model = inputs.render_future_revenue_model()
+        revenue_model = revenue_inputs_section()
         if revenue_model is None:
             st.stop()  # Stop if revenue model validation failed
-            
-        future_total_revenue = (
-            revenue_model['members'] * revenue_model['avg_dues'] +
-            revenue_model['swim_team'] + 
-            revenue_model['winter_swim'] + 
-            revenue_model['other']
-        )
         
-        total_cost, assessment_per_member, total_assessment = inputs.render_project_cost_section()
-        financing_options = inputs.render_financing_options(revenue_model['members'])
-
-    # Calculate financing metrics using new dataclass
-    total_bond_funding = financing_options['bond_participants'] * financing_options['avg_bond_amount']
-    remaining_to_finance = total_cost - total_bond_funding - total_assessment
-
-    financing_inputs = FinancingInputs(
-        total_bond_funding=total_bond_funding,
-        bond_term=financing_options['bond_term'],
-        bond_interest_rate=financing_options['bond_interest_rate'],
-        remaining_to_finance=remaining_to_finance,
-        commercial_term=financing_options['commercial_term'],
-        commercial_interest_rate=financing_options['commercial_interest_rate']
-    )
-    finance_metrics = calculate_financing_metrics(financing_inputs)
+        project_cost_section()
+        financing_section()
+        inputs.render_uncertainty_options(on_change=rerun_dependents('uncertainty'))
 
-    # Right column - Results and visualizations
+    # Right column - Results and visualizations, each redrawn only when its inputs change
     with right_col:
-        # Calculate key metrics
-        current_surplus = (config.get_operating_metric('TOTAL_REVENUE') - 
-                        config.get_operating_metric('EXPENSES'))
-        future_surplus = (future_total_revenue - 
-                        config.get_operating_metric('EXPENSES') - 
-                        finance_metrics['total_annual_debt_service'])
-        
-        # Render financial impact section
-        metrics.render_financial_impact_metrics(
-            current_surplus=current_surplus,
-            total_cost_of_borrowing=finance_metrics['total_cost_of_borrowing'],
-            total_annual_debt_service=finance_metrics['total_annual_debt_service'],
-            future_surplus=future_surplus,
-            total_cost=total_cost
-        )
-        
-        # Calculate and render 5-year projection
-        year_5_inputs = YearMetricsInputs(
-            year=5,
-            future_total_revenue=future_total_revenue,
-            inflation_rate=inflation_rate,
-            current_expenses=config.get_operating_metric('EXPENSES'),
-            annual_bond_payment=finance_metrics['annual_bond_payment'],
-            annual_loan_payment=finance_metrics['annual_loan_payment'],
-            bond_term=financing_options['bond_term'],
-            commercial_term=financing_options['commercial_term']
-        )
-        year_5_metrics = calculate_year_metrics(year_5_inputs)
-        metrics.render_warning_messages(future_surplus, year_5_metrics['Operating Surplus'])
-
+        impact_section()
+        warnings_section()
+        break_even_section()
+        surplus_heatmap_section()
+        tornado_section()
         st.divider()
-        
-        # Project Funding Sources section
-        st.subheader(f"Project Funding Sources (Total Project Cost: ${total_cost:,.0f})")
-        metric_col, chart_col = st.columns([1, 3])
-        
-        with metric_col:
-            metrics.render_funding_metrics(
-                total_assessment=total_assessment,
-                assessment_per_member=assessment_per_member,
-                total_bond_funding=total_bond_funding,
-                bond_participants=financing_options['bond_participants'],
-                remaining_to_finance=remaining_to_finance,
-                total_cost=total_cost
-            )
-        
-        with chart_col:
-            funding_data = pd.DataFrame({
-                'Source': ['Assessments', 'The Footnote', 'Commercial Loan'],
-                'Amount': [total_assessment, total_bond_funding, remaining_to_finance]
-            })
-            charts.render_funding_sources_chart(funding_data)
-        
+        funding_sources_section()
+        funding_optimizer_section()
         st.divider()
-        
-        # Time-based Projections section
-        st.subheader("20-Year Financial Projections")
-        
-        # Generate projections for key years
-        key_years = [0, 5, 10, 15, 20]
-        projections = pd.DataFrame([
-            calculate_year_metrics(YearMetricsInputs(
-                year=year,
-                future_total_revenue=future_total_revenue,
-                inflation_rate=inflation_rate,
-                current_expenses=config.get_operating_metric('EXPENSES'),
-                annual_bond_payment=finance_metrics['annual_bond_payment'],
-                annual_loan_payment=finance_metrics['annual_loan_payment'],
-                bond_term=financing_options['bond_term'],
-                commercial_term=financing_options['commercial_term']
-            ))
-            for year in key_years
-        ])
-
-        # Render projections table and chart
-        charts.render_projections_table(projections)
-        charts.render_trends_chart(projections)
+        projections_section()
+        monte_carlo_section()
 
 # Page config
 st.set_page_config(
@@ -203,12 +453,25 @@ if 'shown_sidebar_tip' not in st.session_state:
 st.sidebar.markdown("---")
 st.sidebar.markdown("↑ _Click arrow to hide menu_")
 
+# Optional per-run stage timings for finding what dominates rerun latency
+st.sidebar.checkbox("Show performance panel", value=False, key='show_performance',
+                    help="Time each input, calculation and chart on every run")
+if st.session_state.show_performance:
+    st.sidebar.checkbox("Track memory", value=False, key='track_memory',
+                        help="Also record memory allocated by each stage; slows runs down")
+
 # Define pages
 main_page = st.Page(main, title="Calculator", icon="💰", default=True)
+sweep_page = st.Page("sweep_explorer.py", title="Sweep Explorer", icon="🔎")
 docs_page = st.Page("documentation.py", title="Documentation", icon="📚")
 
 # Set up navigation
-pg = st.navigation([main_page, docs_page])
+pg = st.navigation([main_page, sweep_page, docs_page])
+
+with recorded_run('page'):
+    pg.run()
 
-pg.run()
+if st.session_state.show_performance:
+    with st.sidebar:
+        performance_panel()
 
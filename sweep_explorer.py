@@ -0,0 +1,49 @@
+import os
+import streamlit as st
+from src.colstore import META_FILE
+from src.query import open_query
+from src.components import inputs, metrics, charts
+
+# Matching rows read from disk and shown in the table
+ROWS_SHOWN = 1000
+
+st.title("Sweep Explorer")
+st.caption("Filter the scenarios of a stored sensitivity sweep")
+
+path = st.text_input(
+    "Sweep Store",
+    value=os.environ.get('DALEVIEW_SWEEP_STORE', ''),
+    help="Directory written by colstore.ColumnStoreWriter, e.g. sweep.cols"
+)
+
+if not path:
+    st.info("Enter the path of a sweep store on the server. See *Large Sweeps* in the README "
+            "for writing one and building its indexes.")
+    st.stop()
+
+if not os.path.isfile(os.path.join(path, META_FILE)):
+    st.error(f"No sweep store found at {path}")
+    st.stop()
+
+query = open_query(path)
+store = query.store
+indexed = query.indexed_columns
+st.caption(f"{store.rows:,} scenarios · {len(store.columns)} columns · "
+           f"{len(indexed)} indexed" + ("" if indexed else " (every query scans the sweep)"))
+
+conditions = inputs.render_query_conditions(
+    store.columns,
+    {name: query.value_range(name) for name in indexed},
+    horizon=query.horizon
+)
+result = query.where(conditions)
+metrics.render_query_result(result, store.rows)
+
+if result.count:
+    rows = result.rows[:ROWS_SHOWN]
+    if result.count > ROWS_SHOWN:
+        st.caption(f"Showing the first {ROWS_SHOWN:,} matching scenarios")
+    charts.render_sweep_rows(
+        store.to_frame(rows=rows).set_axis(rows),
+        {name: inputs.sweep_column_label(name) for name in store.columns}
+    )